@@ -1,17 +1,26 @@
 import pytest
 from playwright.sync_api import sync_playwright
 from pages.login_page import LoginPage
+from pages.project_page import ProjectPage
+from pages import steps
+from pages import artifacts
+from utils.api_client import get_api_client
+from utils.asset_cache import AssetCache
+from utils.browser import BrowserPool
+from utils import test_durations
 from dotenv import load_dotenv
+import json
 import os
 import time
 from pathlib import Path
-import requests
 import uuid
-import urllib3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Загружаем переменные окружения из .env файла
+# (run_tests.py с несколькими хостами передаёт окружение процессу напрямую — тогда .env не читаем)
 env_path = Path(__file__).parent / ".env"
-load_dotenv(dotenv_path=env_path, override=True)
+if not os.getenv("TESTS_ENV_INJECTED"):
+    load_dotenv(dotenv_path=env_path, override=True)
 
 # Хост настраивается через run_tests.py скрипт
 
@@ -26,82 +35,245 @@ def get_projects_api():
 
 def get_auth_cookies():
     """
-    Получить куки авторизации через API логин
+    Получить куки авторизации (вход через API выполняется один раз на процесс)
     """
-    import requests
-    import urllib3
-    # Отключаем предупреждения о небезопасных запросах
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    
-    email = os.getenv("LOGIN")
-    password = os.getenv("PASSWORD")
-    api_base_url = get_api_base_url()
-    resp = requests.post(f"{api_base_url}/api/auth/sign_in", json={"email": email, "password": password}, verify=False)
-    resp.raise_for_status()
-    return resp.cookies
+    return get_api_client().auth_cookies()
 
 def get_project_by_code(code):
-    cookies = get_auth_cookies()
-    projects_api = get_projects_api()
-    resp = requests.get(projects_api, cookies=cookies, verify=False)
-    resp.raise_for_status()
-    for prj in resp.json():
-        if prj.get("code") == code:
-            return prj
-    return None
+    return get_api_client().get_project_by_code(code)
 
 def delete_project_by_id(project_id):
-    cookies = get_auth_cookies()
-    projects_api = get_projects_api()
-    resp = requests.delete(f"{projects_api}/{project_id}", cookies=cookies, verify=False)
-    resp.raise_for_status()
-    return resp.status_code == 204
+    return get_api_client().delete_project(project_id)
+
+def create_project_via_api(title, code, git, default_branch="main"):
+    """
+    Создать проект через POST /api/projects (те же поля, что в модальном окне)
+    Возвращает описание проекта из API
+    """
+    client = get_api_client()
+    prj = client.create_project(title, code, git, default_branch)
+    # API не вернул проект в ответе — ждём, пока он появится в списке
+    return prj or client.wait_for_project(code)
+
+
+def use_ui_project_creation(request):
+    """
+    Создавать проект через UI: флаг --ui-project-creation или маркер
+    ui_project_creation у теста (для тестов самого модального окна)
+    """
+    return bool(request.config.getoption("ui_project_creation", False)
+                or request.node.get_closest_marker("ui_project_creation"))
+
+
+def provision_project(page, title, code, git, default_branch="main", via_ui=False):
+    """
+    Создать проект: по умолчанию через REST API, при via_ui — через модальное окно.
+    Возвращает описание проекта из API
+    """
+    if not via_ui:
+        prj = create_project_via_api(title, code, git, default_branch)
+        print(f"[INFO] Проект {code} создан через API")
+        return prj
+    project_page = ProjectPage(page)
+    project_page.open_create_project_modal()
+    project_page.create_project(title, code, git, default_branch)
+    project_page.wait_modal_close()
+    return get_project_by_code(code)
+
 
 def save_screenshot(page, test_name):
-    screenshots_dir = "screenshots"
-    os.makedirs(screenshots_dir, exist_ok=True)
-    screenshot_base = test_name
-    screenshot_path = os.path.join(screenshots_dir, f"{screenshot_base}.png")
-    # Если файл уже есть, добавляем timestamp
-    if os.path.exists(screenshot_path):
-        screenshot_path = os.path.join(screenshots_dir, f"{screenshot_base}_{int(time.time())}.png")
-    page.screenshot(path=screenshot_path, full_page=True)
-    print(f"[SCREENSHOT] Скриншот сохранён: {screenshot_path}")
+    """
+    Снимок страницы (скриншот + DOM); в режиме --artifacts=on-failure внутри теста —
+    только отметка для trace, снимок снимается в конце упавшего теста
+    """
+    screenshot_path = artifacts.capture(page, test_name)
+    # Путь печатается, только если файл действительно пишется
+    if screenshot_path:
+        print(f"[SCREENSHOT] Снимок {test_name}: {screenshot_path}")
 
 def get_all_projects_via_api():
-    cookies = get_auth_cookies()
-    projects_api = get_projects_api()
-    resp = requests.get(projects_api, cookies=cookies, verify=False)
-    resp.raise_for_status()
-    return resp.json()
+    return get_api_client().list_projects()
 
-@pytest.fixture(scope="function")
-def login_page():
+# Сохранённое состояние авторизации (куки + localStorage) между запусками
+AUTH_STATE_FILE = Path(os.getenv("AUTH_STATE_FILE", Path(__file__).parent / ".auth" / "storage_state.json"))
+# За сколько секунд до истечения куки логинимся заново
+AUTH_EXPIRY_MARGIN_SEC = 300
+
+
+def _auth_key():
+    """Для какого хоста и пользователя сохранено состояние"""
+    return {"base_url": get_api_base_url(), "login": os.getenv("LOGIN")}
+
+
+def auth_state_expired(state, margin=AUTH_EXPIRY_MARGIN_SEC):
+    """Истекает ли какая-нибудь кука в ближайшие margin секунд (сессионные куки не истекают)"""
+    deadline = time.time() + margin
+    return any(0 < cookie.get("expires", -1) < deadline for cookie in state.get("cookies", []))
+
+
+def load_auth_state():
+    """
+    Storage state из AUTH_STATE_FILE, если он сохранён для текущего хоста/логина
+    и куки ещё действительны, иначе None
+    """
+    try:
+        data = json.loads(AUTH_STATE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    state = data.get("state") or {}
+    if data.get("key") != _auth_key() or not state.get("cookies") or auth_state_expired(state):
+        return None
+    return state
+
+
+def save_auth_state(state):
+    AUTH_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    # Пишем через временный файл, чтобы параллельные процессы не прочитали половину
+    tmp_path = AUTH_STATE_FILE.with_name(f"{AUTH_STATE_FILE.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({"key": _auth_key(), "state": state}), encoding="utf-8")
+    os.replace(tmp_path, AUTH_STATE_FILE)
+
+
+def login_via_ui(page):
+    """Логин через форму на странице page"""
     email = os.getenv("LOGIN")
     password = os.getenv("PASSWORD")
     assert email is not None, "LOGIN not set"
     assert password is not None, "PASSWORD not set"
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
-        login_page = LoginPage(page)
-        login_page.goto()
-        login_page.login(email, password)
+    login_page = LoginPage(page)
+    login_page.goto()
+    login_page.login(email, password)
+
+
+class AuthSession:
+    """
+    Одна авторизация на сессию тестов: состояние берётся из AUTH_STATE_FILE,
+    а логин через UI выполняется только если куки нет или она истекла.
+    """
+
+    def __init__(self, browser_pool):
+        self.browser_pool = browser_pool
+        self.state = None
+
+    def get_state(self):
+        if self.state is None or auth_state_expired(self.state):
+            self.state = load_auth_state() or self.login()
+        return self.state
+
+    def login(self):
+        context = self.browser_pool.lease()
+        try:
+            login_via_ui(context.new_page())
+            state = context.storage_state()
+        finally:
+            self.browser_pool.release(context)
+        save_auth_state(state)
+        print("[AUTH] Выполнен вход, состояние сохранено")
+        return state
+
+    def relogin_in(self, page):
+        """Повторный вход в уже открытом контексте (сервер отозвал сессию)"""
+        login_via_ui(page)
+        self.state = page.context.storage_state()
+        save_auth_state(self.state)
+        print("[AUTH] Сессия истекла, выполнен повторный вход")
+
+
+@pytest.fixture(scope="session")
+def playwright():
+    p = sync_playwright().start()
+    yield p
+    p.stop()
+
+
+@pytest.fixture(scope="session")
+def asset_cache(request):
+    """Кеш статики фронтенда для всех контекстов сессии (None — выключен)"""
+    if request.config.getoption("no_asset_cache", False):
+        yield None
+        return
+    cache = AssetCache.for_host()
+    yield cache
+    if cache is not None:
+        cache.save()
+        print(f"[INFO] {cache.summary()}")
+
+
+@pytest.fixture(scope="session")
+def browser_pool(playwright, asset_cache, request):
+    """
+    Запущенные браузеры (headless, окно — --headed), из которых тесты берут контексты;
+    размер — --browser-pool (на процесс, под xdist — на воркер)
+    """
+    headed = request.config.getoption("headed", False) or None
+    pool = BrowserPool(
+        playwright,
+        size=request.config.getoption("browser_pool", 1),
+        headed=headed,
+        on_new_context=asset_cache.attach if asset_cache else None,
+    )
+    pool.warm()
+    yield pool
+    if pool.launches > pool.size:
+        print(f"[INFO] Браузеры перезапускались: запусков {pool.launches} при размере пула {pool.size}")
+    pool.close()
+
+
+@pytest.fixture(scope="session")
+def auth_session(browser_pool):
+    return AuthSession(browser_pool)
+
+
+@pytest.fixture(scope="function")
+def browser_context(browser_pool, request):
+    """Чистый (неавторизованный) контекст из пула браузеров"""
+    context = browser_pool.lease()
+    artifacts.begin_test(request.node.nodeid, context)
+    try:
+        yield context
+    finally:
+        pages = context.pages
+        artifacts.end_test(has_failed(request.node), pages[-1] if pages else None, context)
+        browser_pool.release(context)
+
+
+@pytest.fixture(scope="function")
+def login_page(browser_pool, auth_session, request):
+    """
+    Авторизованная страница со списком проектов в новом контексте браузера.
+    Браузеры и логин общие на сессию, контекст у каждого теста свой.
+    При падении теста сохраняются снимки и trace (pages/artifacts.py).
+    """
+    context = browser_pool.lease(storage_state=auth_session.get_state())
+    artifacts.begin_test(request.node.nodeid, context)
+    page = None
+    try:
+        page = context.new_page()
+        project_page = ProjectPage(page)
+        project_page.goto()
+        if "/login" in page.url:
+            auth_session.relogin_in(page)
+            project_page.goto()
         yield page
-        browser.close()
+    finally:
+        artifacts.end_test(has_failed(request.node), page, context)
+        browser_pool.release(context)
+
+def flow_project_prefix():
+    """Префикс кодов проектов flow_project; под xdist у каждого воркера свой"""
+    worker = get_worker_id()
+    return f"test_flow_component_{worker}_" if worker else "test_flow_component_"
+
 
 @pytest.fixture(scope="function")
-def flow_project(login_page):
+def flow_project(login_page, request):
     """
     Фикстура для создания проекта с git-репозиторием из REPO_URL_FLOW
     Если проект с нужным кодом уже есть — не создавать, а использовать существующий.
     """
-    from pages.project_page import ProjectPage
     import os
-    import time
     import uuid
     page = login_page
-    project_page = ProjectPage(page)
 
     # Если задан EXISTING_PROJECT_CODE, используем его и не создаём новые проекты
     existing_code = os.getenv("EXISTING_PROJECT_CODE")
@@ -111,14 +283,16 @@ def flow_project(login_page):
 
     # Генерируем уникальный код проекта
     unique_id = str(uuid.uuid4())[:8]
-    project_code = f"test_flow_component_{unique_id}"
+    # Под xdist воркеры берут только свои проекты, чтобы не удалить чужой посреди теста
+    code_prefix = flow_project_prefix()
+    project_code = f"{code_prefix}{unique_id}"
     project_title = f"Test Flow Project {unique_id}"
 
-    # Проверяем, есть ли уже проект с нужным кодом (начинается с test_flow_component_)
+    # Проверяем, есть ли уже проект с нужным кодом (начинается с code_prefix)
     all_projects = get_all_projects_via_api()
     existing = None
     for prj in all_projects:
-        if prj['code'].startswith('test_flow_component_'):
+        if prj['code'].startswith(code_prefix):
             existing = prj
             break
 
@@ -137,9 +311,8 @@ def flow_project(login_page):
         # Создаём новый проект
         git = os.environ.get("REPO_URL_FLOW")
         default_branch = "main"
-        project_page.open_create_project_modal()
-        project_page.create_project(project_title, project_code, git, default_branch)
-        project_page.wait_modal_close()
+        provision_project(page, project_title, project_code, git, default_branch,
+                          via_ui=use_ui_project_creation(request))
         try:
             yield page, project_code
         finally:
@@ -155,89 +328,362 @@ def flow_project(login_page):
                 print(f"[WARNING] Ошибка при удалении проекта {project_code}: {e}")
 
 
-# Файл для хранения project_code между тестами
-SHARED_PROJECT_FILE = "shared_project_code.txt"
+# Префикс кодов проектов seed_project: отдельный от flow_project, чтобы тот
+# не подхватил наполненный проект (с другим деревом файлов) как обычный
+SEED_PROJECT_PREFIX = "autotest_seed_"
+
+
+def seed_project_prefix():
+    """Префикс кодов проектов seed_project; под xdist у каждого воркера свой"""
+    worker = get_worker_id()
+    return f"{SEED_PROJECT_PREFIX}{worker}_" if worker else SEED_PROJECT_PREFIX
 
-def get_or_create_shared_project(login_page):
+
+@pytest.fixture(scope="function")
+def seed_project():
     """
-    Функция для получения или создания общего проекта между тестами flow.
-    Если тесты запускаются последовательно - используется один проект.
-    Если тест запускается отдельно - создается новый проект.
+    Фабрика проектов с готовыми файлами (utils/project_seed.py):
+
+        project_code = seed_project({"scripts/math_functions.py": SCRIPTS_DIR / "math_functions.py"})
+
+    Дерево коммитится в ветку autotest/<код> репозитория REPO_URL_FLOW (от base_branch),
+    проект создаётся через API на этой ветке (браузер не нужен). После теста проект
+    и ветка удаляются.
     """
-    # Проверяем, есть ли сохраненный код проекта
-    shared_project_code = None
-    if os.path.exists(SHARED_PROJECT_FILE):
+    from utils.project_seed import delete_branch, seed_branch
+
+    repo_url = os.environ.get("REPO_URL_FLOW")
+    assert repo_url, "REPO_URL_FLOW not set"
+    created = []
+
+    def _seed(tree, base_branch="main"):
+        unique_id = uuid.uuid4().hex[:8]
+        project_code = f"{seed_project_prefix()}{unique_id}"
+        branch = f"autotest/{project_code}"
+        started = time.monotonic()
+        seed_branch(repo_url, branch, tree, base_branch=base_branch, message=f"autotest seed for {project_code}")
+        created.append((project_code, branch))
+        create_project_via_api(f"Test Seed Project {unique_id}", project_code, repo_url, branch)
+        print(f"[INFO] Проект {project_code} наполнен ({len(tree)} путей) за {time.monotonic() - started:.1f}с")
+        return project_code
+
+    yield _seed
+
+    for project_code, branch in created:
+        try:
+            prj = get_project_by_code(project_code)
+            if prj and prj.get("id"):
+                delete_project_by_id(prj["id"])
+                print(f"[SUCCESS] Проект {project_code} удален")
+        except Exception as e:
+            print(f"[WARNING] Ошибка при удалении проекта {project_code}: {e}")
         try:
-            with open(SHARED_PROJECT_FILE, 'r') as f:
-                shared_project_code = f.read().strip()
-        except Exception:
-            pass
-    
-    # Если есть код проекта - проверяем, существует ли проект
-    if shared_project_code:
-        existing_project = get_project_by_code(shared_project_code)
-        if existing_project:
-            return shared_project_code
-        else:
-            # Проект был удален, удаляем файл
+            delete_branch(repo_url, branch)
+        except Exception as e:
+            print(f"[WARNING] Ошибка при удалении ветки {branch}: {e}")
+
+
+def pytest_addoption(parser):
+    parser.addoption("--headed", action="store_true", default=False,
+                     help="Запускать браузер с окном (по умолчанию headless; также HEADED=1)")
+    parser.addoption("--browser-pool", type=int, default=1, metavar="N",
+                     help="Сколько браузеров держать запущенными на процесс")
+    parser.addoption("--no-asset-cache", action="store_true", default=False,
+                     help="Не отдавать статику фронтенда из локального кеша (.cache/assets)")
+    parser.addoption("--artifacts", choices=artifacts.MODES, default="on-failure",
+                     help="Скриншоты, DOM и trace: только упавших тестов, всегда или никогда")
+    parser.addoption("--shard", default=None, metavar="K/N",
+                     help="Запустить K-й из N шардов, сбалансированных по истории длительности тестов")
+    parser.addoption("--no-duration-order", action="store_true", default=False,
+                     help="Не переупорядочивать тесты по истории длительности (самые долгие первыми)")
+    parser.addoption("--ui-project-creation", action="store_true", default=False,
+                     help="Создавать проекты фикстур через модальное окно UI, а не через API")
+    parser.addoption("--preprovision-projects", type=int, default=0, metavar="N",
+                     help="Перед тестами создать N проектов для flow_project параллельно через API")
+    parser.addoption("--clear-projects", action="store_true", default=False,
+                     help="Перед запуском удалить все проекты автотестов (utils/clear_projects.py). "
+                          "Небезопасно, если на тот же стенд идёт другой запуск: его проекты тоже удалятся")
+    parser.addoption("--clear-projects-workers", type=int, default=8, metavar="N",
+                     help="Параллельных удалений для --clear-projects")
+
+
+def pytest_sessionstart(session):
+    """
+    --clear-projects: очистка проектов автотестов (на контроллере, до запуска воркеров xdist).
+
+    Удаляется всё, что подходит под is_autotest_project, в том числе живые проекты
+    параллельного запуска на тот же стенд (autotest_flow_shared_<run id>_*, autotest_seed_*,
+    test_flow_component_*): API не отдаёт время создания, а проекты flow_project
+    переиспользуются между запусками, так что отличить чужие живые проекты не по чему.
+    Запускать только когда других запусков на этот BASE_URL нет.
+    """
+    config = session.config
+    if getattr(config, "workerinput", None) is not None or not config.getoption("clear_projects", False):
+        return
+    from utils.clear_projects import clear_autotest_projects
+    print(f"[WARN] --clear-projects: удаляются проекты автотестов всех запусков на {os.getenv('BASE_URL')}")
+    clear_autotest_projects(workers=config.getoption("clear_projects_workers"))
+
+
+def preprovision_projects(count, prefix, workers=8):
+    """
+    Параллельно создать count проектов с кодами prefix<uuid> через API.
+    Возвращает коды созданных проектов
+    """
+    git = os.environ.get("REPO_URL_FLOW")
+    codes = [f"{prefix}{uuid.uuid4().hex[:8]}" for _ in range(count)]
+    created = []
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=min(workers, count)) as pool:
+        futures = {
+            pool.submit(create_project_via_api, f"Test Flow Project {code[len(prefix):]}", code, git): code
+            for code in codes
+        }
+        for future in as_completed(futures):
+            code = futures[future]
             try:
-                os.remove(SHARED_PROJECT_FILE)
-            except Exception:
-                pass
-    
-    # Создаем новый проект
-    unique = int(time.time())
-    project_code = f"autotest_flow_shared_{unique}"
-    project_title = f"Автотест Flow Shared {unique}"
+                future.result()
+                created.append(code)
+            except Exception as e:
+                print(f"[WARNING] Не удалось создать проект {code}: {e}")
+    print(f"[INFO] Создано заранее {len(created)} из {count} проектов за {time.monotonic() - started:.1f}с")
+    return created
+
+
+@pytest.fixture(scope="session", autouse=True)
+def preprovisioned_flow_projects(request):
+    """
+    --preprovision-projects N: пул проектов, которые flow_project берёт вместо
+    создания своего; неиспользованные удаляются в конце сессии
+    """
+    count = request.config.getoption("preprovision_projects", 0)
+    if count <= 0 or os.getenv("EXISTING_PROJECT_CODE"):
+        yield []
+        return
+    prefix = flow_project_prefix()
+    codes = preprovision_projects(count, prefix)
+    yield codes
+
+    for code in codes:
+        try:
+            prj = get_project_by_code(code)
+            if prj and prj.get("id"):
+                delete_project_by_id(prj["id"])
+                print(f"[CLEANUP] Удален неиспользованный проект: {code}")
+        except Exception as e:
+            print(f"[CLEANUP] Ошибка при удалении проекта {code}: {e}")
+
+
+def get_worker_id():
+    """Идентификатор воркера pytest-xdist ("gw0", "gw1", ...) или None при обычном запуске"""
+    return os.getenv("PYTEST_XDIST_WORKER")
+
+
+# Метка текущего запуска, общая для контроллера и всех воркеров xdist
+SHARED_RUN_ID = None
+# Префикс кодов общих flow-проектов
+SHARED_PROJECT_PREFIX = "autotest_flow_shared_"
+
+
+def pytest_configure(config):
+    global SHARED_RUN_ID
+    artifacts.configure(config.getoption("artifacts", "on-failure"))
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput and "shared_run_id" in workerinput:
+        SHARED_RUN_ID = workerinput["shared_run_id"]
+    else:
+        SHARED_RUN_ID = uuid.uuid4().hex[:8]
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Передаём метку запуска воркерам xdist (хук вызывается на контроллере)"""
+    node.workerinput["shared_run_id"] = SHARED_RUN_ID
+
+
+def shared_project_code():
+    """Код общего проекта этого процесса: у каждого воркера xdist свой"""
+    return f"{SHARED_PROJECT_PREFIX}{SHARED_RUN_ID}_{get_worker_id() or 'main'}"
+
+
+def get_or_create_shared_project(login_page, shared_projects, via_ui=False):
+    """
+    Функция для получения или создания общего проекта между тестами flow.
+    Тесты одного процесса (воркера xdist) используют один проект,
+    у параллельных воркеров проекты свои.
+    shared_projects — коды созданных процессом проектов (session-фикстура).
+    via_ui — создавать проект через модальное окно, а не через API.
+    """
+    project_code = shared_project_code()
+    # Если проект уже создан - проверяем, что его не удалили
+    if project_code in shared_projects:
+        if get_project_by_code(project_code):
+            return project_code
+        shared_projects.remove(project_code)
+
+    project_title = f"Автотест Flow Shared {SHARED_RUN_ID} {get_worker_id() or 'main'}"
     repo_url = "git@gitlab.infra.b-pl.pro:ilya.kurilin/qa_auto_test.git"
-    
-    # Создаем проект через UI
-    from pages.project_page import ProjectPage
-    project_page = ProjectPage(login_page)
-    project_page.open_create_project_modal()
-    project_page.create_project(project_title, project_code, repo_url, "main")
-    project_page.wait_modal_close()
-    
-    # Сохраняем код проекта в файл для следующих тестов
-    try:
-        with open(SHARED_PROJECT_FILE, 'w') as f:
-            f.write(project_code)
-    except Exception:
-        pass
-    
+
+    provision_project(login_page, project_title, project_code, repo_url, "main", via_ui=via_ui)
+
+    shared_projects.append(project_code)
     return project_code
 
+
+@pytest.fixture(scope="session")
+def shared_projects():
+    """Коды общих проектов, созданных в этом процессе"""
+    return []
+
+
 @pytest.fixture(scope="function")
-def shared_flow_project(login_page):
+def shared_flow_project(login_page, shared_projects, request):
     """
     Фикстура для общего проекта между тестами flow.
     """
-    return get_or_create_shared_project(login_page)
+    return get_or_create_shared_project(login_page, shared_projects, via_ui=use_ui_project_creation(request))
+
+
+def delete_projects_by_prefix(prefix):
+    """Удаляет все проекты, код которых начинается с prefix"""
+    for prj in get_all_projects_via_api():
+        if prj.get("code", "").startswith(prefix) and prj.get("id"):
+            delete_project_by_id(prj["id"])
+            print(f"[CLEANUP] Удален общий проект: {prj['code']}")
+
 
 @pytest.fixture(scope="session", autouse=True)
-def cleanup_shared_project():
+def cleanup_shared_project(shared_projects):
     """
     Автоматически удаляет общий проект в конце сессии тестов
+    (каждый воркер xdist удаляет свой)
     """
     yield  # Выполняем все тесты
-    
-    # После выполнения всех тестов удаляем проект и файл
-    if os.path.exists(SHARED_PROJECT_FILE):
+
+    for project_code in shared_projects:
         try:
-            with open(SHARED_PROJECT_FILE, 'r') as f:
-                project_code = f.read().strip()
-            
             prj = get_project_by_code(project_code)
             if prj and prj.get("id"):
                 delete_project_by_id(prj["id"])
                 print(f"[CLEANUP] Удален общий проект: {project_code}")
-            
-            # Удаляем файл
-            os.remove(SHARED_PROJECT_FILE)
         except Exception as e:
-            print(f"[CLEANUP] Ошибка при удалении проекта: {e}")
-            # Все равно пытаемся удалить файл
-            try:
-                os.remove(SHARED_PROJECT_FILE)
-            except Exception:
-                pass 
\ No newline at end of file
+            print(f"[CLEANUP] Ошибка при удалении проекта {project_code}: {e}")
+
+
+# Замеры шагов: по файлу на процесс (воркер xdist), сводка на контроллере
+STEP_TIMINGS_DIR = Path(__file__).parent / "reports" / "step_timings"
+SLOWEST_STEPS_LIMIT = 50
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Результаты фаз теста в item.rep_setup / rep_call — для teardown фикстур"""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+
+def has_failed(item):
+    """Упал ли тест (setup или тело) — вызывается из teardown фикстур"""
+    return any(
+        getattr(item, f"rep_{when}", None) is not None and getattr(item, f"rep_{when}").failed
+        for when in ("setup", "call")
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    steps.set_current_test(item.nodeid)
+    outcome = yield
+    # Последний шаг теста длится до его конца
+    steps.close_open_step(ok=outcome.excinfo is None)
+    steps.set_current_test(None)
+
+
+# Длительность тестов этого запуска (setup + call + teardown), копится на контроллере
+TEST_DURATIONS = {}
+_TESTS_CALLED = set()
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    По истории длительности: самые долгие тесты первыми, с --shard K/N —
+    только тесты своего шарда. Под xdist каждый воркер получает тот же порядок
+    """
+    shard = config.getoption("shard", None)
+    if config.getoption("no_duration_order", False) and not shard:
+        return
+    history = test_durations.load_history()
+    nodeids = [item.nodeid for item in items]
+    if shard:
+        try:
+            index, count = test_durations.parse_shard(shard)
+        except ValueError as e:
+            raise pytest.UsageError(f"--shard: {e}")
+        keep = test_durations.plan_shards(nodeids, history, count)[index]["nodeids"]
+    else:
+        keep = test_durations.longest_first(nodeids, history)
+    if config.getoption("no_duration_order", False):
+        # Только шард, порядок тестов исходный
+        selected = set(keep)
+        keep = [nodeid for nodeid in nodeids if nodeid in selected]
+    selected = set(keep)
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    by_id = {item.nodeid: item for item in items}
+    items[:] = [by_id[nodeid] for nodeid in keep]
+
+
+def pytest_runtest_logreport(report):
+    if get_worker_id():
+        return
+    TEST_DURATIONS[report.nodeid] = TEST_DURATIONS.get(report.nodeid, 0.0) + report.duration
+    if report.when == "call":
+        _TESTS_CALLED.add(report.nodeid)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Сохраняем замеры шагов процесса; на контроллере — историю длительности
+    тестов и общие проекты этого запуска, оставшиеся от упавших воркеров
+    """
+    artifacts.flush()
+    if steps.STEP_LOG:
+        try:
+            steps.write_step_log(STEP_TIMINGS_DIR / f"{SHARED_RUN_ID}_{get_worker_id() or 'main'}.jsonl")
+        except OSError as e:
+            print(f"[WARN] Не удалось сохранить замеры шагов: {e}")
+
+    if getattr(session.config, "workerinput", None) is not None:
+        return
+
+    # Пропущенные на setup тесты не запускались — их длительность не показательна
+    durations = {nodeid: TEST_DURATIONS[nodeid] for nodeid in _TESTS_CALLED if nodeid in TEST_DURATIONS}
+    if durations:
+        try:
+            test_durations.update_history(durations)
+        except OSError as e:
+            print(f"[WARN] Не удалось сохранить историю длительности тестов: {e}")
+
+    if not getattr(session.config.option, "numprocesses", None):
+        return
+    try:
+        delete_projects_by_prefix(f"{SHARED_PROJECT_PREFIX}{SHARED_RUN_ID}_")
+    except Exception as e:
+        print(f"[CLEANUP] Ошибка при удалении проектов запуска {SHARED_RUN_ID}: {e}")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Самые медленные шаги по всем процессам запуска"""
+    if getattr(config, "workerinput", None) is not None:
+        return
+    paths = sorted(STEP_TIMINGS_DIR.glob(f"{SHARED_RUN_ID}_*.jsonl"))
+    records = steps.read_step_logs(paths) if paths else []
+    if not records:
+        return
+    terminalreporter.write_sep("=", f"top {SLOWEST_STEPS_LIMIT} slowest steps")
+    for line in steps.format_slowest(records, SLOWEST_STEPS_LIMIT).splitlines():
+        terminalreporter.write_line(line)
+    terminalreporter.write_line(f"Замеры: {', '.join(str(p) for p in paths)}")
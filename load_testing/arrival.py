@@ -0,0 +1,159 @@
+"""Open-loop (constant-arrival-rate) scheduling for the locustfiles.
+
+The default ``ApiUser`` is closed-loop: every user waits for its response and
+then sleeps, so a slow ``/bps/call`` silently lowers the offered load. With
+``LOAD_RPS_SCHEDULE`` set, a single dispatcher user per process issues
+requests on a fixed timetable instead and hands each one its *intended*
+start time, which is what coordinated-omission-corrected latency is
+measured from.
+
+Schedule syntax (comma-separated segments, durations in seconds)::
+
+    200                  constant 200 RPS until Locust stops
+    50x30,100x30,200x60  steps: 50 RPS for 30s, then 100, then 200
+    10-300x120           linear ramp from 10 to 300 RPS over 120s
+    50x60,500x10,50x60   spike to 500 RPS for 10s
+
+The last segment's final rate is held after the schedule ends. A final
+rate of 0 (``100x60,0``) stops issuing requests: the dispatcher then idles
+until Locust stops the run (``-t``/``--run-time`` or the UI) instead of
+returning, because a returning task would be rescheduled and the timetable
+would start over from t=0.
+``LOAD_RPS_DIVISOR`` splits the rate between several generator processes.
+
+Slots skipped at ``LOAD_MAX_IN_FLIGHT`` have no latency. ``report_skipped``
+counts them under their own name (``"POST /bps/call (skipped)"`` in Locust
+stats, ``SKIPPED_COUNTER`` in the histogram file) so they never show up as
+0 ms samples of the real endpoint.
+"""
+import os
+import time
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import gevent
+from gevent.pool import Group
+
+
+RPS_SCHEDULE = os.getenv("LOAD_RPS_SCHEDULE", "").strip()
+RPS_DIVISOR = max(1, int(os.getenv("LOAD_RPS_DIVISOR", "1")))
+MAX_IN_FLIGHT = int(os.getenv("LOAD_MAX_IN_FLIGHT", "0"))
+
+SKIPPED_SUFFIX = " (skipped)"
+SKIPPED_COUNTER = "skipped_at_max_in_flight"
+
+
+class RateSchedule:
+    """Piecewise-linear RPS curve: ``(rate_from, rate_to, duration_s)`` segments."""
+
+    def __init__(self, segments: List[Tuple[float, float, Optional[float]]]):
+        if not segments:
+            raise ValueError("empty RPS schedule")
+        self.segments = segments
+
+    @classmethod
+    def parse(cls, spec: str, divisor: int = 1) -> "RateSchedule":
+        segments: List[Tuple[float, float, Optional[float]]] = []
+        for part in spec.replace(" ", "").split(","):
+            if not part:
+                continue
+            rate_part, _, duration_part = part.partition("x")
+            duration = float(duration_part) if duration_part else None
+            if "-" in rate_part:
+                r_from, r_to = (float(x) for x in rate_part.split("-", 1))
+            else:
+                r_from = r_to = float(rate_part)
+            if r_from < 0 or r_to < 0 or (duration is not None and duration <= 0):
+                raise ValueError(f"invalid RPS schedule segment: {part!r}")
+            segments.append((r_from / divisor, r_to / divisor, duration))
+        for _, _, duration in segments[:-1]:
+            if duration is None:
+                raise ValueError(f"only the last segment may omit a duration: {spec!r}")
+        return cls(segments)
+
+    def rate_at(self, t: float) -> float:
+        """Target RPS at ``t`` seconds since the start of the schedule."""
+        offset = 0.0
+        for r_from, r_to, duration in self.segments:
+            if duration is None or t < offset + duration:
+                if duration is None:
+                    return r_to
+                return r_from + (r_to - r_from) * (t - offset) / duration
+            offset += duration
+        return self.segments[-1][1]
+
+    def _next_change(self, t: float) -> Optional[float]:
+        offset = 0.0
+        for _, _, duration in self.segments:
+            if duration is None:
+                return None
+            offset += duration
+            if t < offset:
+                return offset
+        return None
+
+    def arrivals(self) -> Iterator[float]:
+        """Intended start offsets (seconds) of every request, in order."""
+        # Integrate the rate in small steps so ramps starting from ~0 RPS
+        # are not skipped over by a single huge 1/rate gap.
+        t = 0.0
+        credit = 1.0
+        while True:
+            rate = self.rate_at(t)
+            if rate <= 0 and self._next_change(t) is None:
+                return
+            if credit >= 1.0:
+                credit -= 1.0
+                yield t
+                continue
+            step = min(0.01, 1.0 / rate) if rate > 0 else 0.01
+            credit += (rate + self.rate_at(t + step)) / 2 * step
+            t += step
+
+
+def run_open_loop(
+    schedule: RateSchedule,
+    fire: Callable[[float], None],
+    on_skip: Optional[Callable[[float], None]] = None,
+    max_in_flight: int = MAX_IN_FLIGHT,
+) -> None:
+    """Spawn ``fire(intended_start_epoch_s)`` on the timetable, never waiting for responses.
+
+    Requests that are late (the generator fell behind) fire immediately with
+    their original intended time. When ``max_in_flight`` is set and reached,
+    the slot is passed to ``on_skip`` instead of blocking the timetable.
+    """
+    group = Group()
+    t0 = time.monotonic()
+    wall0 = time.time()
+    try:
+        for offset in schedule.arrivals():
+            delay = t0 + offset - time.monotonic()
+            if delay > 0:
+                gevent.sleep(delay)
+            intended = wall0 + offset
+            if max_in_flight and len(group) >= max_in_flight:
+                if on_skip is not None:
+                    on_skip(intended)
+                continue
+            group.spawn(fire, intended)
+        group.join()
+        # Timetable exhausted (final rate 0): hold here until Locust kills the
+        # user, otherwise the task would be rescheduled and restart from t=0.
+        while True:
+            gevent.sleep(3600)
+    finally:
+        group.kill(block=False)
+
+
+def report_skipped(environment, histograms, name: str, request_type: str = "POST") -> None:
+    """Record a slot skipped at ``max_in_flight`` under ``name + SKIPPED_SUFFIX``, not as a 0 ms sample of ``name``."""
+    histograms.count(SKIPPED_COUNTER)
+    environment.events.request.fire(
+        request_type=request_type,
+        name=f"{name}{SKIPPED_SUFFIX}",
+        response_time=0,
+        response_length=0,
+        response=None,
+        context={},
+        exception=RuntimeError("skipped: LOAD_MAX_IN_FLIGHT reached"),
+    )
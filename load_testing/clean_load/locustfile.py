@@ -1,13 +1,22 @@
 import csv
 import os
+import sys
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
-from locust import HttpUser, task, between
+from locust import task, between, constant, events
 
 # Base dir = folder of this file
 BASE_DIR = Path(__file__).parent.resolve()
+# Shared helpers (log_sink, ...) live one level up in load_testing/
+sys.path.insert(0, str(BASE_DIR.parent))
+from arrival import RPS_DIVISOR, RPS_SCHEDULE, RateSchedule, report_skipped, run_open_loop  # noqa: E402
+from http_client import CONNECTION_HEADERS, BaseApiUser  # noqa: E402
+from latency_histogram import HistogramSet  # noqa: E402
+from log_sink import sink  # noqa: E402
+from objid_time import format_date, format_time  # noqa: E402
+
 LOGS = BASE_DIR / "locust_logs"
 LOGS.mkdir(parents=True, exist_ok=True)
 
@@ -17,6 +26,10 @@ CSV_REQUESTS = LOGS / f"requests_{RUN_TS}.csv"
 CSV_EVENTS = LOGS / f"events_{RUN_TS}.csv"
 CSV_RESPONSES = LOGS / f"jobs_from_responses_{RUN_TS}.csv"
 
+# Latency histograms (µs), one file per process; merged by latency_histogram.py
+HIST_DIR = Path(os.getenv("LOCUST_HIST_DIR", str(LOGS)))
+histograms = HistogramSet(["response_time", "corrected_response_time", "job_duration"])
+
 
 def write_header(path: Path, header: list[str]) -> None:
     with path.open("w", newline="", encoding="utf-8") as f:
@@ -26,38 +39,51 @@ def write_header(path: Path, header: list[str]) -> None:
 write_header(CSV_REQUESTS, [
     "timestamp_start_ms", "timestamp_start_iso", "timestamp_end_ms", "timestamp_end_iso",
     "response_time_ms", "method", "name", "path", "status_code", "success", "request_id", "exception",
+    "intended_start_ms", "corrected_response_time_ms",
 ])
 write_header(CSV_EVENTS, ["event_type", "event_date", "event_time", "status_code", "duration_ms", "request_id"])
 write_header(CSV_RESPONSES, ["request_id", "object_id", "status", "path", "started_at", "finished_at", "job_duration", "job_uuid"])
 
 
-class ApiUser(HttpUser):
+class ApiUser(BaseApiUser):
     host = os.getenv("BASE_URL", "http://127.0.0.1:8000").rstrip("/")
     wait_time = between(1, 2)
+    # Open-loop mode (LOAD_RPS_SCHEDULE) is served by OpenLoopApiUser
+    abstract = bool(RPS_SCHEDULE)
 
     def on_start(self):
-        self.default_headers = {"Content-Type": "application/json"}
+        self.default_headers = {"Content-Type": "application/json", **CONNECTION_HEADERS}
 
     @task
     def call_bps(self):
+        self.send_bps_call()
+
+    def send_bps_call(self, intended_start: float = None):
         request_id = str(uuid.uuid4())
         path = "/api/ide/llda/branch/main/bps/call?path=test_que/test_1.df.json"
 
         start_dt_utc = datetime.now(timezone.utc)
         start_ms = int(start_dt_utc.timestamp() * 1000)
-        started_date = start_dt_utc.strftime("%d.%m.%Y")
-        started_time = f"{start_dt_utc.strftime('%H:%M:%S')}.{start_dt_utc.strftime('%f')[:5]}Z"
+        intended_ms = int(intended_start * 1000) if intended_start is not None else start_ms
+        started_date = format_date(start_dt_utc)
+        started_time = format_time(start_dt_utc)
         object_id = f"{started_date} {started_time}"
 
         # STARTED event
-        with CSV_EVENTS.open("a", newline="", encoding="utf-8") as fe:
-            csv.writer(fe).writerow(["STARTED", started_date, started_time, "", "", request_id])
+        sink.write(CSV_EVENTS, ["STARTED", started_date, started_time, "", "", request_id])
 
         payload = {"request_meta": {"object_id": object_id, "request_id": request_id}, "request_data": {}}
         with self.client.post(path, json=payload, headers=self.default_headers, name="POST /bps/call", catch_response=True) as resp:
             end_dt_utc = datetime.now(timezone.utc)
             end_ms = int(end_dt_utc.timestamp() * 1000)
             response_time_ms = end_ms - start_ms
+            corrected_response_time_ms = end_ms - intended_ms
+            response_time_us = int((end_dt_utc - start_dt_utc).total_seconds() * 1_000_000)
+            histograms.record("response_time", response_time_us)
+            histograms.record(
+                "corrected_response_time",
+                int((end_dt_utc.timestamp() - intended_start) * 1_000_000) if intended_start is not None else response_time_us,
+            )
 
             if 200 <= resp.status_code < 400:
                 resp.success()
@@ -73,24 +99,49 @@ class ApiUser(HttpUser):
                 data = resp.json()
                 job = data if isinstance(data, dict) else (data[0] if isinstance(data, list) and data else {})
                 if isinstance(job, dict):
-                    with CSV_RESPONSES.open("a", newline="", encoding="utf-8") as fr:
-                        csv.writer(fr).writerow([
-                            job.get("request_id", request_id), job.get("object_id", object_id), job.get("status"),
-                            job.get("path"), job.get("started_at"), job.get("finished_at"), job.get("job_duration"), job.get("job_uuid"),
-                        ])
+                    job_duration = job.get("job_duration")
+                    if job_duration is not None:
+                        try:
+                            # Длительность может прийти строкой с дробной частью ("12.5")
+                            histograms.record("job_duration", int(float(job_duration) * 1000))
+                        except (TypeError, ValueError, OverflowError):
+                            pass
+                    sink.write(CSV_RESPONSES, [
+                        job.get("request_id", request_id), job.get("object_id", object_id), job.get("status"),
+                        job.get("path"), job.get("started_at"), job.get("finished_at"), job.get("job_duration"), job.get("job_uuid"),
+                    ])
             except Exception:
                 pass
 
             # Requests log
-            with CSV_REQUESTS.open("a", newline="", encoding="utf-8") as fq:
-                csv.writer(fq).writerow([
-                    start_ms, start_dt_utc.isoformat(), end_ms, end_dt_utc.isoformat(), response_time_ms,
-                    "POST", "POST /bps/call", path, resp.status_code, success, request_id, exc,
-                ])
+            sink.write(CSV_REQUESTS, [
+                start_ms, start_dt_utc.isoformat(), end_ms, end_dt_utc.isoformat(), response_time_ms,
+                "POST", "POST /bps/call", path, resp.status_code, success, request_id, exc,
+                intended_ms, corrected_response_time_ms,
+            ])
 
             # FINISHED event
-            finished_date = end_dt_utc.strftime("%d.%m.%Y")
-            finished_time = f"{end_dt_utc.strftime('%H:%M:%S')}.{end_dt_utc.strftime('%f')[:5]}Z"
-            with CSV_EVENTS.open("a", newline="", encoding="utf-8") as fe:
-                csv.writer(fe).writerow(["FINISHED", finished_date, finished_time, resp.status_code, response_time_ms, request_id])
+            finished_date = format_date(end_dt_utc)
+            finished_time = format_time(end_dt_utc)
+            sink.write(CSV_EVENTS, ["FINISHED", finished_date, finished_time, resp.status_code, response_time_ms, request_id])
+
+
+class OpenLoopApiUser(ApiUser):
+    """Issues /bps/call on the LOAD_RPS_SCHEDULE timetable regardless of response times."""
+    abstract = not RPS_SCHEDULE
+    # One dispatcher per generator process; LOAD_RPS_DIVISOR splits the rate between them
+    fixed_count = RPS_DIVISOR
+    wait_time = constant(0)
+
+    @task
+    def call_bps(self):
+        run_open_loop(RateSchedule.parse(RPS_SCHEDULE, RPS_DIVISOR), self.send_bps_call, on_skip=self._report_skipped)
+
+    def _report_skipped(self, intended_start: float):
+        report_skipped(self.environment, histograms, "POST /bps/call")
+
+
+# Final flush of buffered logs on test stop / locust exit
+sink.attach(events)
+histograms.attach(events, HIST_DIR)
 
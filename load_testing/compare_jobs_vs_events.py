@@ -3,12 +3,32 @@ import json
 import sys
 import os
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Iterator, NamedTuple, Optional, Sequence
 import datetime as dt
 import html
 import csv as _csv
 import argparse
+import heapq
+import itertools
+import operator
+import re
+import shutil
+import sqlite3
+import tempfile
+from collections import OrderedDict
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: compare_times falls back to the per-row path
+    np = None
+
+# objid_time.py / run_log.py (shared with the locustfiles) live in load_testing/
+for _helpers_dir in (Path(__file__).parent, Path(__file__).parent.parent / "load_testing"):
+    if (_helpers_dir / "objid_time.py").exists():
+        sys.path.insert(0, str(_helpers_dir))
+        break
+from objid_time import format_object_id_ms, parse_event_time, parse_object_id, parse_object_id_us  # noqa: E402
+from run_log import RUN_LOG_GLOB, concat_run_logs, epoch_ms, iter_response_view  # noqa: E402
 
 # Determine base directory (can be overridden for load/ usage)
 base_dir_env = os.getenv('BASE_DIR')
@@ -22,10 +42,14 @@ def load_started_events(events_csv_path: Path) -> Dict[str, dt.datetime]:
     """Load STARTED events from requests_events.csv and map request_id -> datetime (naive UTC).
     Time format in CSV: date=DD.MM.YYYY, time=HH:MM:SS.fffff (optionally with trailing 'Z').
     """
-    request_id_to_started: Dict[str, dt.datetime] = {}
+    return dict(iter_started_events(events_csv_path))
+
+
+def iter_started_events(events_csv_path: Path) -> Iterator[Tuple[str, dt.datetime]]:
+    """Yield (request_id, started datetime) for STARTED rows in file order."""
     with events_csv_path.open("r", encoding="utf-8") as f:
         reader = csv.reader(f)
-        header = next(reader, None)
+        next(reader, None)
         for row in reader:
             if not row or len(row) < 6:
                 continue
@@ -33,13 +57,8 @@ def load_started_events(events_csv_path: Path) -> Dict[str, dt.datetime]:
             if event_type != "STARTED":
                 continue
             rid = row[5]
-            time_no_z = event_time.rstrip("Z")
             # Naive datetime (treat as UTC for comparison)
-            started_dt = dt.datetime.strptime(
-                f"{event_date} {time_no_z}", "%d.%m.%Y %H:%M:%S.%f"
-            )
-            request_id_to_started[rid] = started_dt
-    return request_id_to_started
+            yield rid, parse_event_time(event_date, event_time)
 
 
 def load_jobs(jobs_json_path: Path) -> List[Dict[str, Any]]:
@@ -65,28 +84,105 @@ def load_jobs(jobs_json_path: Path) -> List[Dict[str, Any]]:
 
 def load_jobs_from_responses_csv(path: Path) -> List[Dict[str, Any]]:
     """Load jobs from locust-captured CSV (jobs_from_responses.csv)."""
-    jobs: List[Dict[str, Any]] = []
+    return list(iter_jobs_from_responses_csv(path))
+
+
+def iter_jobs_from_responses_csv(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield jobs from locust-captured CSV one by one, in file order."""
     with path.open("r", encoding="utf-8") as f:
         reader = _csv.DictReader(f)
         for row in reader:
-            # Normalize to API-like schema
-            jobs.append({
-                "request_id": row.get("request_id"),
-                "object_id": row.get("object_id"),
-                "status": row.get("status"),
-                "path": row.get("path"),
-                "started_at": row.get("started_at"),
-                "finished_at": row.get("finished_at"),
-                "job_duration": (int(row.get("job_duration")) if (row.get("job_duration") and row.get("job_duration").isdigit()) else row.get("job_duration")),
-                "job_uuid": row.get("job_uuid"),
-            })
-    return jobs
+            yield job_from_response_row(row)
+
+
+def job_from_response_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a jobs_from_responses row (strings as read back from CSV) to API-like schema."""
+    return {
+        "request_id": row.get("request_id"),
+        "object_id": row.get("object_id"),
+        "status": row.get("status"),
+        "path": row.get("path"),
+        "started_at": row.get("started_at"),
+        "finished_at": row.get("finished_at"),
+        "job_duration": (int(row.get("job_duration")) if (row.get("job_duration") and row.get("job_duration").isdigit()) else row.get("job_duration")),
+        "job_uuid": row.get("job_uuid"),
+    }
+
+
+def iter_run_log(path: Path) -> Iterator[Tuple[str, Optional[Dict[str, Any]], dt.datetime, Dict[str, int]]]:
+    """Yield (request_id, job or None, STARTED datetime, request metrics) per record of a run log.
+
+    Values are exactly what the legacy CSVs would read back as: the STARTED
+    event keeps 5 fractional digits, job fields come back as strings.
+    """
+    epoch = dt.datetime(1970, 1, 1)
+    for rid, row, start_us, end_us in iter_response_view(path):
+        start_ms = epoch_ms(start_us)
+        end_ms = epoch_ms(end_us)
+        job = job_from_response_row(dict(zip(RESPONSES_CSV_COLS, row))) if row is not None else None
+        started = epoch + dt.timedelta(microseconds=start_us - start_us % 10)
+        yield rid, job, started, {
+            "response_time_ms": end_ms - start_ms,
+            "timestamp_end_ms": end_ms,
+            "timestamp_start_ms": start_ms,
+        }
+
+
+def load_run_log(path: Path) -> Tuple[Dict[str, dt.datetime], List[Dict[str, Any]], Dict[str, Dict[str, int]]]:
+    """started_map, jobs and request metrics from a packed run log (see run_log.py)."""
+    started_map: Dict[str, dt.datetime] = {}
+    jobs: List[Dict[str, Any]] = []
+    req_metrics: Dict[str, Dict[str, int]] = {}
+    for rid, job, started, metrics in iter_run_log(path):
+        started_map[rid] = started
+        req_metrics[rid] = metrics
+        if job is not None:
+            jobs.append(job)
+    # Same restriction as the CSV path: metrics only for request_ids seen in responses
+    response_request_ids = {job["request_id"] for job in jobs if job["request_id"]}
+    if response_request_ids:
+        req_metrics = {rid: m for rid, m in req_metrics.items() if rid in response_request_ids}
+    return started_map, jobs, req_metrics
+
+
+RESPONSES_CSV_COLS = ["request_id", "object_id", "status", "path", "started_at", "finished_at", "job_duration", "job_uuid"]
+
+
+def iter_request_metrics(requests_csv: Path) -> Iterator[Tuple[str, Dict[str, int]]]:
+    """Yield (request_id, metrics) from requests.csv in file order.
+    metrics: response_time_ms, timestamp_end_ms and (if present) timestamp_start_ms.
+    """
+    with requests_csv.open("r", encoding="utf-8") as rf:
+        reader = csv.reader(rf)
+        header = next(reader, None) or []
+        try:
+            idx_request_id = header.index("request_id")
+            idx_response_time = header.index("response_time_ms")
+            idx_end_ms = header.index("timestamp_end_ms")
+        except ValueError:
+            return
+        idx_start_ms = header.index("timestamp_start_ms") if "timestamp_start_ms" in header else -1
+        for row in reader:
+            if not row or len(row) <= max(idx_request_id, idx_response_time, idx_end_ms):
+                continue
+            try:
+                resp_ms = int(float(row[idx_response_time]))
+                end_ms = int(float(row[idx_end_ms]))
+                start_ms = int(float(row[idx_start_ms])) if idx_start_ms >= 0 else None
+            except Exception:
+                continue
+            yield row[idx_request_id], {
+                "response_time_ms": resp_ms,
+                "timestamp_end_ms": end_ms,
+                **({"timestamp_start_ms": start_ms} if start_ms is not None else {}),
+            }
 
 
 def compare_times(
     started_map: Dict[str, dt.datetime],
     jobs: List[Dict[str, Any]],
     req_metrics: Dict[str, Dict[str, int]],
+    columnar: Optional[bool] = None,
 ) -> List[Dict[str, Any]]:
     """For each matching request_id compute:
     - delta_started_at_vs_object_id_ms
@@ -94,97 +190,1393 @@ def compare_times(
     - delta_job_duration_vs_object_to_response_end_ms (job_duration - (response_end - object_id))
     Also keep previous deltas for reference.
     Returns list of dict rows for easy printing/analysis.
+    columnar: use the NumPy path (default: whenever numpy is installed).
     """
+    if columnar is None:
+        columnar = np is not None
+    if columnar:
+        return compare_times_columnar(started_map, jobs, req_metrics).rows()
     results: List[Dict[str, Any]] = []
     for job in jobs:
         rid = job.get("request_id")
-        obj = job.get("object_id")  # "DD.MM.YYYY HH:MM:SS.fffff"
-        sa = job.get("started_at")  # ISO UTC string
-        fa = job.get("finished_at")  # ISO UTC string
-        job_duration = job.get("job_duration")  # already in ms per API
-        if not rid or not obj or not sa or rid not in started_map or not fa:
+        if not rid or rid not in started_map:
             continue
+        row = compare_job(job, started_map[rid], req_metrics.get(rid))
+        if row is not None:
+            results.append(row)
 
-        # object_id может быть с суффиксом 'Z' (UTC). Уберём 'Z' при парсинге.
-        try:
-            obj_dt = dt.datetime.strptime(obj.rstrip('Z'), "%d.%m.%Y %H:%M:%S.%f")
-        except Exception:
-            continue
+    # Sort by absolute delta vs started_at
+    results.sort(key=result_sort_key)
+    return results
 
-        try:
-            sa_dt = dt.datetime.fromisoformat(sa)
-        except Exception:
-            continue
 
-        # Normalize started_at/finished_at to naive UTC for difference
-        if sa_dt.tzinfo is not None:
-            sa_dt = sa_dt.astimezone(dt.timezone.utc).replace(tzinfo=None)
-        try:
-            fa_dt = dt.datetime.fromisoformat(fa)
-            if fa_dt.tzinfo is not None:
-                fa_dt = fa_dt.astimezone(dt.timezone.utc).replace(tzinfo=None)
-        except Exception:
+def result_sort_key(row: Dict[str, Any]) -> int:
+    return abs(row["delta_started_at_vs_event_ms"])
+
+
+def compare_job(
+    job: Dict[str, Any],
+    ev_dt: dt.datetime,
+    rm: Optional[Dict[str, int]],
+) -> Optional[Dict[str, Any]]:
+    """Compute the compare_times row for a single job joined with its STARTED event
+    and (optional) locust request metrics. Returns None if the job can't be parsed.
+    """
+    rid = job.get("request_id")
+    obj = job.get("object_id")  # "DD.MM.YYYY HH:MM:SS.fffff"
+    sa = job.get("started_at")  # ISO UTC string
+    fa = job.get("finished_at")  # ISO UTC string
+    job_duration = job.get("job_duration")  # already in ms per API
+    if not rid or not obj or not sa or not fa:
+        return None
+
+    # object_id может быть с суффиксом 'Z' (UTC). Уберём 'Z' при парсинге.
+    try:
+        obj_dt = parse_object_id(obj)
+    except Exception:
+        return None
+
+    try:
+        sa_dt = dt.datetime.fromisoformat(sa)
+    except Exception:
+        return None
+
+    # Normalize started_at/finished_at to naive UTC for difference
+    if sa_dt.tzinfo is not None:
+        sa_dt = sa_dt.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    try:
+        fa_dt = dt.datetime.fromisoformat(fa)
+        if fa_dt.tzinfo is not None:
+            fa_dt = fa_dt.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    except Exception:
+        return None
+
+    d_started_ms = int((sa_dt - ev_dt).total_seconds() * 1000)
+    d_object_ms = int((obj_dt - ev_dt).total_seconds() * 1000)
+    db_duration_ms = int((fa_dt - sa_dt).total_seconds() * 1000)
+
+    # Locust metrics
+    response_time_ms = rm.get("response_time_ms", -1) if rm else -1
+    end_ms = rm.get("timestamp_end_ms") if rm else None
+
+    # Compute response_end time if available
+    response_end_dt = None
+    if end_ms is not None:
+        # end_ms is epoch ms UTC
+        response_end_dt = dt.datetime.utcfromtimestamp(end_ms / 1000.0)
+
+    # Derived comparisons per requirements
+    delta_started_at_vs_object_id_ms = int((sa_dt - obj_dt).total_seconds() * 1000)
+    delta_finished_at_vs_response_end_ms = (
+        int((fa_dt - response_end_dt).total_seconds() * 1000)
+        if response_end_dt is not None
+        else None
+    )
+    delta_object_id_to_response_end_ms = (
+        int((response_end_dt - obj_dt).total_seconds() * 1000)
+        if response_end_dt is not None
+        else None
+    )
+    delta_job_duration_vs_object_to_response_end_ms = (
+        (int(job_duration) - delta_object_id_to_response_end_ms)
+        if (job_duration is not None and delta_object_id_to_response_end_ms is not None)
+        else None
+    )
+
+    return {
+        "request_id": rid,
+        "delta_started_at_vs_event_ms": d_started_ms,
+        "delta_object_id_vs_event_ms": d_object_ms,
+        "locust_response_time_ms": response_time_ms,
+        "db_duration_ms": db_duration_ms,
+        "delta_resp_vs_db_ms": (response_time_ms - db_duration_ms) if response_time_ms >= 0 else None,
+        "delta_started_at_vs_object_id_ms": delta_started_at_vs_object_id_ms,
+        "delta_finished_at_vs_response_end_ms": delta_finished_at_vs_response_end_ms,
+        "delta_object_id_to_response_end_ms": delta_object_id_to_response_end_ms,
+        "delta_job_duration_vs_object_to_response_end_ms": delta_job_duration_vs_object_to_response_end_ms,
+        # raw values for the report
+        "event": ev_dt.isoformat(sep=" "),
+        "object_id": obj_dt.isoformat(sep=" "),
+        "started_at": sa,
+        "finished_at": fa,
+        "response_end": (response_end_dt.isoformat(sep=" ") if response_end_dt is not None else None),
+        "job_duration": (int(job_duration) if isinstance(job_duration, str) and job_duration.isdigit() else job_duration),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Columnar path: cut the CSV fields straight into byte matrices, parse whole
+# timestamp columns into int64 epoch-µs arrays and compute every delta_* as
+# array arithmetic. Rows that don't match the strict fixed layouts below are
+# handed to compare_job, so results stay identical.
+# ---------------------------------------------------------------------------
+
+_EPOCH = dt.datetime(1970, 1, 1)
+_ONE_US = dt.timedelta(microseconds=1)
+# Job fields compare_job reads
+_JOB_KEYS = ("request_id", "object_id", "started_at", "finished_at", "job_duration")
+
+
+class TextColumn(NamedTuple):
+    """A string column as a byte matrix, so layouts are checked and parsed without str objects.
+
+    chars: (n, width) uint8, the UTF-8 bytes zero-padded to a multiple of 8; lengths: bytes
+    per row, -1 where the value is not a str; values: the original objects when the column
+    was built from Python values (None when it was cut straight out of a CSV).
+    """
+    chars: Any
+    lengths: Any
+    values: Optional[List[Any]] = None
+
+
+def _width(lengths) -> int:
+    """Smallest multiple of 8 (at least 8) that holds every value."""
+    longest = int(lengths.max()) if len(lengths) else 0
+    return max(8, -(-longest // 8) * 8)
+
+
+def text_column(values: List[Any]) -> TextColumn:
+    """TextColumn of Python values; anything but a str gets length -1."""
+    n = len(values)
+    if set(map(type, values)) <= {str}:
+        encoded = [v.encode("utf-8", "surrogatepass") for v in values]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+    else:
+        encoded = [v.encode("utf-8", "surrogatepass") if type(v) is str else b"" for v in values]
+        lengths = np.fromiter((len(b) if type(v) is str else -1 for v, b in zip(values, encoded)), dtype=np.int64, count=n)
+    width = _width(lengths)
+    return TextColumn(np.array(encoded, dtype=f"S{width}").view(np.uint8).reshape(n, width), lengths, values)
+
+
+def _take(col: TextColumn, rows) -> TextColumn:
+    values = None if col.values is None else list(map(col.values.__getitem__, rows.tolist()))
+    return TextColumn(col.chars[rows], col.lengths[rows], values)
+
+
+def _decode(col: TextColumn, rows=None) -> List[Any]:
+    """Values of the column (or of ``rows``) as Python objects."""
+    if col.values is not None:
+        return list(col.values) if rows is None else list(map(col.values.__getitem__, rows.tolist()))
+    chars = col.chars if rows is None else col.chars[rows]
+    # Cut from a CSV without NULs, so trimming the S view's trailing NULs is exact
+    return [b.decode("utf-8") for b in chars.view(f"S{chars.shape[1]}").ravel().tolist()]
+
+
+def _all_words(ok):
+    """Rows of an (n, k) bool matrix that are all True."""
+    k = ok.shape[1]
+    if k in (1, 2, 4, 8):
+        return ok.view(f"u{k}").ravel() == int.from_bytes(b"\1" * k, "little")
+    return ok.all(axis=1)
+
+
+def _equals(col: TextColumn, value: bytes):
+    """Rows holding exactly ``value``."""
+    width = col.chars.shape[1]
+    if len(value) > width:
+        return np.zeros(len(col.lengths), dtype=bool)
+    target = np.frombuffer(value.ljust(width, b"\0"), dtype=np.uint64)
+    return _all_words(col.chars.view(np.uint64) == target) & (col.lengths == len(value))
+
+
+def _matches(chars, template: bytes):
+    """Rows of ``chars`` that hold ``template``, where b"9" stands for any ASCII digit.
+
+    One wrapping uint8 subtraction per byte: a digit byte minus b"0" is at most 9 and
+    every other byte (including the zero padding) minus its template byte is 0.
+    """
+    n, width = chars.shape
+    t = np.frombuffer(template.ljust(width, b"\0"), dtype=np.uint8)
+    digit = t == ord("9")
+    low = np.where(digit, ord("0"), t).astype(np.uint8)
+    span = np.where(digit, 9, 0).astype(np.uint8)
+    inside = np.empty((n, width), dtype=bool)
+    # Broadcasting one short row leaves NumPy an inner loop of `width` bytes; tile it over blocks of rows
+    block = 64
+    tiled = n // block * block
+    if tiled:
+        rows = np.ascontiguousarray(chars[:tiled]).reshape(-1, block * width)
+        out = inside[:tiled].reshape(-1, block * width)
+        np.less_equal(rows - np.tile(low, block), np.tile(span, block), out=out)
+    inside[tiled:] = (chars[tiled:] - low) <= span
+    return _all_words(inside.view(np.uint64) == np.uint64(0x0101010101010101))
+
+
+def _digits(chars, start: int, stop: int):
+    """Decimal value of the (already checked) digit columns [start, stop), as int64."""
+    # Accumulate in the narrowest type that holds stop - start digits, widen once
+    width = stop - start
+    value = chars[:, start].astype(np.int16 if width <= 4 else np.int32 if width <= 9 else np.int64) - 48
+    for k in range(start + 1, stop):
+        value = value * 10 + (chars[:, k] - np.uint8(48))
+    return value.astype(np.int64, copy=False)
+
+
+def _template(raw: bytes) -> bytes:
+    return re.sub(rb"[0-9]", b"9", raw)
+
+
+def _by_layout(col: TextColumn, pattern: "re.Pattern[bytes]", parse):
+    """(int64 values, ok mask) of a column whose rows follow a few fixed layouts.
+
+    The layout of the first unparsed row (its bytes with every digit turned into b"9",
+    if it matches ``pattern``) is checked on all remaining rows at once and
+    ``parse(chars, template) -> (values, ok)`` runs on the rows that have it. Rows
+    matching no layout are left not ok.
+    """
+    n = len(col.lengths)
+    values = np.zeros(n, dtype=np.int64)
+    ok = np.zeros(n, dtype=bool)
+    known = col.lengths >= 0
+    whole = bool(known.all())
+    rest = np.arange(n) if whole else np.flatnonzero(known)
+    while len(rest):
+        i = int(rest[0])
+        raw = bytes(col.chars[i, :col.lengths[i]])
+        if not pattern.fullmatch(raw):
+            rest, whole = rest[1:], False
             continue
+        template = _template(raw)
+        chars = col.chars if whole else col.chars[rest]
+        hit = _matches(chars, template)
+        # parse() is plain arithmetic, so running it over the misses too is cheaper than a copy
+        value, valid = parse(chars, template)
+        if whole:
+            if hit.all():
+                return value, valid
+            values, ok = value, valid & hit
+        else:
+            rows = rest[hit]
+            values[rows], ok[rows] = value[hit], valid[hit]
+        rest, whole = rest[~hit], False
+    return values, ok
 
-        ev_dt = started_map[rid]
-        d_started_ms = int((sa_dt - ev_dt).total_seconds() * 1000)
-        d_object_ms = int((obj_dt - ev_dt).total_seconds() * 1000)
-        db_duration_ms = int((fa_dt - sa_dt).total_seconds() * 1000)
-
-        # Locust metrics
-        rm = req_metrics.get(rid)
-        response_time_ms = rm.get("response_time_ms", -1) if rm else -1
-        end_ms = rm.get("timestamp_end_ms") if rm else None
-
-        # Compute response_end time if available
-        response_end_dt = None
-        if end_ms is not None:
-            # end_ms is epoch ms UTC
-            response_end_dt = dt.datetime.utcfromtimestamp(end_ms / 1000.0)
-
-        # Derived comparisons per requirements
-        delta_started_at_vs_object_id_ms = int((sa_dt - obj_dt).total_seconds() * 1000)
-        delta_finished_at_vs_response_end_ms = (
-            int((fa_dt - response_end_dt).total_seconds() * 1000)
-            if response_end_dt is not None
-            else None
-        )
-        delta_object_id_to_response_end_ms = (
-            int((response_end_dt - obj_dt).total_seconds() * 1000)
-            if response_end_dt is not None
-            else None
-        )
-        delta_job_duration_vs_object_to_response_end_ms = (
-            (int(job_duration) - delta_object_id_to_response_end_ms)
-            if (job_duration is not None and delta_object_id_to_response_end_ms is not None)
-            else None
+
+def _days_from_civil(year, month, day):
+    """Civil date -> days since 1970-01-01 (proleptic Gregorian, vectorised days-from-civil)."""
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    mp = np.where(month > 2, month - 3, month + 9)
+    doy = (153 * mp + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+_MONTH_TABLE: List[Any] = []
+
+
+def _month_table():
+    """(first day, length in days) of every month of years 0..9999, indexed by year * 12 + month - 1."""
+    if not _MONTH_TABLE:
+        months = np.arange(12 * 10000 + 1)
+        first = _days_from_civil(months // 12, months % 12 + 1, 1)
+        _MONTH_TABLE.extend((first[:-1], np.diff(first)))
+    return _MONTH_TABLE
+
+
+def _civil_us(year, month, day, hour, minute, second, micro):
+    """Civil date/time fields (4-digit years) -> (epoch microseconds, valid mask).
+
+    The month start and length come from _month_table, so each row costs a gather
+    rather than the days-from-civil arithmetic.
+    """
+    first, length = _month_table()
+    index = np.clip(year * 12 + month - 1, 0, len(first) - 1)
+    ok = (
+        (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= length[index])
+        & (hour <= 23) & (minute <= 59) & (second <= 59)
+    )
+    days = first[index] + day - 1
+    return ((days * 86400 + hour * 3600 + minute * 60 + second) * 1_000_000) + micro, ok
+
+
+def _timestamp_parser(date_spans: Tuple[Tuple[int, int], ...]):
+    """parse() for _by_layout over 'date HH:MM:SS[.fraction]' layouts; date_spans: year, month, day."""
+    def parse(chars, template: bytes):
+        year, month, day = (_digits(chars, a, b) for a, b in date_spans)
+        hour, minute, second = _digits(chars, 11, 13), _digits(chars, 14, 16), _digits(chars, 17, 19)
+        frac = len(template.rstrip(b"Z")) - 20
+        micro = _digits(chars, 20, 20 + frac) * 10 ** (6 - frac) if frac > 0 else 0
+        return _civil_us(year, month, day, hour, minute, second, micro)
+    return parse
+
+
+_OBJECT_ID_LAYOUT = re.compile(rb"[0-9]{2}\.[0-9]{2}\.[0-9]{4} [0-9]{2}:[0-9]{2}:[0-9]{2}\.[0-9]{1,6}Z?")
+_ISO_NAIVE_LAYOUT = re.compile(rb"[0-9]{4}-[0-9]{2}-[0-9]{2}[T ][0-9]{2}:[0-9]{2}:[0-9]{2}(\.[0-9]{3}|\.[0-9]{6})?")
+_parse_object_id_layout = _timestamp_parser(((6, 10), (3, 5), (0, 2)))
+_parse_iso_layout = _timestamp_parser(((0, 4), (5, 7), (8, 10)))
+
+
+def parse_object_id_column(col: TextColumn):
+    """'DD.MM.YYYY HH:MM:SS.f{1,6}[Z]' -> (epoch_us int64, ok mask)."""
+    return _by_layout(col, _OBJECT_ID_LAYOUT, _parse_object_id_layout)
+
+
+def parse_iso_naive_column(col: TextColumn):
+    """Naive 'YYYY-MM-DD[T ]HH:MM:SS[.fff|.ffffff]' -> (epoch_us int64, ok mask).
+    Strings with a UTC offset (or any other layout) are left to the per-row path.
+    """
+    return _by_layout(col, _ISO_NAIVE_LAYOUT, _parse_iso_layout)
+
+
+def parse_event_time_column(dates: TextColumn, times: TextColumn):
+    """events CSV event_date + event_time columns -> (epoch_us int64, ok mask), see parse_object_id_column."""
+    n = len(dates.lengths)
+    time_width = times.chars.shape[1]
+    chars = np.zeros((n, _width(np.array([11 + time_width]))), dtype=np.uint8)
+    chars[:, :10] = dates.chars[:, :10] if dates.chars.shape[1] >= 10 else 0
+    chars[:, 10] = ord(" ")
+    chars[:, 11:11 + time_width] = times.chars
+    lengths = np.where((dates.lengths == 10) & (times.lengths >= 0), 11 + times.lengths, -1)
+    return parse_object_id_column(TextColumn(chars, lengths))
+
+
+_UNSIGNED_LAYOUT = re.compile(rb"[0-9]{1,15}")
+_SIGNED_LAYOUT = re.compile(rb"-?[0-9]{1,15}")
+
+
+def _parse_number_layout(chars, template: bytes):
+    negative = template.startswith(b"-")
+    value = _digits(chars, int(negative), len(template))
+    return (-value if negative else value), np.ones(len(chars), dtype=bool)
+
+
+def _ms_delta(a_us, b_us):
+    """Same value as int((a - b).total_seconds() * 1000) for datetimes a, b."""
+    return np.trunc(((a_us - b_us) / 10 ** 6) * 1000).astype(np.int64)
+
+
+def _isoformat_us(epoch_us):
+    """datetime.isoformat(sep=' ') for naive epoch-µs values (no fraction when it is zero)."""
+    n = len(epoch_us)
+    days, rem = np.divmod(epoch_us, 86_400_000_000)
+    # civil-from-days (inverse of _days_from_civil)
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    secs, micro = np.divmod(rem, 1_000_000)
+    hour, secs = np.divmod(secs, 3600)
+    minute, second = np.divmod(secs, 60)
+
+    m = np.zeros((n, 26), dtype=np.uint8)
+    for value, start, width in ((year, 0, 4), (month, 5, 2), (day, 8, 2), (hour, 11, 2),
+                                (minute, 14, 2), (second, 17, 2), (micro, 20, 6)):
+        for k in range(width - 1, -1, -1):
+            value, digit = np.divmod(value, 10)
+            m[:, start + k] = digit + 48
+    for pos, ch in ((4, "-"), (7, "-"), (10, " "), (13, ":"), (16, ":"), (19, ".")):
+        m[:, pos] = ord(ch)
+    # Trailing NULs are dropped by numpy, which trims '.000000' like isoformat does
+    m[micro == 0, 19:] = 0
+    return m.view("S26").reshape(n).astype("U26")
+
+
+def _ms_to_us(epoch_ms):
+    """utcfromtimestamp(ms / 1000.0) as epoch µs: split seconds/fraction and round to µs half-even."""
+    frac, whole = np.modf(epoch_ms / 1000.0)
+    return whole.astype(np.int64) * 1_000_000 + np.rint(frac * 1e6).astype(np.int64)
+
+
+def _float_or_nan(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _int_column(col: TextColumn):
+    """int(float(v)) for a column of strings -> (int64, ok mask).
+    Rows int(float(v)) rejects are not ok, nor are values outside int64.
+    """
+    values, ok = _by_layout(col, _SIGNED_LAYOUT, _parse_number_layout)
+    if not ok.all():
+        rest = np.flatnonzero(~ok)
+        f = np.fromiter(map(_float_or_nan, _decode(col, rest)), dtype=np.float64, count=len(rest))
+        fits = np.abs(f) < 2.0 ** 63
+        values[rest[fits]] = f[fits].astype(np.int64)
+        ok[rest[fits]] = True
+    return values, ok
+
+
+def _duration_column(col: TextColumn):
+    """job_duration column -> (int64 values, missing mask, ok mask).
+    ok rows hold None, an int or an ASCII digit string; the rest go to the per-row path.
+    """
+    values, ok = _by_layout(col, _UNSIGNED_LAYOUT, _parse_number_layout)
+    missing = np.zeros(len(col.lengths), dtype=bool)
+    if col.values is not None:
+        for i in np.flatnonzero(col.lengths < 0).tolist():
+            v = col.values[i]
+            if v is None:
+                missing[i] = ok[i] = True
+            elif type(v) is int and -2 ** 63 <= v < 2 ** 63:
+                values[i], ok[i] = v, True
+    return values, missing, ok
+
+
+def _pluck(rows: List[List[str]], i: int) -> List[str]:
+    """Column i of csv rows."""
+    return list(map(operator.itemgetter(i), rows))
+
+
+# _WORD_MASKS[k]: the low k bytes of a little-endian uint64 set
+_WORD_MASKS = np.array([(1 << 8 * k) - 1 for k in range(9)], dtype="<u8") if np is not None else None
+
+
+def _cut_csv(path: Path):
+    """(header, column) of a CSV without quoting where every line has the header's width;
+    column(i) is field i of the data rows as a TextColumn.
+
+    Such a file reads the same as through csv.reader on a text-mode file (CRLF is one
+    newline), so the fields are cut straight out of the file bytes. None for anything else
+    (quotes, NULs, a lone CR, blank or ragged lines), which callers read with csv.reader.
+    """
+    data = path.read_bytes()
+    if not data or b'"' in data or b"\0" in data:
+        return None
+    if not data.isascii():
+        data.decode("utf-8")  # the same UnicodeDecodeError the text-mode readers raise
+    if not data.endswith(b"\n"):
+        data += b"\n"
+    buf = np.frombuffer(data, dtype=np.uint8)
+    seps = np.flatnonzero((buf == ord(",")) | (buf == ord("\n")))
+    newline = buf[seps] == ord("\n")
+    width = int(np.argmax(newline)) + 1
+    if width < 2 or len(seps) % width:
+        return None
+    newline = newline.reshape(-1, width)
+    if not newline[:, -1].all() or newline[:, :-1].any():
+        return None
+    seps = seps.reshape(-1, width)
+    ends = seps.copy()
+    crs = data.count(b"\r") if b"\r" in data else 0
+    if crs:
+        crlf = buf[np.maximum(seps[:, -1] - 1, 0)] == ord("\r")
+        if int(crlf.sum()) != crs:
+            return None
+        ends[:, -1] -= crlf
+    starts = np.empty_like(seps)
+    starts[:, 1:] = seps[:, :-1] + 1
+    starts[0, 0] = 0
+    starts[1:, 0] = seps[:-1, -1] + 1
+    lengths = ends - starts
+    header = [data[a:b].decode("utf-8") for a, b in zip(starts[0].tolist(), ends[0].tolist())]
+    padded = np.concatenate((buf, np.zeros(_width(lengths[1:].ravel()), dtype=np.uint8)))
+
+    def column(i: int) -> TextColumn:
+        field_len = lengths[1:, i]
+        w = _width(field_len)
+        chars = np.lib.stride_tricks.sliding_window_view(padded, w)[starts[1:, i]]
+        # Zero whatever follows each field, a little-endian word at a time; words before
+        # the shortest field are all in-field
+        words = chars.view("<u8")
+        for k in range(int(field_len.min()) // 8 if len(field_len) else w // 8, w // 8):
+            words[:, k] &= _WORD_MASKS[np.clip(field_len - 8 * k, 0, 8)]
+        return TextColumn(chars, field_len)
+
+    return header, column
+
+
+class EventColumns(NamedTuple):
+    """STARTED events: request_id and epoch-µs time, in file order (the last one per request_id wins)."""
+    request_id: TextColumn
+    epoch_us: Any
+
+
+class MetricColumns(NamedTuple):
+    """requests.csv metrics per request_id (the last row wins); has_end marks a known timestamp_end_ms."""
+    request_id: TextColumn
+    response_time_ms: Any
+    timestamp_end_ms: Any
+    has_end: Any
+
+
+def load_started_event_columns(events_csv_path: Path) -> Tuple[TextColumn, TextColumn, TextColumn]:
+    """request_id, event_date and event_time of the STARTED rows, as read (see iter_started_events)."""
+    plain = _cut_csv(events_csv_path)
+    if plain is not None:
+        header, column = plain
+        if len(header) < 6:
+            return text_column([]), text_column([]), text_column([])
+        started = _equals(column(0), b"STARTED")
+        columns = (column(5), column(1), column(2))
+        if started.all():
+            return columns
+        rows = np.flatnonzero(started)
+        return tuple(_take(c, rows) for c in columns)
+    with events_csv_path.open("r", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        rows = [row for row in reader if len(row) >= 6 and row[0] == "STARTED"]
+    return text_column(_pluck(rows, 5)), text_column(_pluck(rows, 1)), text_column(_pluck(rows, 2))
+
+
+def load_response_columns(path: Path) -> Dict[str, TextColumn]:
+    """The jobs_from_responses columns compare_job reads; short rows are padded with None like DictReader."""
+    plain = _cut_csv(path)
+    if plain is not None:
+        header, column = plain
+        return {key: column(i) for i, key in enumerate(header) if key in _JOB_KEYS}
+    with path.open("r", encoding="utf-8") as f:
+        reader = _csv.reader(f)
+        header = next(reader, None) or []
+        rows = [row for row in reader if row]
+    width = len(header)
+    if set(map(len, rows)) - {width}:
+        rows = [row[:width] + [None] * (width - len(row)) for row in rows]
+    return {key: text_column(_pluck(rows, i)) for i, key in enumerate(header) if key in _JOB_KEYS}
+
+
+def load_request_metric_columns(requests_csv: Path) -> MetricColumns:
+    """requests.csv metrics as columns: the rows main()'s per-row loader keeps, as int64 arrays."""
+    empty = MetricColumns(text_column([]), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=bool))
+    if not requests_csv.exists():
+        return empty
+    plain = _cut_csv(requests_csv)
+    if plain is not None:
+        header, column = plain
+    else:
+        with requests_csv.open("r", encoding="utf-8") as rf:
+            reader = csv.reader(rf)
+            header = next(reader, None) or []
+            rows = list(reader)
+    try:
+        idx = [header.index(k) for k in ("request_id", "response_time_ms", "timestamp_end_ms", "timestamp_start_ms")]
+    except ValueError:
+        return empty
+    if plain is None:
+        need = max(idx)
+        rows = [row for row in rows if len(row) > need]
+
+        def column(i: int) -> TextColumn:
+            return text_column(_pluck(rows, i))
+    rids = column(idx[0])
+    if not len(rids.lengths):
+        return empty
+    resp, ok = _int_column(column(idx[1]))
+    end, ok_end = _int_column(column(idx[2]))
+    _, ok_start = _int_column(column(idx[3]))
+    ok &= ok_end & ok_start
+    if not ok.all():
+        rids = _take(rids, np.flatnonzero(ok))
+        resp, end = resp[ok], end[ok]
+    return MetricColumns(rids, resp, end, np.ones(len(resp), dtype=bool))
+
+
+def event_columns(rids: TextColumn, dates: TextColumn, times: TextColumn) -> EventColumns:
+    """EventColumns from load_started_event_columns; times outside the fixed layout go through parse_event_time."""
+    epoch_us, ok = parse_event_time_column(dates, times)
+    bad = np.flatnonzero(~ok)
+    for i, date, time in zip(bad.tolist(), _decode(dates, bad), _decode(times, bad)):
+        # strptime fallback, raising on garbage exactly like iter_started_events
+        epoch_us[i] = (parse_event_time(date, time) - _EPOCH) // _ONE_US
+    return EventColumns(rids, epoch_us)
+
+
+def columns_from_maps(
+    started_map: Dict[str, dt.datetime],
+    jobs: List[Dict[str, Any]],
+    req_metrics: Dict[str, Dict[str, int]],
+) -> Tuple[EventColumns, Dict[str, TextColumn], MetricColumns]:
+    """compare_columns input from the per-row structures (run log, jobs.json, compare_times callers)."""
+    events = EventColumns(
+        text_column(list(started_map)),
+        np.fromiter(((d - _EPOCH) // _ONE_US for d in started_map.values()), dtype=np.int64, count=len(started_map)),
+    )
+    job_columns = {k: text_column([j.get(k) for j in jobs]) for k in _JOB_KEYS}
+    values = [m or {} for m in req_metrics.values()]
+    ends = [m.get("timestamp_end_ms") for m in values]
+    metrics = MetricColumns(
+        text_column(list(req_metrics)),
+        np.array([m.get("response_time_ms", -1) for m in values], dtype=np.int64),
+        np.array([e if e is not None else 0 for e in ends], dtype=np.int64),
+        np.array([e is not None for e in ends], dtype=bool),
+    )
+    return events, job_columns, metrics
+
+
+_RESULT_KEYS = (
+    "request_id",
+    "delta_started_at_vs_event_ms",
+    "delta_object_id_vs_event_ms",
+    "locust_response_time_ms",
+    "db_duration_ms",
+    "delta_resp_vs_db_ms",
+    "delta_started_at_vs_object_id_ms",
+    "delta_finished_at_vs_response_end_ms",
+    "delta_object_id_to_response_end_ms",
+    "delta_job_duration_vs_object_to_response_end_ms",
+    "event",
+    "object_id",
+    "started_at",
+    "finished_at",
+    "response_end",
+    "job_duration",
+)
+# int64 epoch-µs columns, formatted like datetime.isoformat(sep=" ") when read
+_TIME_KEYS = ("event", "object_id", "response_end")
+
+
+class ResultColumns:
+    """compare_times result kept as columns; ``order`` lists the rows in result order.
+
+    columns: {key: ndarray or TextColumn} -- int64 for the delta_* and time keys, the
+    raw strings as TextColumn; missing: {key: bool mask} of the rows where the value is
+    None. The report reads whole columns (valid mask, filters, CSV) and builds per-row
+    dicts only for the rows it prints or puts into the table.
+    """
+
+    def __init__(self, columns: Dict[str, Any], missing: Optional[Dict[str, Any]] = None, order=None):
+        self.columns = columns
+        self.missing = missing or {}
+        self.order = order if order is not None else np.arange(len(columns["delta_started_at_vs_event_ms"]))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def column(self, key: str, positions=None) -> List[Any]:
+        rows = self.order if positions is None else self.order[positions]
+        values = self.columns.get(key)
+        if values is None:
+            return [None] * len(rows)
+        if isinstance(values, TextColumn):
+            out = _decode(values, rows)
+        else:
+            values = values[rows]
+            out = (_isoformat_us(values) if key in _TIME_KEYS else values).tolist()
+        missing = self.missing.get(key)
+        if missing is not None:
+            for i in np.flatnonzero(missing[rows]).tolist():
+                out[i] = None
+        return out
+
+    def rows(self, positions=None) -> List[Dict[str, Any]]:
+        columns = [self.column(k, positions) for k in _RESULT_KEYS]
+        return list(map(dict, map(zip, itertools.repeat(_RESULT_KEYS), zip(*columns))))
+
+    def table(self, cols: List[str], positions=None) -> List[Tuple[Any, ...]]:
+        """Rows as value tuples in ``cols`` order (see table_rows)."""
+        return list(zip(*(self.column(c, positions) for c in cols)))
+
+    def present(self, key: str):
+        missing = self.missing.get(key)
+        return ~missing[self.order] if missing is not None else np.ones(len(self), dtype=bool)
+
+    def valid_positions(self):
+        """Positions of the rows is_valid_result accepts."""
+        mask = (
+            self.present("delta_finished_at_vs_response_end_ms")
+            & self.present("delta_object_id_to_response_end_ms")
+            & self.present("delta_job_duration_vs_object_to_response_end_ms")
         )
+        return np.nonzero(mask)[0]
+
+
+def _as_bytes(col: TextColumn, rows) -> List[bytes]:
+    """Byte matrix rows as bytes with the zero padding trimmed."""
+    chars = col.chars[rows]
+    return chars.view(f"S{chars.shape[1]}").ravel().tolist()
+
+
+def _key_words(col: TextColumn, width: int):
+    """(uint64 words, hash) per value; the byte matrix is zero-padded to ``width`` first."""
+    chars = col.chars
+    if chars.shape[1] < width:
+        chars = np.pad(chars, ((0, 0), (0, width - chars.shape[1])))
+    words = chars.view(np.uint64)
+    h = col.lengths.astype(np.uint64)
+    for k in range(words.shape[1]):
+        h = (h * np.uint64(0x100000001B3)) ^ words[:, k]
+    return words, h
+
+
+def _index_of(key_columns: Sequence[TextColumn], lookup: TextColumn) -> List[Any]:
+    """For each keys column: position of each lookup value in it (the last occurrence wins,
+    like dict()), -1 if absent, empty or not a str.
+
+    Values are joined on a hash of their uint64 words: each side is sorted once as
+    (hash with the low bits replaced by the position), searchsorted and then compared
+    word by word; the few rows whose hash collides go through a dict. The lookup
+    side is hashed and sorted once for all the keys columns.
+    """
+    n = len(lookup.lengths)
+    width = max([lookup.chars.shape[1]] + [keys.chars.shape[1] for keys in key_columns])
+    bits = max([n] + [len(keys.lengths) for keys in key_columns]).bit_length()
+    low = np.uint64((1 << bits) - 1)
+    high = ~low
+
+    def sort_packed(h):
+        packed = np.sort((h & high) | np.arange(len(h), dtype=np.uint64))
+        return packed & high, (packed & low).astype(np.int64)
 
-        results.append(
-            {
-                "request_id": rid,
-                "delta_started_at_vs_event_ms": d_started_ms,
-                "delta_object_id_vs_event_ms": d_object_ms,
-                "locust_response_time_ms": response_time_ms,
-                "db_duration_ms": db_duration_ms,
-                "delta_resp_vs_db_ms": (response_time_ms - db_duration_ms) if response_time_ms >= 0 else None,
-                "delta_started_at_vs_object_id_ms": delta_started_at_vs_object_id_ms,
-                "delta_finished_at_vs_response_end_ms": delta_finished_at_vs_response_end_ms,
-                "delta_object_id_to_response_end_ms": delta_object_id_to_response_end_ms,
-                "delta_job_duration_vs_object_to_response_end_ms": delta_job_duration_vs_object_to_response_end_ms,
-                # raw values for the report
-                "event": ev_dt.isoformat(sep=" "),
-                "object_id": obj_dt.isoformat(sep=" "),
-                "started_at": sa,
-                "finished_at": fa,
-                "response_end": (response_end_dt.isoformat(sep=" ") if response_end_dt is not None else None),
-                "job_duration": (int(job_duration) if isinstance(job_duration, str) and job_duration.isdigit() else job_duration),
+    l_words, l_hash = _key_words(lookup, width)
+    l_hash &= high
+    # Sorted needles make searchsorted walk the table in order
+    l_sorted, l_order = sort_packed(l_hash)
+    positions = []
+    for keys in key_columns:
+        if not len(keys.lengths) or not n:
+            positions.append(np.full(n, -1, dtype=np.int64))
+            continue
+        k_words, k_hash = _key_words(keys, width)
+        sorted_hash, order = sort_packed(k_hash)
+        # Equal hashes sit in position order, so the last of each run is the last occurrence
+        ends = np.flatnonzero(np.concatenate((sorted_hash[1:] != sorted_hash[:-1], [True])))
+        unique_hash, last = sorted_hash[ends], order[ends]
+        pos = np.empty(n, dtype=np.int64)
+        pos[l_order] = np.minimum(np.searchsorted(unique_hash, l_sorted), len(unique_hash) - 1)
+        candidate = last[pos]
+        found = (unique_hash[pos] == l_hash) & (lookup.lengths > 0)
+        differs = k_words[candidate, 0] ^ l_words[:, 0]
+        for k in range(1, width // 8):
+            differs |= k_words[candidate, k] ^ l_words[:, k]
+        same = (differs == 0) & (keys.lengths[candidate] == lookup.lengths)
+        result = np.where(found & same, candidate, -1)
+        collided = np.flatnonzero(found & ~same)
+        if len(collided):
+            suspects = np.flatnonzero(np.isin(k_hash & high, l_hash[collided]))
+            index = {
+                key: int(i)
+                for i, key in zip(suspects, zip(_as_bytes(keys, suspects), keys.lengths[suspects].tolist()))
+                if key[1] > 0
             }
-        )
+            wanted = zip(_as_bytes(lookup, collided), lookup.lengths[collided].tolist())
+            result[collided] = np.fromiter(map(index.get, wanted, itertools.repeat(-1)), dtype=np.int64, count=len(collided))
+        positions.append(result)
+    return positions
 
-    # Sort by absolute delta vs started_at
-    results.sort(key=lambda x: abs(x["delta_started_at_vs_event_ms"]))
-    return results
+
+def _result_order(delta):
+    """Positions sorted by |delta|, ties in input order (the per-row path's stable sort)."""
+    n = len(delta)
+    bits = max(1, (n - 1).bit_length())
+    magnitude = np.abs(delta)
+    if n and int(magnitude.max()) < 1 << (62 - bits):
+        # One unstable sort of |delta| with the position packed into the low bits
+        return np.sort((magnitude << bits) | np.arange(n)) & ((1 << bits) - 1)
+    return np.argsort(magnitude, kind="stable")
+
+
+def compare_columns(
+    events: EventColumns,
+    jobs: Dict[str, TextColumn],
+    metrics: MetricColumns,
+) -> ResultColumns:
+    """NumPy implementation of compare_times over columns; same rows, returned as columns.
+
+    The request_id joins go through _index_of; object_id/started_at/finished_at
+    are parsed per column. Rows outside the strict layouts are recomputed by
+    compare_job and overwritten in place, so results stay identical.
+    """
+    n_jobs = len(next(iter(jobs.values())).lengths) if jobs else 0
+
+    def column(key: str) -> TextColumn:
+        # A header without the key reads as None on every row, like DictReader's row.get
+        return jobs[key] if key in jobs else text_column([None] * n_jobs)
+
+    ev_pos, m_pos = _index_of((events.request_id, metrics.request_id), column("request_id"))
+    take = np.flatnonzero(ev_pos >= 0)
+    n = len(take)
+    everything = n == n_jobs
+
+    def pick(key: str) -> TextColumn:
+        return column(key) if everything else _take(column(key), take)
+
+    rids, objs, sas, fas, durs = (pick(k) for k in _JOB_KEYS)
+    ev_us = events.epoch_us[ev_pos[take]]
+
+    if not everything:
+        m_pos = m_pos[take]
+    has_m = m_pos >= 0
+    m_pos = np.where(has_m, m_pos, 0)
+    if len(metrics.request_id.lengths):
+        resp_ms = np.where(has_m, metrics.response_time_ms[m_pos], -1)
+        has_end = has_m & metrics.has_end[m_pos]
+        end_ms = np.where(has_end, metrics.timestamp_end_ms[m_pos], 0)
+    else:
+        resp_ms = np.full(n, -1, dtype=np.int64)
+        has_end = np.zeros(n, dtype=bool)
+        end_ms = np.zeros(n, dtype=np.int64)
+    resp_end_us = _ms_to_us(end_ms)
+
+    obj_us, ok_obj = parse_object_id_column(objs)
+    sa_us, ok_sa = parse_iso_naive_column(sas)
+    fa_us, ok_fa = parse_iso_naive_column(fas)
+    dur, dur_missing, ok_dur = _duration_column(durs)
+
+    d_started = _ms_delta(sa_us, ev_us)
+    d_obj_resp = _ms_delta(resp_end_us, obj_us)
+    db_duration = _ms_delta(fa_us, sa_us)
+    columns = {
+        "request_id": rids,
+        "delta_started_at_vs_event_ms": d_started,
+        "delta_object_id_vs_event_ms": _ms_delta(obj_us, ev_us),
+        "locust_response_time_ms": resp_ms,
+        "db_duration_ms": db_duration,
+        "delta_resp_vs_db_ms": resp_ms - db_duration,
+        "delta_started_at_vs_object_id_ms": _ms_delta(sa_us, obj_us),
+        "delta_finished_at_vs_response_end_ms": _ms_delta(fa_us, resp_end_us),
+        "delta_object_id_to_response_end_ms": d_obj_resp,
+        "delta_job_duration_vs_object_to_response_end_ms": dur - d_obj_resp,
+        "event": ev_us,
+        "object_id": obj_us,
+        "started_at": sas,
+        "finished_at": fas,
+        "response_end": resp_end_us,
+        "job_duration": dur,
+    }
+    missing = {
+        "delta_resp_vs_db_ms": resp_ms < 0,
+        "delta_finished_at_vs_response_end_ms": ~has_end,
+        "delta_object_id_to_response_end_ms": ~has_end,
+        "delta_job_duration_vs_object_to_response_end_ms": ~has_end | dur_missing,
+        "response_end": ~has_end,
+        "job_duration": dur_missing,
+    }
+
+    # Rows outside the strict layouts go through the per-row implementation
+    keep = np.ones(n, dtype=bool)
+    bad = np.flatnonzero(~(ok_obj & ok_sa & ok_fa & ok_dur))
+    raw = zip(*(_decode(col, bad) for col in (rids, objs, sas, fas, durs)))
+    for i, values in zip(bad.tolist(), raw):
+        job = dict(zip(_JOB_KEYS, values))
+        rm = None
+        if has_m[i]:
+            rm = {"response_time_ms": int(resp_ms[i])}
+            if has_end[i]:
+                rm["timestamp_end_ms"] = int(end_ms[i])
+        row = compare_job(job, _EPOCH + dt.timedelta(microseconds=int(ev_us[i])), rm)
+        if row is None:
+            keep[i] = False
+            continue
+        row["object_id"] = parse_object_id_us(job["object_id"])
+        row["event"] = int(ev_us[i])
+        if has_end[i]:
+            row["response_end"] = int(resp_end_us[i])
+        for key in _RESULT_KEYS:
+            if isinstance(columns[key], TextColumn):
+                # request_id/started_at/finished_at: the row holds the raw value already in the column
+                continue
+            value = row[key]
+            if value is None:
+                missing.setdefault(key, np.zeros(n, dtype=bool))[i] = True
+                continue
+            if key in missing:
+                missing[key][i] = False
+            if columns[key].dtype != object and type(value) is not int:
+                columns[key] = columns[key].astype(object)
+            columns[key][i] = value
+
+    d_started = columns["delta_started_at_vs_event_ms"]
+    kept = np.flatnonzero(keep)
+    order = _result_order(d_started) if len(kept) == n else kept[_result_order(d_started[kept])]
+    return ResultColumns(columns, missing, order)
+
+
+def compare_times_columnar(
+    started_map: Dict[str, dt.datetime],
+    jobs: List[Dict[str, Any]],
+    req_metrics: Dict[str, Dict[str, int]],
+) -> ResultColumns:
+    """compare_columns for the per-row structures that compare_times takes."""
+    return compare_columns(*columns_from_maps(started_map, jobs, req_metrics))
+
+
+def check_columnar(
+    started_map: Dict[str, dt.datetime],
+    jobs: List[Dict[str, Any]],
+    req_metrics: Dict[str, Dict[str, int]],
+    columns: Optional[Tuple[EventColumns, Dict[str, TextColumn], MetricColumns]] = None,
+) -> Optional[str]:
+    """Run both compare_times paths; None if the rows match, else the first difference.
+    columns: compare_columns input loaded straight from the CSVs (default: built from the maps).
+    """
+    expected = compare_times(started_map, jobs, req_metrics, columnar=False)
+    actual = (compare_columns(*columns) if columns is not None else compare_times_columnar(started_map, jobs, req_metrics)).rows()
+    if len(expected) != len(actual):
+        return f"row count: per-row {len(expected)}, columnar {len(actual)}"
+    for i, (e, a) in enumerate(zip(expected, actual)):
+        for key in _RESULT_KEYS:
+            if e[key] != a[key] or type(e[key]) is not type(a[key]):
+                return f"row {i} ({e['request_id']}) {key}: per-row {e[key]!r}, columnar {a[key]!r}"
+    return None
+
+
+CSV_COLS_FULL = [
+    'request_id','delta_started_at_vs_object_id_ms','delta_finished_at_vs_response_end_ms',
+    'delta_job_duration_vs_object_to_response_end_ms','locust_response_time_ms','db_duration_ms','delta_resp_vs_db_ms',
+    'started_at','object_id','finished_at','response_end','job_duration'
+]
+DEFAULT_TABLE_COLS = [
+    'request_id','delta_started_at_vs_object_id_ms','delta_finished_at_vs_response_end_ms',
+    'delta_job_duration_vs_object_to_response_end_ms','started_at','object_id','finished_at','response_end','job_duration'
+]
+# Without an explicit --limit the streaming mode keeps this many rows for the table
+STREAMING_DEFAULT_LIMIT = 500
+
+
+def is_valid_result(r: Dict[str, Any]) -> bool:
+    return (
+        r["delta_finished_at_vs_response_end_ms"] is not None
+        and r["delta_object_id_to_response_end_ms"] is not None
+        and r["delta_job_duration_vs_object_to_response_end_ms"] is not None
+    )
+
+
+def print_result_row(r: Dict[str, Any]) -> None:
+    parts = [
+        f"request_id={r['request_id']}",
+        f"delta_started_at_vs_object_id_ms={r['delta_started_at_vs_object_id_ms']}",
+        f"delta_finished_at_vs_response_end_ms={r['delta_finished_at_vs_response_end_ms']}",
+        f"delta_job_duration_vs_object_to_response_end_ms={r['delta_job_duration_vs_object_to_response_end_ms']}",
+        f"locust_response_time_ms={r['locust_response_time_ms']}",
+        f"db_duration_ms={r['db_duration_ms']}",
+        f"delta_resp_vs_db_ms={r['delta_resp_vs_db_ms']}",
+        f"event={r['event']}",
+        f"object_id={r['object_id']}",
+        f"started_at={r['started_at']}",
+        f"finished_at={r['finished_at']}",
+    ]
+    print(" | ".join(parts))
+
+
+def in_delta_range(r: Dict[str, Any], args: argparse.Namespace) -> bool:
+    if args.delta_range_ms is None:
+        return True
+    min_d, max_d = args.delta_range_ms
+    return r.get("delta_started_at_vs_object_id_ms") is not None and min_d <= r["delta_started_at_vs_object_id_ms"] <= max_d
+
+
+def apply_filters(rows: List[Dict[str, Any]], args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Range filter -> top-N by |delta| -> bucket sampling -> limit (rows must be in result order)."""
+    deltas = [r.get("delta_started_at_vs_object_id_ms") for r in rows]
+    return [rows[i] for i in filter_positions(deltas, args)]
+
+
+def filter_positions(deltas: List[Optional[int]], args: argparse.Namespace) -> List[int]:
+    """apply_filters over the delta_started_at_vs_object_id_ms column: positions of the kept rows."""
+    filtered: List[int] = list(range(len(deltas)))
+    # Range filter on delta_started_at_vs_object_id_ms
+    if args.delta_range_ms is not None:
+        min_d, max_d = args.delta_range_ms
+        filtered = [i for i in filtered if deltas[i] is not None and min_d <= deltas[i] <= max_d]
+    # Top-N by absolute delta
+    if args.abs_delta_top is not None and args.abs_delta_top > 0:
+        filtered = sorted(filtered, key=lambda i: abs(deltas[i] or 0), reverse=True)[: args.abs_delta_top]
+    # Bucketing by delta and sampling
+    if args.bucket_ms is not None and args.bucket_ms > 0:
+        from collections import defaultdict
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        for i in filtered:
+            d = deltas[i]
+            if d is None:
+                continue
+            b = (d // args.bucket_ms) * args.bucket_ms
+            if len(buckets[b]) < max(1, args.samples_per_bucket):
+                buckets[b].append(i)
+        # Flatten in bucket order
+        filtered = []
+        for b in sorted(buckets.keys()):
+            filtered.extend(buckets[b])
+    # Limit rows
+    if args.limit is not None and args.limit > 0:
+        filtered = filtered[: args.limit]
+    return filtered
+
+
+def resolve_out_dir() -> Path:
+    # Output directory marked by date-time or provided via env
+    env_dir = os.getenv('REPORT_DIR')
+    if env_dir:
+        out_dir = Path(env_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        timestamp_str = dt.datetime.now().strftime('%Y%m%d_%H%M%S')
+        out_dir = BASE_ROOT / 'reports' / timestamp_str
+        out_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Report directory: {out_dir}")
+    return out_dir
+
+
+def resolve_table_cols(args: argparse.Namespace) -> List[str]:
+    return [c.strip() for c in args.columns.split(',')] if args.columns else list(DEFAULT_TABLE_COLS)
+
+
+def table_rows(rows: List[Dict[str, Any]], table_cols: List[str]) -> List[Tuple[Any, ...]]:
+    """Per-row dicts -> value tuples in ``table_cols`` order (what the table writers take)."""
+    return [tuple(r.get(k) for k in table_cols) for r in rows]
+
+
+def write_html_report(out_dir: Path, filtered: List[Tuple[Any, ...]], table_cols: List[str], matched: int, valid: int) -> Path:
+    """Build simple HTML report (table only); ``filtered`` rows are value tuples in ``table_cols`` order."""
+    report_path = out_dir / 'comparison_report.html'
+    no_valid_note = '<p style="color:#dc2626">Нет валидных строк — показаны все записи с пропусками.</p>' if not valid else ''
+    header_cells = ''.join([f'<th>{html.escape(col)}</th>' for col in table_cols])
+    body_rows = ''.join([
+        f'<tr><td>{i+1}</td>'
+        + ''.join([f'<td>{html.escape(str(v)) if v is not None else ""}</td>' for v in r])
+        + '</tr>'
+        for i, r in enumerate(filtered)
+    ])
+
+    html_content = f"""
+<!DOCTYPE html>
+<html lang="ru">
+<head>
+  <meta charset="UTF-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <title>Jobs vs Events Comparison</title>
+  <style>
+    body {{ font-family: -apple-system, Segoe UI, Roboto, Arial, sans-serif; margin: 16px; }}
+    h2 {{ margin-top: 16px; }}
+    .card {{ border: 1px solid #e5e7eb; border-radius: 8px; padding: 16px; }}
+    table {{ width: 100%; border-collapse: collapse; margin-top: 12px; font-size: 12px; }}
+    th, td {{ border: 1px solid #eee; padding: 6px 8px; text-align: left; }}
+    th {{ background: #fafafa; position: sticky; top: 0; }}
+  </style>
+</head>
+<body>
+  <h1>Сравнение метрик запросов и БД</h1>
+  <p>Всего сопоставлено: <b>{matched}</b>. Валидных записей: <b>{valid}</b>.</p>
+  {no_valid_note}
+
+  <div class="card">
+    <h2>Все записи (таблица)</h2>
+    <table>
+      <thead>
+        <tr>
+          <th>#</th>
+          {header_cells}
+        </tr>
+      </thead>
+      <tbody>
+        {body_rows}
+      </tbody>
+    </table>
+  </div>
+</body>
+</html>
+"""
+
+    report_path.write_text(html_content, encoding="utf-8")
+    print(f"HTML report: {report_path}")
+    return report_path
+
+
+def write_filtered_csv(out_dir: Path, filtered: List[Tuple[Any, ...]], table_cols: List[str]) -> Path:
+    csv_filtered_path = out_dir / 'comparison_table.csv'
+    with csv_filtered_path.open('w', encoding='utf-8', newline='') as cf_f:
+        w_f = _csv.writer(cf_f)
+        w_f.writerow(table_cols)
+        w_f.writerows(filtered)
+    print(f"CSV (filtered): {csv_filtered_path}")
+    return csv_filtered_path
+
+
+class SpillIndex:
+    """On-disk request_id -> JSON index (SQLite) for rows that left the join window."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        fd, name = tempfile.mkstemp(prefix="compare_spill_", suffix=".sqlite", dir=str(directory) if directory else None)
+        os.close(fd)
+        self.path = Path(name)
+        self.conn = sqlite3.connect(name)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE spill (source TEXT, request_id TEXT, payload TEXT, PRIMARY KEY (source, request_id))")
+        self.counts: Dict[str, int] = {}
+
+    def put(self, source: str, rid: str, payload: Any) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO spill VALUES (?, ?, ?)", (source, rid, json.dumps(payload)))
+        self.counts[source] = self.counts.get(source, 0) + 1
+
+    def pop(self, source: str, rid: str) -> Any:
+        if not self.counts.get(source):
+            return None
+        cur = self.conn.execute("SELECT payload FROM spill WHERE source = ? AND request_id = ?", (source, rid))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        self.conn.execute("DELETE FROM spill WHERE source = ? AND request_id = ?", (source, rid))
+        self.counts[source] -= 1
+        return json.loads(row[0])
+
+    def close(self) -> None:
+        self.conn.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+class WindowedLookup:
+    """Bounded look-ahead over a (request_id, value) stream written in request order.
+
+    Keeps at most ``window`` unmatched rows in memory; older ones are spilled to
+    ``SpillIndex`` so an out-of-order request_id can still be found later.
+    """
+
+    def __init__(self, source: str, stream: Iterator[Tuple[str, Any]], window: int, spill: SpillIndex,
+                 encode=lambda v: v, decode=lambda v: v):
+        self.source = source
+        self.stream = stream
+        self.window = max(1, window)
+        self.spill = spill
+        self.encode = encode
+        self.decode = decode
+        self.buffer: "OrderedDict[str, Any]" = OrderedDict()
+        self.exhausted = False
+
+    def get(self, rid: str) -> Any:
+        if rid in self.buffer:
+            return self.buffer.pop(rid)
+        spilled = self.spill.pop(self.source, rid)
+        if spilled is not None:
+            return self.decode(spilled)
+        while not self.exhausted:
+            try:
+                key, value = next(self.stream)
+            except StopIteration:
+                self.exhausted = True
+                break
+            if key == rid:
+                return value
+            self.buffer[key] = value
+            if len(self.buffer) > self.window:
+                old_key, old_value = self.buffer.popitem(last=False)
+                self.spill.put(self.source, old_key, self.encode(old_value))
+        return None
+
+
+class StreamingSelector:
+    """Bounded-memory equivalent of ``apply_filters`` over rows arriving in any order.
+
+    Keeps only the candidates that can survive the filters (top-N by |delta|,
+    per-bucket samples or the ``limit`` rows first in result order), then runs
+    ``apply_filters`` on them.
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.seq = itertools.count()
+        self.top: List[Tuple[int, int, Dict[str, Any]]] = []
+        self.buckets: Dict[int, List[Tuple[int, int, Dict[str, Any]]]] = {}
+        self.first: List[Tuple[int, int, Dict[str, Any]]] = []
+
+    def add(self, r: Dict[str, Any]) -> None:
+        args = self.args
+        if not in_delta_range(r, args):
+            return
+        seq = next(self.seq)
+        if args.abs_delta_top is not None and args.abs_delta_top > 0:
+            key = abs(r.get("delta_started_at_vs_object_id_ms") or 0)
+            self._push_keep_max(self.top, (key, -seq, r), args.abs_delta_top)
+        elif args.bucket_ms is not None and args.bucket_ms > 0:
+            d = r.get("delta_started_at_vs_object_id_ms")
+            if d is None:
+                return
+            b = (d // args.bucket_ms) * args.bucket_ms
+            heap = self.buckets.setdefault(b, [])
+            self._push_keep_min(heap, (result_sort_key(r), seq, r), max(1, args.samples_per_bucket))
+        else:
+            self._push_keep_min(self.first, (result_sort_key(r), seq, r), args.limit or STREAMING_DEFAULT_LIMIT)
+
+    @staticmethod
+    def _push_keep_max(heap, item, size) -> None:
+        if len(heap) < size:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+
+    @staticmethod
+    def _push_keep_min(heap, item, size) -> None:
+        # max-heap on the sort key via negation
+        neg = (-item[0], -item[1], item[2])
+        if len(heap) < size:
+            heapq.heappush(heap, neg)
+        elif neg[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, neg)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        if self.top:
+            candidates = [(result_sort_key(r), -neg_seq, r) for _, neg_seq, r in self.top]
+        else:
+            pools = list(self.buckets.values()) + [self.first]
+            candidates = [(-nkey, -nseq, r) for heap in pools for nkey, nseq, r in heap]
+        candidates.sort(key=lambda x: (x[0], x[1]))
+        ordered = [r for _, _, r in candidates]
+        no_range = argparse.Namespace(**{**vars(self.args), "delta_range_ms": None})
+        if no_range.limit is None and not self.top and not self.buckets:
+            no_range.limit = STREAMING_DEFAULT_LIMIT
+        return apply_filters(ordered, no_range)
+
+
+def run_streaming(
+    args: argparse.Namespace,
+    events_csv: Path,
+    requests_csv: Path,
+    responses_csv: Path,
+) -> int:
+    """Join jobs, STARTED events and request metrics on request_id with a bounded window.
+
+    The three CSVs are written by the locustfiles in request order, so each
+    side is read lazily and only ``--window`` unmatched rows are kept in memory;
+    anything older goes to an on-disk SQLite index. The full CSV is written in
+    join order as rows are produced; the table keeps only filter candidates.
+    """
+    out_dir = resolve_out_dir()
+    spill = SpillIndex(out_dir)
+    try:
+        req_lookup = None
+        if requests_csv.exists():
+            req_lookup = WindowedLookup("requests", iter_request_metrics(requests_csv), args.window, spill)
+        ev_lookup = None
+        if events_csv.exists():
+            ev_lookup = WindowedLookup(
+                "events", iter_started_events(events_csv), args.window, spill,
+                encode=lambda v: v.isoformat(), decode=dt.datetime.fromisoformat,
+            )
+        else:
+            print("Deriving STARTED times from requests.csv timestamp_start_ms")
+
+        def joined() -> Iterator[Tuple[Dict[str, Any], Optional[dt.datetime], Optional[Dict[str, int]]]]:
+            for job in iter_jobs_from_responses_csv(responses_csv):
+                rid = job.get("request_id")
+                if not rid:
+                    yield job, None, None
+                    continue
+                rm = req_lookup.get(rid) if req_lookup is not None else None
+                if ev_lookup is not None:
+                    ev_dt = ev_lookup.get(rid)
+                elif rm and rm.get("timestamp_start_ms") is not None:
+                    ev_dt = dt.datetime.utcfromtimestamp(rm["timestamp_start_ms"] / 1000.0)
+                else:
+                    ev_dt = None
+                yield job, ev_dt, rm
+
+        return write_streaming_report(args, out_dir, joined(), lambda: f"spilled={spill.counts}")
+    finally:
+        spill.close()
+
+
+def run_streaming_run_log(args: argparse.Namespace, run_log_path: Path) -> int:
+    """--streaming over a packed run log: every record already carries all three sides."""
+    out_dir = resolve_out_dir()
+    joined = ((job, started, metrics) for _, job, started, metrics in iter_run_log(run_log_path) if job is not None)
+    return write_streaming_report(args, out_dir, joined, lambda: "run log")
+
+
+def write_streaming_report(
+    args: argparse.Namespace,
+    out_dir: Path,
+    joined: Iterator[Tuple[Dict[str, Any], Optional[dt.datetime], Optional[Dict[str, int]]]],
+    stats=lambda: "",
+) -> int:
+    """Compare (job, STARTED datetime, request metrics) triples as they arrive and write the report."""
+    table_cols = resolve_table_cols(args)
+    selector_valid = StreamingSelector(args)
+    selector_all = StreamingSelector(args)
+    matched = valid = jobs_seen = 0
+    csv_full_path = out_dir / 'comparison_table_full.csv'
+    invalid_tmp = out_dir / 'comparison_table_invalid.tmp.csv'
+    with csv_full_path.open('w', encoding='utf-8', newline='') as cf_full, \
+            invalid_tmp.open('w', encoding='utf-8', newline='') as cf_inv:
+        w_full = _csv.DictWriter(cf_full, fieldnames=CSV_COLS_FULL, extrasaction='ignore')
+        w_full.writeheader()
+        w_inv = _csv.DictWriter(cf_inv, fieldnames=CSV_COLS_FULL, extrasaction='ignore')
+        for job, ev_dt, rm in joined:
+            jobs_seen += 1
+            if ev_dt is None or not job.get("request_id"):
+                continue
+            r = compare_job(job, ev_dt, rm)
+            if r is None:
+                continue
+            matched += 1
+            if matched <= 20:
+                print_result_row(r)
+            selector_all.add(r)
+            if is_valid_result(r):
+                valid += 1
+                selector_valid.add(r)
+                w_full.writerow({k: r.get(k) for k in CSV_COLS_FULL})
+            else:
+                w_inv.writerow({k: r.get(k) for k in CSV_COLS_FULL})
+    # Same fallback as the in-memory mode: with no valid rows report everything
+    if not valid:
+        with csv_full_path.open('a', encoding='utf-8', newline='') as cf_full, \
+                invalid_tmp.open('r', encoding='utf-8', newline='') as cf_inv:
+            for chunk in iter(lambda: cf_inv.read(1 << 20), ''):
+                cf_full.write(chunk)
+    invalid_tmp.unlink()
+    print(f"Streamed jobs: {jobs_seen} | matched={matched} | valid={valid} | {stats()}")
+
+    filtered = table_rows((selector_valid if valid else selector_all).rows(), table_cols)
+    write_html_report(out_dir, filtered, table_cols, matched, valid)
+    write_filtered_csv(out_dir, filtered, table_cols)
+    print(f"CSV (full): {csv_full_path}")
+    return 0
+
+
+# Per-worker logs of a distributed run (load/run.py): one sub-folder per
+# locust worker, same file names as a single-process run.
+WORKER_LOG_FILES = {
+    "requests.csv": "requests.csv",
+    "requests_events.csv": "requests_events.csv",
+    "requests_report.csv": "requests_report.csv",
+    "jobs_from_responses*.csv": "jobs_from_responses.csv",
+}
+
+
+def concat_csv(sources: List[Path], dest: Path) -> int:
+    """Write the header of the first file and the data rows of all ``sources`` into ``dest``."""
+    has_header = False
+    with dest.open("w", encoding="utf-8", newline="") as out:
+        for src in sources:
+            with src.open("r", encoding="utf-8", newline="") as f:
+                header = f.readline()
+                if header and not has_header:
+                    out.write(header)
+                    has_header = True
+                shutil.copyfileobj(f, out, 1024 * 1024)
+    return len(sources)
+
+
+def merge_worker_logs(workers_dir: Path, dest_dir: Path) -> Dict[str, int]:
+    """Concatenate each log kind across ``workers_dir/*/`` into ``dest_dir``.
+
+    Rows stay in per-worker order; the join is by request_id, and --streaming
+    spills whatever falls out of its window, so no global re-sort is needed.
+    Returns {merged file name: number of worker files}.
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    worker_dirs = sorted(d for d in workers_dir.iterdir() if d.is_dir())
+    merged: Dict[str, int] = {}
+    for pattern, name in WORKER_LOG_FILES.items():
+        sources = [p for d in worker_dirs for p in sorted(d.glob(pattern))]
+        if sources:
+            merged[name] = concat_csv(sources, dest_dir / name)
+    run_logs = [p for d in worker_dirs for p in sorted(d.glob(RUN_LOG_GLOB))]
+    if run_logs:
+        merged["run_merged.bpslog"] = concat_run_logs(run_logs, dest_dir / "run_merged.bpslog")
+    return merged
+
+
+def find_run_log(logs_dir: Path, events_csv: Path) -> Optional[Path]:
+    """Latest run_*.bpslog in ``logs_dir``, unless the CSV logs were written after it."""
+    candidates = sorted(logs_dir.glob(RUN_LOG_GLOB), key=lambda x: x.stat().st_mtime) if logs_dir.exists() else []
+    if not candidates:
+        return None
+    latest = candidates[-1]
+    if events_csv.exists() and events_csv.stat().st_mtime > latest.stat().st_mtime:
+        return None
+    return latest
 
 
 def parse_args() -> argparse.Namespace:
@@ -195,22 +1587,45 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--samples-per-bucket", type=int, default=3, help="Samples per bucket to keep (with --bucket-ms)")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of rows in table/filtered CSV")
     parser.add_argument("--columns", type=str, default=None, help="Comma-separated list of columns to include in table/CSV")
+    parser.add_argument("--scalar", action="store_true", help="Force the per-row compare_times path (default: NumPy columnar when available)")
+    parser.add_argument("--verify-columnar", action="store_true",
+                        help="Run both compare_times paths on the loaded data, report the first difference and exit")
+    parser.add_argument("--streaming", action="store_true", help="Bounded-memory join of the request-ordered CSVs (for long soak runs)")
+    parser.add_argument("--window", type=int, default=50000, help="Rows kept in memory per source in --streaming mode before spilling to disk")
+    parser.add_argument("--run-log", type=Path, default=None,
+                        help="Packed run log (run_*.bpslog) to compare; default: the latest one in locust_logs if newer than the CSVs")
+    parser.add_argument("--merge-workers", type=Path, default=None, metavar="DIR",
+                        help="Merge per-worker logs from DIR/*/ into BASE_DIR/locust_logs before comparing")
     return parser.parse_args()
 
 
 def main() -> int:
     args = parse_args()
     root = BASE_ROOT
+    if args.merge_workers:
+        merged = merge_worker_logs(args.merge_workers, root / "locust_logs")
+        for name, count in merged.items():
+            print(f"Merged {count} worker file(s) into {root / 'locust_logs' / name}")
     # Prefer explicit events file; support legacy/alt naming
     events_csv_candidates = [
         root / "locust_logs" / "requests_events.csv",
         root / "locust_logs" / "requests_data_time.csv",
     ]
     events_csv = next((p for p in events_csv_candidates if p.exists()), events_csv_candidates[0])
+    run_log_path = args.run_log or find_run_log(root / "locust_logs", events_csv)
+    if run_log_path is not None:
+        print(f"Using run log: {run_log_path}")
+        if args.streaming:
+            return run_streaming_run_log(args, run_log_path)
+        started_map, jobs, req_metrics = load_run_log(run_log_path)
+        print(f"Loaded run log: {len(started_map)} requests | {len(jobs)} jobs")
+        return report_in_memory(args, started_map, jobs, req_metrics)
     # Requests CSV: prefer the latest timestamped variant requests_YYYYMMDD_HHMMSS.csv, fallback to requests.csv
+    # (the glob alone would also pick requests_events.csv / requests_report.csv)
     requests_dir = root / "locust_logs"
     ts_req_candidates = sorted(
-        (requests_dir.glob("requests_*.csv") if requests_dir.exists() else []),
+        (p for p in (requests_dir.glob("requests_*.csv") if requests_dir.exists() else [])
+         if re.fullmatch(r"requests_\d{8}_\d{6}\.csv", p.name)),
         key=lambda x: x.stat().st_mtime
     )
     requests_csv = ts_req_candidates[-1] if ts_req_candidates else (requests_dir / "requests.csv")
@@ -252,6 +1667,24 @@ def main() -> int:
         print(f"No jobs sources found. Missing: {jobs_json} and {responses_csv}")
         return 1
 
+    if args.streaming:
+        if responses_csv is None or not responses_csv.exists():
+            print("--streaming needs a responses CSV (jobs.json is not request-ordered)")
+            return 1
+        return run_streaming(args, events_csv, requests_csv, responses_csv)
+
+    # Columnar path: the three CSVs go straight into NumPy columns, no per-row dicts
+    columns = None
+    if np is not None and not args.scalar and events_csv.exists() and responses_csv is not None and responses_csv.exists():
+        columns = (
+            event_columns(*load_started_event_columns(events_csv)),
+            load_response_columns(responses_csv),
+            load_request_metric_columns(requests_csv),
+        )
+        print(f"Loaded jobs from responses CSV: {len(columns[1]['request_id'].lengths) if 'request_id' in columns[1] else 0} records")
+        if not args.verify_columnar:
+            return report_columns(args, compare_columns(*columns))
+
     # Load response metrics from requests.csv by request_id and by derived object_id
     req_metrics: Dict[str, Dict[str, int]] = {}
     objid_to_endms: Dict[str, int] = {}
@@ -300,11 +1733,7 @@ def main() -> int:
                     # Derive object_id string from start_ms to allow fallback join
                     if start_ms is not None:
                         try:
-                            start_dt_utc = dt.datetime.utcfromtimestamp(start_ms / 1000.0)
-                            obj_date = start_dt_utc.strftime("%d.%m.%Y")
-                            obj_time = f"{start_dt_utc.strftime('%H:%M:%S')}.{start_dt_utc.strftime('%f')[:5]}Z"
-                            object_id_str = f"{obj_date} {obj_time}"
-                            objid_to_endms[object_id_str] = end_ms
+                            objid_to_endms[format_object_id_ms(start_ms)] = end_ms
                         except Exception:
                             pass
 
@@ -356,164 +1785,83 @@ def main() -> int:
     else:
         jobs = load_jobs(jobs_json)
         print(f"Loaded jobs from jobs.json: {len(jobs)} records")
-    results = compare_times(started_map, jobs, req_metrics)
+    return report_in_memory(args, started_map, jobs, req_metrics, columns)
+
+
+def report_in_memory(
+    args: argparse.Namespace,
+    started_map: Dict[str, dt.datetime],
+    jobs: List[Dict[str, Any]],
+    req_metrics: Dict[str, Dict[str, int]],
+    columns: Optional[Tuple[EventColumns, Dict[str, TextColumn], MetricColumns]] = None,
+) -> int:
+    if args.verify_columnar:
+        if np is None:
+            print("--verify-columnar needs numpy")
+            return 1
+        difference = check_columnar(started_map, jobs, req_metrics, columns)
+        print(f"columnar vs per-row: {difference or 'identical'}")
+        return 1 if difference else 0
+    if np is not None and not args.scalar:
+        return report_columns(args, compare_times_columnar(started_map, jobs, req_metrics))
+
+    results = compare_times(started_map, jobs, req_metrics, columnar=False)
 
     # Diagnostics: how many rows have response_end present
     has_resp_end = sum(1 for r in results if r.get("delta_finished_at_vs_response_end_ms") is not None)
     print(f"matched={len(results)} | with_response_end={has_resp_end}")
     for r in results[:20]:
-        parts = [
-            f"request_id={r['request_id']}",
-            f"delta_started_at_vs_object_id_ms={r['delta_started_at_vs_object_id_ms']}",
-            f"delta_finished_at_vs_response_end_ms={r['delta_finished_at_vs_response_end_ms']}",
-            f"delta_job_duration_vs_object_to_response_end_ms={r['delta_job_duration_vs_object_to_response_end_ms']}",
-            f"locust_response_time_ms={r['locust_response_time_ms']}",
-            f"db_duration_ms={r['db_duration_ms']}",
-            f"delta_resp_vs_db_ms={r['delta_resp_vs_db_ms']}",
-            f"event={r['event']}",
-            f"object_id={r['object_id']}",
-            f"started_at={r['started_at']}",
-            f"finished_at={r['finished_at']}",
-        ]
-        print(" | ".join(parts))
+        print_result_row(r)
 
     # Keep only rows where response_end and job_duration based deltas are present
-    valid_results = [
-        r for r in results
-        if r["delta_finished_at_vs_response_end_ms"] is not None
-        and r["delta_object_id_to_response_end_ms"] is not None
-        and r["delta_job_duration_vs_object_to_response_end_ms"] is not None
-    ]
+    valid_results = [r for r in results if is_valid_result(r)]
     used_for_graphs = valid_results if valid_results else results
 
     # Apply optional filtering/sampling
-    filtered: List[Dict[str, Any]] = list(used_for_graphs)
-    # Range filter on delta_started_at_vs_object_id_ms
-    if args.delta_range_ms is not None:
-        min_d, max_d = args.delta_range_ms
-        filtered = [r for r in filtered if r.get("delta_started_at_vs_object_id_ms") is not None and min_d <= r["delta_started_at_vs_object_id_ms"] <= max_d]
-    # Top-N by absolute delta
-    if args.abs_delta_top is not None and args.abs_delta_top > 0:
-        filtered = sorted(filtered, key=lambda r: abs(r.get("delta_started_at_vs_object_id_ms") or 0), reverse=True)[: args.abs_delta_top]
-    # Bucketing by delta and sampling
-    if args.bucket_ms is not None and args.bucket_ms > 0:
-        from collections import defaultdict
-        buckets: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
-        for r in filtered:
-            d = r.get("delta_started_at_vs_object_id_ms")
-            if d is None:
-                continue
-            b = (d // args.bucket_ms) * args.bucket_ms
-            if len(buckets[b]) < max(1, args.samples_per_bucket):
-                buckets[b].append(r)
-        # Flatten in bucket order
-        filtered = []
-        for b in sorted(buckets.keys()):
-            filtered.extend(buckets[b])
-    # Limit rows
-    if args.limit is not None and args.limit > 0:
-        filtered = filtered[: args.limit]
+    filtered = apply_filters(used_for_graphs, args)
 
-    # Output directory marked by date-time or provided via env
-    env_dir = os.getenv('REPORT_DIR')
-    if env_dir:
-        out_dir = Path(env_dir)
-        out_dir.mkdir(parents=True, exist_ok=True)
-    else:
-        timestamp_str = dt.datetime.now().strftime('%Y%m%d_%H%M%S')
-        out_dir = BASE_ROOT / 'reports' / timestamp_str
-        out_dir.mkdir(parents=True, exist_ok=True)
-    print(f"Report directory: {out_dir}")
-
-    # Build simple HTML report (table only)
-    report_path = out_dir / 'comparison_report.html'
-    labels = [html.escape(r['request_id']) for r in filtered]
-    ds_started_vs_obj = [r.get('delta_started_at_vs_object_id_ms') for r in filtered]
-    ds_finished_vs_resp = [r.get('delta_finished_at_vs_response_end_ms') for r in filtered]
-    ds_jobdur_vs_obj2resp = [r.get('delta_job_duration_vs_object_to_response_end_ms') for r in filtered]
-
-    # Keep only first N to avoid huge pages
-    N = 500
-    labels = labels[:N]
-    ds_started_vs_obj = ds_started_vs_obj[:N]
-    ds_finished_vs_resp = ds_finished_vs_resp[:N]
-    ds_jobdur_vs_obj2resp = ds_jobdur_vs_obj2resp[:N]
-
-    # Choose columns
-    default_cols = [
-        'request_id','delta_started_at_vs_object_id_ms','delta_finished_at_vs_response_end_ms',
-        'delta_job_duration_vs_object_to_response_end_ms','started_at','object_id','finished_at','response_end','job_duration'
-    ]
-    table_cols = [c.strip() for c in args.columns.split(',')] if args.columns else default_cols
-
-    html_content = f"""
-<!DOCTYPE html>
-<html lang=\"ru\">
-<head>
-  <meta charset=\"UTF-8\" />
-  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\" />
-  <title>Jobs vs Events Comparison</title>
-  <style>
-    body {{ font-family: -apple-system, Segoe UI, Roboto, Arial, sans-serif; margin: 16px; }}
-    h2 {{ margin-top: 16px; }}
-    .card {{ border: 1px solid #e5e7eb; border-radius: 8px; padding: 16px; }}
-    table {{ width: 100%; border-collapse: collapse; margin-top: 12px; font-size: 12px; }}
-    th, td {{ border: 1px solid #eee; padding: 6px 8px; text-align: left; }}
-    th {{ background: #fafafa; position: sticky; top: 0; }}
-  </style>
-</head>
-<body>
-  <h1>Сравнение метрик запросов и БД</h1>
-  <p>Всего сопоставлено: <b>{len(results)}</b>. Валидных записей: <b>{len(valid_results)}</b>.</p>
-  {('<p style=\"color:#dc2626\">Нет валидных строк — показаны все записи с пропусками.</p>' if not valid_results else '')}
-
-  <div class=\"card\">
-    <h2>Все записи (таблица)</h2>
-    <table>
-      <thead>
-        <tr>
-          <th>#</th>
-          {''.join([f'<th>{html.escape(col)}</th>' for col in table_cols])}
-        </tr>
-      </thead>
-      <tbody>
-        {''.join([f'<tr><td>{i+1}</td>' + ''.join([f'<td>{html.escape(str(r.get(col)) if r.get(col) is not None else "")}</td>' for col in table_cols]) + '</tr>' for i, r in enumerate(filtered)])}
-      </tbody>
-    </table>
-  </div>
-</body>
-</html>
-"""
-
-    report_path.write_text(html_content, encoding="utf-8")
-    print(f"HTML report: {report_path}")
+    out_dir = resolve_out_dir()
+    table_cols = resolve_table_cols(args)
+    write_html_report(out_dir, table_rows(filtered, table_cols), table_cols, len(results), len(valid_results))
 
     # Save CSVs: filtered and full
     csv_full_path = out_dir / 'comparison_table_full.csv'
-    csv_filtered_path = out_dir / 'comparison_table.csv'
-    csv_cols_full = [
-        'request_id','delta_started_at_vs_object_id_ms','delta_finished_at_vs_response_end_ms',
-        'delta_job_duration_vs_object_to_response_end_ms','locust_response_time_ms','db_duration_ms','delta_resp_vs_db_ms',
-        'started_at','object_id','finished_at','response_end','job_duration'
-    ]
     with csv_full_path.open('w', encoding='utf-8', newline='') as cf_full:
-        w_full = _csv.DictWriter(cf_full, fieldnames=csv_cols_full)
+        w_full = _csv.DictWriter(cf_full, fieldnames=CSV_COLS_FULL, extrasaction='ignore')
         w_full.writeheader()
         for r in (valid_results or results):
-            w_full.writerow({k: r.get(k) for k in csv_cols_full})
-    # Filtered/output
-    with csv_filtered_path.open('w', encoding='utf-8', newline='') as cf_f:
-        w_f = _csv.DictWriter(cf_f, fieldnames=table_cols)
-        w_f.writeheader()
-        for r in filtered:
-            w_f.writerow({k: r.get(k) for k in table_cols})
+            w_full.writerow({k: r.get(k) for k in CSV_COLS_FULL})
+    write_filtered_csv(out_dir, table_rows(filtered, table_cols), table_cols)
     print(f"CSV (full): {csv_full_path}")
-    print(f"CSV (filtered): {csv_filtered_path}")
 
     return 0
 
 
-if __name__ == "__main__":
-    sys.exit(main())
+def report_columns(args: argparse.Namespace, results: ResultColumns) -> int:
+    """report_in_memory for the columnar path: same files, written straight from the columns."""
+    matched = len(results)
+    print(f"matched={matched} | with_response_end={int(results.present('delta_finished_at_vs_response_end_ms').sum())}")
+    for r in results.rows(np.arange(min(matched, 20))):
+        print_result_row(r)
+
+    valid_pos = results.valid_positions()
+    used = valid_pos if len(valid_pos) else np.arange(matched)
+    kept = used[filter_positions(results.column("delta_started_at_vs_object_id_ms", used), args)]
+
+    out_dir = resolve_out_dir()
+    table_cols = resolve_table_cols(args)
+    filtered = results.table(table_cols, kept)
+    write_html_report(out_dir, filtered, table_cols, matched, len(valid_pos))
 
+    csv_full_path = out_dir / 'comparison_table_full.csv'
+    with csv_full_path.open('w', encoding='utf-8', newline='') as cf_full:
+        w_full = _csv.writer(cf_full)
+        w_full.writerow(CSV_COLS_FULL)
+        w_full.writerows(zip(*(results.column(k, used) for k in CSV_COLS_FULL)))
+    write_filtered_csv(out_dir, filtered, table_cols)
+    print(f"CSV (full): {csv_full_path}")
+    return 0
 
+
+if __name__ == "__main__":
+    sys.exit(main())
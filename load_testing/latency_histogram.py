@@ -0,0 +1,258 @@
+"""High-dynamic-range latency histograms for load runs.
+
+A pure-Python take on HdrHistogram: values (microseconds) are bucketed
+log-linearly so that every recorded value keeps ``significant_figures``
+decimal digits of precision, from 1 µs up to hours, in a few thousand
+sparse counters. Histograms with the same precision merge by adding
+counters, so per-worker files can be combined into one exact
+p50/p99/p99.9/max summary without re-reading the request CSVs.
+
+CLI::
+
+    python latency_histogram.py merge <dir-or-files...> [-o merged.json] [--csv summary.csv]
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+HIST_FILE_PREFIX = "latency_hist_"
+MERGED_FILE_NAME = "latency_histograms.json"
+SUMMARY_PERCENTILES = (50.0, 90.0, 99.0, 99.9, 99.99)
+
+
+class HdrHistogram:
+    """Sparse log-linear histogram of non-negative integer values."""
+
+    def __init__(self, significant_figures: int = 3):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be in 1..5")
+        self.significant_figures = significant_figures
+        largest_single_unit = 2 * 10 ** significant_figures
+        self._sub_bucket_bits = math.ceil(math.log2(largest_single_unit))
+        self._half_bits = self._sub_bucket_bits - 1
+        self._half_count = 1 << self._half_bits
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.min_value: Optional[int] = None
+        self.max_value: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        bucket = max(0, value.bit_length() - self._sub_bucket_bits)
+        sub = value >> bucket
+        return ((bucket + 1) << self._half_bits) + sub - self._half_count
+
+    def _value_range(self, index: int):
+        bucket = (index >> self._half_bits) - 1
+        sub = (index & (self._half_count - 1)) + self._half_count
+        if bucket < 0:
+            sub -= self._half_count
+            bucket = 0
+        low = sub << bucket
+        return low, low + (1 << bucket) - 1
+
+    def record(self, value, count: int = 1) -> None:
+        value = int(value)
+        if value < 0:
+            value = 0
+        idx = self._index(value)
+        self.counts[idx] = self.counts.get(idx, 0) + count
+        self.total_count += count
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+
+    def merge(self, other: "HdrHistogram") -> "HdrHistogram":
+        if other.significant_figures != self.significant_figures:
+            raise ValueError("cannot merge histograms with different precision")
+        for idx, cnt in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + cnt
+        self.total_count += other.total_count
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        if other.max_value is not None and (self.max_value is None or other.max_value > self.max_value):
+            self.max_value = other.max_value
+        return self
+
+    def percentile(self, p: float) -> Optional[int]:
+        """Highest value equivalent to the ``p``-th percentile (capped at the exact max)."""
+        if not self.total_count:
+            return None
+        target = max(1, math.ceil(self.total_count * p / 100.0))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= target:
+                return min(self._value_range(idx)[1], self.max_value)
+        return self.max_value
+
+    def mean(self) -> Optional[float]:
+        if not self.total_count:
+            return None
+        total = 0
+        for idx, cnt in self.counts.items():
+            low, high = self._value_range(idx)
+            total += (low + high) / 2 * cnt
+        return total / self.total_count
+
+    def to_dict(self) -> dict:
+        return {
+            "significant_figures": self.significant_figures,
+            "total_count": self.total_count,
+            "min": self.min_value,
+            "max": self.max_value,
+            "counts": {str(k): v for k, v in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HdrHistogram":
+        h = cls(int(data.get("significant_figures", 3)))
+        h.counts = {int(k): int(v) for k, v in data.get("counts", {}).items()}
+        h.total_count = int(data.get("total_count", sum(h.counts.values())))
+        h.min_value = data.get("min")
+        h.max_value = data.get("max")
+        return h
+
+
+class HistogramSet:
+    """Named histograms (all values in microseconds) saved/merged as one JSON file.
+
+    ``counters`` hold events that have no latency, such as open-loop slots
+    skipped at ``LOAD_MAX_IN_FLIGHT``. They are merged and summarised next to
+    the histograms instead of being recorded as fake 0 µs values.
+    """
+
+    unit = "us"
+
+    def __init__(self, names: Iterable[str] = (), significant_figures: int = 3):
+        self.significant_figures = significant_figures
+        self.histograms: Dict[str, HdrHistogram] = {n: HdrHistogram(significant_figures) for n in names}
+        self.counters: Dict[str, int] = {}
+
+    def record(self, name: str, value_us) -> None:
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = HdrHistogram(self.significant_figures)
+        h.record(value_us)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other: "HistogramSet") -> "HistogramSet":
+        for name, h in other.histograms.items():
+            if name in self.histograms:
+                self.histograms[name].merge(h)
+            else:
+                self.histograms[name] = HdrHistogram.from_dict(h.to_dict())
+        for name, n in other.counters.items():
+            self.count(name, n)
+        return self
+
+    def summary(self) -> List[dict]:
+        rows = []
+        for name, h in sorted(self.histograms.items()):
+            row = {"metric": name, "count": h.total_count}
+            for key, value in (("min_ms", h.min_value), ("mean_ms", h.mean())):
+                row[key] = round(value / 1000.0, 3) if value is not None else None
+            for p in SUMMARY_PERCENTILES:
+                v = h.percentile(p)
+                row[f"p{p:g}_ms"] = round(v / 1000.0, 3) if v is not None else None
+            row["max_ms"] = round(h.max_value / 1000.0, 3) if h.max_value is not None else None
+            rows.append(row)
+        for name, n in sorted(self.counters.items()):
+            rows.append({"metric": name, "count": n})
+        return rows
+
+    def save(self, path: Path) -> None:
+        data = {
+            "unit": self.unit,
+            "histograms": {n: h.to_dict() for n, h in self.histograms.items()},
+            "counters": self.counters,
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def attach(self, events, directory: Path) -> None:
+        """Save this process' histograms into ``directory`` on Locust ``test_stop``/``quitting``."""
+        def _save(**kwargs):
+            if self.counters or any(h.total_count for h in self.histograms.values()):
+                directory.mkdir(parents=True, exist_ok=True)
+                self.save(worker_hist_path(directory))
+
+        events.test_stop.add_listener(_save)
+        events.quitting.add_listener(_save)
+
+    @classmethod
+    def load(cls, path: Path) -> "HistogramSet":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        hs = cls()
+        for name, h in data.get("histograms", {}).items():
+            hs.histograms[name] = HdrHistogram.from_dict(h)
+            hs.significant_figures = hs.histograms[name].significant_figures
+        hs.counters = {name: int(n) for name, n in data.get("counters", {}).items()}
+        return hs
+
+
+def worker_hist_path(directory: Path) -> Path:
+    """Per-process file name, so several Locust workers can share one directory."""
+    return directory / f"{HIST_FILE_PREFIX}{os.getpid()}.json"
+
+
+def merge_files(paths: Iterable[Path]) -> HistogramSet:
+    merged = HistogramSet()
+    for p in paths:
+        merged.merge(HistogramSet.load(p))
+    return merged
+
+
+def merge_directory(directory: Path, out_path: Optional[Path] = None, summary_csv: Optional[Path] = None) -> HistogramSet:
+    """Merge every ``latency_hist_*.json`` in ``directory`` and write the combined file/summary."""
+    merged = merge_files(sorted(directory.glob(f"{HIST_FILE_PREFIX}*.json")))
+    if out_path is not None:
+        merged.save(out_path)
+    if summary_csv is not None:
+        write_summary_csv(merged, summary_csv)
+    return merged
+
+
+def write_summary_csv(hs: HistogramSet, path: Path) -> None:
+    rows = hs.summary()
+    if not rows:
+        return
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        w.writeheader()
+        w.writerows(rows)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Merge and summarise latency histograms")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("merge", help="Merge histogram files (or directories of latency_hist_*.json)")
+    m.add_argument("inputs", nargs="+", type=Path)
+    m.add_argument("-o", "--output", type=Path, default=None, help="Merged JSON output")
+    m.add_argument("--csv", type=Path, default=None, help="Percentile summary CSV output")
+    args = parser.parse_args(argv)
+
+    files: List[Path] = []
+    for p in args.inputs:
+        files.extend(sorted(p.glob(f"{HIST_FILE_PREFIX}*.json")) if p.is_dir() else [p])
+    merged = merge_files(files)
+    if args.output:
+        merged.save(args.output)
+    if args.csv:
+        write_summary_csv(merged, args.csv)
+    for row in merged.summary():
+        print(" | ".join(f"{k}={v}" for k, v in row.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,25 @@
 import csv
 import os
+import sys
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
-from locust import HttpUser, task, between, events
+from locust import task, between, constant, events
 
 # All paths are relative to this file folder
 BASE_DIR = Path(__file__).parent.resolve()
-CSV_DIR = BASE_DIR / "locust_logs"
+# Shared helpers (log_sink, ...) live one level up in load_testing/
+sys.path.insert(0, str(BASE_DIR.parent))
+from arrival import RPS_DIVISOR, RPS_SCHEDULE, RateSchedule, report_skipped, run_open_loop  # noqa: E402
+from http_client import CONNECTION_HEADERS, BaseApiUser  # noqa: E402
+from latency_histogram import HistogramSet  # noqa: E402
+from log_sink import sink  # noqa: E402
+from objid_time import format_date, format_time  # noqa: E402
+from run_log import WRITE_BINARY, WRITE_CSV, pack_record, write_log_header  # noqa: E402
+
+# LOCUST_CSV_DIR: per-worker log folder in distributed runs (see run.py)
+CSV_DIR = Path(os.getenv("LOCUST_CSV_DIR", str(BASE_DIR / "locust_logs")))
 CSV_DIR.mkdir(parents=True, exist_ok=True)
 CSV_PATH = CSV_DIR / "requests.csv"
 REPORT_CSV_PATH = CSV_DIR / "requests_report.csv"
@@ -16,6 +27,15 @@ EVENTS_CSV_PATH = CSV_DIR / "requests_events.csv"
 
 # Per-run responses CSV (timestamped)
 RESPONSES_CSV_PATH = CSV_DIR / f"jobs_from_responses_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.csv"
+# Packed per-request log replacing the CSVs above (LOCUST_LOG_FORMAT=binary|both, see run_log.py)
+RUN_LOG_PATH = CSV_DIR / f"run_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.bpslog"
+
+BPS_JOB_PATH = "test_que/test_1.df.json"
+BPS_CALL_PATH = f"/api/ide/llda/branch/main/bps/call?path={BPS_JOB_PATH}"
+
+# Latency histograms (µs), one file per process; merged by latency_histogram.py
+HIST_DIR = Path(os.getenv("LOCUST_HIST_DIR", str(CSV_DIR)))
+histograms = HistogramSet(["response_time", "corrected_response_time", "job_duration"])
 
 
 def ensure_csv_header(path: Path):
@@ -35,6 +55,8 @@ def ensure_csv_header(path: Path):
                 "success",
                 "request_id",
                 "exception",
+                "intended_start_ms",
+                "corrected_response_time_ms",
             ])
 
 
@@ -82,33 +104,42 @@ def ensure_responses_csv_header(path: Path):
         ])
 
 
-ensure_csv_header(CSV_PATH)
-ensure_report_csv_header(REPORT_CSV_PATH)
-ensure_events_csv_header(EVENTS_CSV_PATH)
-ensure_responses_csv_header(RESPONSES_CSV_PATH)
+if WRITE_CSV:
+    ensure_csv_header(CSV_PATH)
+    ensure_report_csv_header(REPORT_CSV_PATH)
+    ensure_events_csv_header(EVENTS_CSV_PATH)
+    ensure_responses_csv_header(RESPONSES_CSV_PATH)
+if WRITE_BINARY:
+    write_log_header(RUN_LOG_PATH, BPS_CALL_PATH, BPS_JOB_PATH)
 
 
-class ApiUser(HttpUser):
+class ApiUser(BaseApiUser):
     host = os.getenv("BASE_URL", "http://192.168.0.7:3333").rstrip("/")
     wait_time = between(1, 2)
+    # Open-loop mode (LOAD_RPS_SCHEDULE) is served by OpenLoopApiUser
+    abstract = bool(RPS_SCHEDULE)
 
     def on_start(self):
-        self.default_headers = {"Content-Type": "application/json"}
+        self.default_headers = {"Content-Type": "application/json", **CONNECTION_HEADERS}
 
     @task
     def call_bps(self):
+        self.send_bps_call()
+
+    def send_bps_call(self, intended_start: float = None):
         request_id = str(uuid.uuid4())
-        path = "/api/ide/llda/branch/main/bps/call?path=test_que/test_1.df.json"
+        path = BPS_CALL_PATH
 
         start_dt_local = datetime.now().astimezone()
         start_dt_utc = datetime.now(timezone.utc)
         start_ms = int(start_dt_utc.timestamp() * 1000)
-        started_date = start_dt_utc.strftime("%d.%m.%Y")
-        started_time = f"{start_dt_utc.strftime('%H:%M:%S')}.{start_dt_utc.strftime('%f')[:5]}Z"
+        intended_ms = int(intended_start * 1000) if intended_start is not None else start_ms
+        started_date = format_date(start_dt_utc)
+        started_time = format_time(start_dt_utc)
         object_id = f"{started_date} {started_time}"
 
-        with EVENTS_CSV_PATH.open("a", newline="", encoding="utf-8") as fe:
-            csv.writer(fe).writerow(["STARTED", started_date, started_time, "", "", request_id])
+        if WRITE_CSV:
+            sink.write(EVENTS_CSV_PATH, ["STARTED", started_date, started_time, "", "", request_id])
 
         payload = {"request_meta": {"object_id": object_id, "request_id": request_id, "tags": "string"}, "request_data": {}}
         with self.client.post(path, json=payload, headers=self.default_headers, name="POST /bps/call", catch_response=True) as resp:
@@ -116,6 +147,13 @@ class ApiUser(HttpUser):
             end_dt_utc = datetime.now(timezone.utc)
             end_ms = int(end_dt_utc.timestamp() * 1000)
             response_time_ms = end_ms - start_ms
+            corrected_response_time_ms = end_ms - intended_ms
+            response_time_us = int((end_dt_utc - start_dt_utc).total_seconds() * 1_000_000)
+            histograms.record("response_time", response_time_us)
+            histograms.record(
+                "corrected_response_time",
+                int((end_dt_utc.timestamp() - intended_start) * 1_000_000) if intended_start is not None else response_time_us,
+            )
 
             if 200 <= resp.status_code < 400:
                 resp.success()
@@ -123,12 +161,21 @@ class ApiUser(HttpUser):
                 resp.failure(f"HTTP {resp.status_code}")
 
             # Save response JSON brief
+            logged_job = None
             try:
                 data = resp.json()
                 job = data if isinstance(data, dict) else (data[0] if isinstance(data, list) and data else {})
                 if isinstance(job, dict):
-                    with RESPONSES_CSV_PATH.open("a", newline="", encoding="utf-8") as fj:
-                        csv.writer(fj).writerow([
+                    job_duration = job.get("job_duration")
+                    if job_duration is not None:
+                        try:
+                            # Длительность может прийти строкой с дробной частью ("12.5")
+                            histograms.record("job_duration", int(float(job_duration) * 1000))
+                        except (TypeError, ValueError, OverflowError):
+                            pass
+                    logged_job = job
+                    if WRITE_CSV:
+                        sink.write(RESPONSES_CSV_PATH, [
                             job.get("request_id", request_id),
                             job.get("object_id", object_id),
                             job.get("status"),
@@ -141,8 +188,8 @@ class ApiUser(HttpUser):
             except Exception:
                 pass
 
-            with CSV_PATH.open("a", newline="", encoding="utf-8") as f:
-                csv.writer(f).writerow([
+            if WRITE_CSV:
+                sink.write(CSV_PATH, [
                     start_ms,
                     start_dt_utc.isoformat(),
                     end_ms,
@@ -155,19 +202,48 @@ class ApiUser(HttpUser):
                     200 <= resp.status_code < 400,
                     request_id,
                     "" if 200 <= resp.status_code < 400 else f"HTTP {resp.status_code}",
+                    intended_ms,
+                    corrected_response_time_ms,
                 ])
 
-            req_date = start_dt_local.strftime("%d.%m.%Y")
-            req_time = f"{start_dt_local.strftime('%H:%M:%S')}.{start_dt_local.strftime('%f')[:5]}"
-            resp_date = end_dt_local.strftime("%d.%m.%Y")
-            resp_time = f"{end_dt_local.strftime('%H:%M:%S')}.{end_dt_local.strftime('%f')[:5]}"
-            with REPORT_CSV_PATH.open("a", newline="", encoding="utf-8") as f2:
-                csv.writer(f2).writerow([req_date, req_time, resp_date, resp_time, resp.status_code, response_time_ms, request_id])
-
-            finished_date = end_dt_utc.strftime("%d.%m.%Y")
-            finished_time = f"{end_dt_utc.strftime('%H:%M:%S')}.{end_dt_utc.strftime('%f')[:5]}Z"
-            with EVENTS_CSV_PATH.open("a", newline="", encoding="utf-8") as fe:
-                csv.writer(fe).writerow(["FINISHED", finished_date, finished_time, resp.status_code, response_time_ms, request_id])
+            req_date = format_date(start_dt_local)
+            req_time = format_time(start_dt_local, z=False)
+            resp_date = format_date(end_dt_local)
+            resp_time = format_time(end_dt_local, z=False)
+            if WRITE_CSV:
+                sink.write(REPORT_CSV_PATH, [req_date, req_time, resp_date, resp_time, resp.status_code, response_time_ms, request_id])
+
+            finished_date = format_date(end_dt_utc)
+            finished_time = format_time(end_dt_utc)
+            if WRITE_CSV:
+                sink.write(EVENTS_CSV_PATH, ["FINISHED", finished_date, finished_time, resp.status_code, response_time_ms, request_id])
+
+            if WRITE_BINARY:
+                sink.write(RUN_LOG_PATH, pack_record(
+                    request_id, start_dt_utc, end_dt_utc, resp.status_code,
+                    intended_ms=intended_ms if intended_start is not None else None,
+                    local_offset=start_dt_local.utcoffset(), job=logged_job,
+                    object_id=object_id, job_path=BPS_JOB_PATH,
+                ))
+
+
+class OpenLoopApiUser(ApiUser):
+    """Issues /bps/call on the LOAD_RPS_SCHEDULE timetable regardless of response times."""
+    abstract = not RPS_SCHEDULE
+    # One dispatcher per generator process; LOAD_RPS_DIVISOR splits the rate between them
+    fixed_count = RPS_DIVISOR
+    wait_time = constant(0)
+
+    @task
+    def call_bps(self):
+        run_open_loop(RateSchedule.parse(RPS_SCHEDULE, RPS_DIVISOR), self.send_bps_call, on_skip=self._report_skipped)
+
+    def _report_skipped(self, intended_start: float):
+        report_skipped(self.environment, histograms, "POST /bps/call")
+
+
+sink.attach(events)
+histograms.attach(events, HIST_DIR)
 
 
 @events.request.add_listener
@@ -9,6 +9,9 @@ BASE_DIR = pathlib.Path(__file__).parent.resolve()
 PROJ_DIR = BASE_DIR.parent.resolve()
 DEFAULT_COMPARE = PROJ_DIR / "compare_jobs_vs_events.py"
 
+sys.path.insert(0, str(PROJ_DIR))
+from latency_histogram import MERGED_FILE_NAME, merge_directory  # noqa: E402
+
 
 def find_compare_script() -> pathlib.Path:
     candidates = [
@@ -25,13 +28,8 @@ def find_compare_script() -> pathlib.Path:
     raise FileNotFoundError("compare_jobs_vs_events.py not found in project. Place it at project root.")
 
 
-def run(users: int, spawn_rate: int, duration_sec: int, host: str) -> None:
-    ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_dir = BASE_DIR / "reports" / ts
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    # 1) Run Locust with HTML report
-    cmd = [
+def locust_cmd(users: int, spawn_rate: int, duration_sec: int, host: str, out_dir: pathlib.Path) -> list:
+    return [
         "locust",
         "-f",
         str(BASE_DIR / "locustfile.py"),
@@ -48,7 +46,100 @@ def run(users: int, spawn_rate: int, duration_sec: int, host: str) -> None:
         "--html",
         str(out_dir / "locust_report.html"),
     ]
-    subprocess.run(cmd, cwd=str(BASE_DIR), check=True)
+
+
+def run_distributed(cmd: list, locust_env: dict, out_dir: pathlib.Path, workers: int, master_port: int) -> None:
+    """Run ``cmd`` as a locust master plus ``workers`` local worker processes.
+
+    Every worker logs into its own ``out_dir/workers/wNN`` folder (CSV files
+    and locust stdout/stderr), merged afterwards by compare_jobs_vs_events.py.
+    """
+    workers_dir = out_dir / "workers"
+    master_env = dict(locust_env, LOCUST_CSV_DIR=str(workers_dir / "master"))
+    master_cmd = [*cmd, "--master", "--master-bind-port", str(master_port), "--expect-workers", str(workers)]
+    master = subprocess.Popen(master_cmd, cwd=str(BASE_DIR), env=master_env)
+
+    procs = []
+    try:
+        for i in range(workers):
+            w_dir = workers_dir / f"w{i:02d}"
+            w_dir.mkdir(parents=True, exist_ok=True)
+            w_env = dict(locust_env, LOCUST_CSV_DIR=str(w_dir))
+            w_cmd = [
+                "locust", "-f", str(BASE_DIR / "locustfile.py"), "--worker",
+                "--master-host", "127.0.0.1", "--master-port", str(master_port),
+            ]
+            log = (w_dir / "locust.log").open("w", encoding="utf-8")
+            procs.append((subprocess.Popen(w_cmd, cwd=str(BASE_DIR), env=w_env, stdout=log, stderr=subprocess.STDOUT), log))
+
+        master_rc = master.wait()
+        # Workers quit when the master stops the test; give them time to flush their logs
+        for proc, log in procs:
+            try:
+                proc.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+            log.close()
+    finally:
+        for proc, log in procs:
+            if proc.poll() is None:
+                proc.kill()
+            log.close()
+        if master.poll() is None:
+            master.kill()
+
+    failed = [i for i, (proc, _) in enumerate(procs) if proc.returncode not in (0, 1)]
+    if failed:
+        print(f"Workers exited abnormally: {', '.join(f'w{i:02d}' for i in failed)} (see workers/wNN/locust.log)")
+    # locust exits with 1 when some requests failed; that is still a finished run
+    if master_rc not in (0, 1):
+        raise subprocess.CalledProcessError(master_rc, master_cmd)
+
+
+def run(
+    users: int,
+    spawn_rate: int,
+    duration_sec: int,
+    host: str,
+    rps_schedule: str = None,
+    fast_http: bool = False,
+    pool_size: int = None,
+    keep_alive: bool = True,
+    workers: int = 0,
+    master_port: int = 5557,
+) -> None:
+    ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_dir = BASE_DIR / "reports" / ts
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # 1) Run Locust with HTML report
+    cmd = locust_cmd(users, spawn_rate, duration_sec, host, out_dir)
+    locust_env = os.environ.copy()
+    # Each locust process drops its latency histogram into the report folder
+    locust_env["LOCUST_HIST_DIR"] = str(out_dir)
+    if rps_schedule:
+        # Open-loop mode: a single dispatcher user issues requests on the timetable
+        locust_env["LOAD_RPS_SCHEDULE"] = rps_schedule
+        if workers:
+            # ... one dispatcher per worker, each at 1/N of the rate
+            locust_env["LOAD_RPS_DIVISOR"] = str(workers)
+    # HTTP client tuning (see http_client.py)
+    if fast_http:
+        locust_env["LOCUST_FAST_HTTP"] = "1"
+    if pool_size:
+        locust_env["LOCUST_POOL_SIZE"] = str(pool_size)
+    if not keep_alive:
+        locust_env["LOCUST_KEEP_ALIVE"] = "0"
+    if workers:
+        run_distributed(cmd, locust_env, out_dir, workers, master_port)
+    else:
+        subprocess.run(cmd, cwd=str(BASE_DIR), env=locust_env, check=True)
+
+    # Merge per-process HDR histograms and write the exact percentile summary
+    merged = merge_directory(out_dir, out_dir / MERGED_FILE_NAME, out_dir / "latency_summary.csv")
+    for row in merged.summary():
+        print(" | ".join(f"{k}={v}" for k, v in row.items()))
 
     # 2) Generate comparison report into the same folder
     compare_script = find_compare_script()
@@ -63,6 +154,10 @@ def run(users: int, spawn_rate: int, duration_sec: int, host: str) -> None:
         # Example: keep both deltas columns by default; columns arg optional
         # "--columns", "request_id,delta_started_at_vs_object_id_ms,delta_finished_at_vs_response_end_ms,started_at,object_id,finished_at,response_end,job_duration",
     ]
+    if workers:
+        # Worker logs are merged into <out_dir>/locust_logs and compared from there
+        env["BASE_DIR"] = str(out_dir)
+        default_args += ["--merge-workers", str(out_dir / "workers")]
     subprocess.run([sys.executable, str(compare_script), *default_args], cwd=str(BASE_DIR), env=env, check=True)
 
     print(f"Done. Reports: {out_dir}")
@@ -74,8 +169,21 @@ def main(argv=None):
     p.add_argument("--spawn-rate", "-r", type=int, default=50, help="Spawn rate")
     p.add_argument("--duration", "-t", type=int, default=60, help="Duration in seconds")
     p.add_argument("--host", "-H", type=str, default="http://192.168.0.7:3333", help="Target host")
+    p.add_argument("--rps-schedule", type=str, default=None,
+                   help="Open-loop target RPS or schedule, e.g. 200 | 50x30,100x30 | 10-300x120 (see arrival.py)")
+    p.add_argument("--fast-http", action="store_true",
+                   help="Use the geventhttpclient-based FastHttpUser instead of python-requests")
+    p.add_argument("--pool-size", type=int, default=None, help="Connections per user (LOCUST_POOL_SIZE, default 10)")
+    p.add_argument("--no-keep-alive", action="store_true", help="Send 'Connection: close' on every request")
+    p.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 1,
+                   help="Local locust worker processes under one master (default: one per core; 0 = single process)")
+    p.add_argument("--master-port", type=int, default=5557, help="Master port for worker connections")
     args = p.parse_args(argv)
-    run(args.users, args.spawn_rate, args.duration, args.host)
+    run(
+        args.users, args.spawn_rate, args.duration, args.host, args.rps_schedule,
+        fast_http=args.fast_http, pool_size=args.pool_size, keep_alive=not args.no_keep_alive,
+        workers=args.workers, master_port=args.master_port,
+    )
 
 
 
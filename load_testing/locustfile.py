@@ -5,7 +5,14 @@ import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
-from locust import HttpUser, task, between, events
+from locust import task, between, constant, events
+
+from arrival import RPS_DIVISOR, RPS_SCHEDULE, RateSchedule, report_skipped, run_open_loop
+from http_client import CONNECTION_HEADERS, BaseApiUser
+from latency_histogram import HistogramSet
+from log_sink import sink
+from objid_time import format_date, format_time
+from run_log import WRITE_BINARY, WRITE_CSV, pack_record, write_log_header
 
 
 CSV_DIR = Path(os.getenv("LOCUST_CSV_DIR", "locust_logs"))
@@ -24,64 +31,83 @@ else:
     timestamp_name = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     RESPONSES_CSV_PATH = CSV_DIR / f"jobs_from_responses_{timestamp_name}.csv"
 RAW_NDJSON_PATH = CSV_DIR / "raw_responses.ndjson"
+# Упакованный лог прогона вместо CSV выше (LOCUST_LOG_FORMAT=binary|both), см. run_log.py
+RUN_LOG_PATH = CSV_DIR / f"run_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.bpslog"
+
+BPS_JOB_PATH = "test_que/test_1.df.json"
+BPS_CALL_PATH = f"/api/ide/llda/branch/main/bps/call?path={BPS_JOB_PATH}"
+# HDR-гистограммы латентности (мкс); по файлу на процесс, сливаются latency_histogram.py merge
+HIST_DIR = Path(os.getenv("LOCUST_HIST_DIR", str(CSV_DIR)))
+histograms = HistogramSet(["response_time", "corrected_response_time", "job_duration"])
+
+
+def ensure_header(path: Path, header: list):
+    """Пишет заголовок в новый файл; файл со старым заголовком (другим набором колонок) переименовывается"""
+    if path.exists():
+        with path.open("r", newline="", encoding="utf-8") as f:
+            existing = next(csv.reader(f), None)
+        if existing == header:
+            return
+        stamp = datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y%m%d_%H%M%S")
+        rotated = path.with_name(f"{path.stem}_{stamp}{path.suffix}")
+        path.replace(rotated)
+        print(f"[INFO] {path}: заголовок изменился, старый файл переименован в {rotated.name}")
+    with path.open("w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(header)
 
 
 def ensure_csv_header(path: Path):
-    if not path.exists():
-        with path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "timestamp_start_ms",
-                "timestamp_start_iso",
-                "timestamp_end_ms",
-                "timestamp_end_iso",
-                "response_time_ms",
-                "method",
-                "name",
-                "path",
-                "status_code",
-                "success",
-                "request_id",
-                "exception",
-            ])
-
-
-ensure_csv_header(CSV_PATH)
+    ensure_header(path, [
+        "timestamp_start_ms",
+        "timestamp_start_iso",
+        "timestamp_end_ms",
+        "timestamp_end_iso",
+        "response_time_ms",
+        "method",
+        "name",
+        "path",
+        "status_code",
+        "success",
+        "request_id",
+        "exception",
+        "intended_start_ms",
+        "corrected_response_time_ms",
+    ])
+
+
+if WRITE_CSV:
+    ensure_csv_header(CSV_PATH)
 
 
 def ensure_report_csv_header(path: Path):
-    if not path.exists():
-        with path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "request_date",
-                "request_time",
-                "response_date",
-                "response_time",
-                "status_code",
-                "duration_ms",
-                "request_id",
-            ])
+    ensure_header(path, [
+        "request_date",
+        "request_time",
+        "response_date",
+        "response_time",
+        "status_code",
+        "duration_ms",
+        "request_id",
+    ])
 
 
-ensure_report_csv_header(REPORT_CSV_PATH)
+if WRITE_CSV:
+    ensure_report_csv_header(REPORT_CSV_PATH)
 
 
 def ensure_events_csv_header(path: Path):
-    if not path.exists():
-        with path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "event_type",  # STARTED | FINISHED
-                "event_date",
-                "event_time",
-                "status_code",
-                "duration_ms",
-                "request_id",
-            ])
+    ensure_header(path, [
+        "event_type",  # STARTED | FINISHED
+        "event_date",
+        "event_time",
+        "status_code",
+        "duration_ms",
+        "request_id",
+    ])
 
 
-ensure_events_csv_header(EVENTS_CSV_PATH)
+if WRITE_CSV:
+    ensure_events_csv_header(EVENTS_CSV_PATH)
 
 
 def ensure_responses_csv_header(path: Path):
@@ -100,40 +126,49 @@ def ensure_responses_csv_header(path: Path):
         ])
 
 
-ensure_responses_csv_header(RESPONSES_CSV_PATH)
+if WRITE_CSV:
+    ensure_responses_csv_header(RESPONSES_CSV_PATH)
+if WRITE_BINARY:
+    write_log_header(RUN_LOG_PATH, BPS_CALL_PATH, BPS_JOB_PATH)
 
 
-class ApiUser(HttpUser):
+class ApiUser(BaseApiUser):
     # Базовый хост можно переопределить переменной окружения BASE_URL
     host = os.getenv("BASE_URL", "http://192.168.0.7:3333").rstrip("/")
     wait_time = between(1, 2)
+    # При заданном LOAD_RPS_SCHEDULE нагрузку подаёт OpenLoopApiUser
+    abstract = bool(RPS_SCHEDULE)
 
     def on_start(self):
         # Только базовые заголовки (без авторизации)
-        self.default_headers = {"Content-Type": "application/json"}
+        self.default_headers = {"Content-Type": "application/json", **CONNECTION_HEADERS}
 
     @task
     def call_bps(self):
+        self.send_bps_call()
+
+    def send_bps_call(self, intended_start: float = None):
+        """Один вызов /bps/call; intended_start — плановое время старта (epoch, с) в open-loop режиме."""
         # Динамический request_id для корреляции с БД
         request_id = str(uuid.uuid4())
 
         # Параметры запроса
-        path = "/api/ide/llda/branch/main/bps/call?path=test_que/test_1.df.json"
+        path = BPS_CALL_PATH
 
         # Время: локальное (для обратной совместимости object_id) и UTC (для корректной корреляции с БД)
         start_dt_local = datetime.now().astimezone()
         start_dt_utc = datetime.now(timezone.utc)
         start_ms = int(start_dt_utc.timestamp() * 1000)
-        started_date = start_dt_utc.strftime("%d.%m.%Y")
-        started_time = f"{start_dt_utc.strftime('%H:%M:%S')}.{start_dt_utc.strftime('%f')[:5]}Z"
+        intended_ms = int(intended_start * 1000) if intended_start is not None else start_ms
+        started_date = format_date(start_dt_utc)
+        started_time = format_time(start_dt_utc)
 
         # object_id = та же самая метка времени старта
         object_id = f"{started_date} {started_time}"
 
-        # МГНОВЕННАЯ запись события старта до отправки запроса
-        with EVENTS_CSV_PATH.open("a", newline="", encoding="utf-8") as fe:
-            writer_e = csv.writer(fe)
-            writer_e.writerow([
+        # Событие старта ставится в очередь до отправки запроса (запись на диск — в фоне)
+        if WRITE_CSV:
+            sink.write(EVENTS_CSV_PATH, [
                 "STARTED",
                 started_date,
                 started_time,
@@ -161,6 +196,14 @@ class ApiUser(HttpUser):
             end_dt_utc = datetime.now(timezone.utc)
             end_ms = int(end_dt_utc.timestamp() * 1000)
             response_time_ms = end_ms - start_ms
+            # Латентность от планового старта (коррекция coordinated omission)
+            corrected_response_time_ms = end_ms - intended_ms
+            response_time_us = int((end_dt_utc - start_dt_utc).total_seconds() * 1_000_000)
+            histograms.record("response_time", response_time_us)
+            histograms.record(
+                "corrected_response_time",
+                int((end_dt_utc.timestamp() - intended_start) * 1_000_000) if intended_start is not None else response_time_us,
+            )
 
             success = 200 <= resp.status_code < 400
             exception_text = ""
@@ -171,13 +214,21 @@ class ApiUser(HttpUser):
                 resp.success()
 
             # Парсим JSON и сохраняем ключевые поля из ответа
+            logged_job = None
             try:
                 data = resp.json()
                 job = data if isinstance(data, dict) else (data[0] if isinstance(data, list) and data else {})
                 if isinstance(job, dict):
-                    with RESPONSES_CSV_PATH.open("a", newline="", encoding="utf-8") as fj:
-                        wj = csv.writer(fj)
-                        wj.writerow([
+                    job_duration = job.get("job_duration")
+                    if job_duration is not None:
+                        try:
+                            # Длительность может прийти строкой с дробной частью ("12.5")
+                            histograms.record("job_duration", int(float(job_duration) * 1000))
+                        except (TypeError, ValueError, OverflowError):
+                            pass
+                    logged_job = job
+                    if WRITE_CSV:
+                        sink.write(RESPONSES_CSV_PATH, [
                             job.get("request_id", request_id),
                             job.get("object_id", object_id),
                             job.get("status"),
@@ -192,9 +243,8 @@ class ApiUser(HttpUser):
                 pass
 
             # Запись в CSV для последующей корреляции
-            with CSV_PATH.open("a", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow([
+            if WRITE_CSV:
+                sink.write(CSV_PATH, [
                     start_ms,
                     start_dt_utc.isoformat(),
                     end_ms,
@@ -207,17 +257,18 @@ class ApiUser(HttpUser):
                     success,
                     request_id,
                     exception_text,
+                    intended_ms,
+                    corrected_response_time_ms,
                 ])
 
             # Кастомный отчёт в требуемом формате
             # В отчёт по-прежнему пишем локальное время для читаемости
-            req_date = start_dt_local.strftime("%d.%m.%Y")
-            req_time = f"{start_dt_local.strftime('%H:%M:%S')}.{start_dt_local.strftime('%f')[:5]}"
-            resp_date = end_dt_local.strftime("%d.%m.%Y")
-            resp_time = f"{end_dt_local.strftime('%H:%M:%S')}.{end_dt_local.strftime('%f')[:5]}"
-            with REPORT_CSV_PATH.open("a", newline="", encoding="utf-8") as f2:
-                writer2 = csv.writer(f2)
-                writer2.writerow([
+            req_date = format_date(start_dt_local)
+            req_time = format_time(start_dt_local, z=False)
+            resp_date = format_date(end_dt_local)
+            resp_time = format_time(end_dt_local, z=False)
+            if WRITE_CSV:
+                sink.write(REPORT_CSV_PATH, [
                     req_date,
                     req_time,
                     resp_date,
@@ -227,12 +278,11 @@ class ApiUser(HttpUser):
                     request_id,
                 ])
 
-            # МГНОВЕННАЯ запись события завершения после получения ответа
-            finished_date = end_dt_utc.strftime("%d.%m.%Y")
-            finished_time = f"{end_dt_utc.strftime('%H:%M:%S')}.{end_dt_utc.strftime('%f')[:5]}Z"
-            with EVENTS_CSV_PATH.open("a", newline="", encoding="utf-8") as fe:
-                writer_e = csv.writer(fe)
-                writer_e.writerow([
+            # Событие завершения после получения ответа
+            finished_date = format_date(end_dt_utc)
+            finished_time = format_time(end_dt_utc)
+            if WRITE_CSV:
+                sink.write(EVENTS_CSV_PATH, [
                     "FINISHED",
                     finished_date,
                     finished_time,
@@ -241,6 +291,36 @@ class ApiUser(HttpUser):
                     request_id,
                 ])
 
+            # Одна запись на запрос в бинарный лог
+            if WRITE_BINARY:
+                sink.write(RUN_LOG_PATH, pack_record(
+                    request_id, start_dt_utc, end_dt_utc, resp.status_code,
+                    intended_ms=intended_ms if intended_start is not None else None,
+                    local_offset=start_dt_local.utcoffset(), job=logged_job,
+                    object_id=object_id, job_path=BPS_JOB_PATH,
+                ))
+
+
+class OpenLoopApiUser(ApiUser):
+    """Open-loop диспетчер: запросы по расписанию LOAD_RPS_SCHEDULE независимо от времени ответа."""
+    abstract = not RPS_SCHEDULE
+    # По одному диспетчеру на процесс-генератор; LOAD_RPS_DIVISOR делит между ними RPS
+    fixed_count = RPS_DIVISOR
+    wait_time = constant(0)
+
+    @task
+    def call_bps(self):
+        schedule = RateSchedule.parse(RPS_SCHEDULE, RPS_DIVISOR)
+        run_open_loop(schedule, self.send_bps_call, on_skip=self._report_skipped)
+
+    def _report_skipped(self, intended_start: float):
+        report_skipped(self.environment, histograms, "POST /bps/call")
+
+
+# Финальный сброс буфера логов при остановке теста/выходе Locust
+sink.attach(events)
+histograms.attach(events, HIST_DIR)
+
 
 # Дополнительно можно подписаться на события Locust (необязательно)
 @events.request.add_listener
@@ -0,0 +1,122 @@
+"""Buffered CSV sink shared by the locustfiles.
+
+Rows are appended to an in-memory queue on the request path and written to
+disk by a background flusher, either every ``flush_interval`` seconds or as
+soon as ``batch_size`` rows are pending. Under Locust ``threading`` is
+monkey-patched by gevent, so the flusher is a greenlet on the same hub as the
+users; the file writes themselves are handed to gevent's native threadpool,
+so a flush does not block the request loop and the task code never opens a
+file itself.
+"""
+import atexit
+import csv
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import gevent
+    from gevent import monkey
+except ImportError:  # plain threading outside Locust
+    gevent = None
+
+
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("LOCUST_LOG_FLUSH_INTERVAL", "1.0"))
+DEFAULT_BATCH_SIZE = int(os.getenv("LOCUST_LOG_BATCH_SIZE", "2000"))
+
+
+def _in_os_thread(fn, *args):
+    """Call ``fn`` in a native thread when ``threading`` is gevent-patched (blocks only the caller's greenlet)."""
+    if gevent is not None and monkey.is_module_patched("threading"):
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+
+class CsvLogSink:
+    """Queue of ``(path, row)`` records flushed to CSV files in batches."""
+
+    def __init__(self, flush_interval: float = DEFAULT_FLUSH_INTERVAL, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self._queue: Deque[Tuple[Path, Sequence]] = deque()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def write_header(self, path: Path, header: Iterable[str], truncate: bool = False) -> None:
+        """Synchronously create ``path`` with ``header`` (module import time only)."""
+        if truncate or not path.exists():
+            with path.open("w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow(list(header))
+
+    def write(self, path: Path, row: Sequence) -> None:
+        """Enqueue one row (or one ``bytes`` record for a binary file); never touches the filesystem."""
+        self._queue.append((path, row))
+        if self._thread is None:
+            self.start()
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="csv-log-sink", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self, offload: bool = True) -> int:
+        """Write every pending row, grouped per file. Returns rows written.
+        offload: do the file I/O in a native thread under gevent (see _in_os_thread).
+        """
+        with self._flush_lock:
+            grouped: Dict[Path, List[Sequence]] = {}
+            written = 0
+            while self._queue:
+                path, row = self._queue.popleft()
+                grouped.setdefault(path, []).append(row)
+                written += 1
+            if grouped:
+                if offload:
+                    _in_os_thread(self._write_groups, grouped)
+                else:
+                    self._write_groups(grouped)
+            return written
+
+    @staticmethod
+    def _write_groups(grouped: Dict[Path, List[Sequence]]) -> None:
+        for path, rows in grouped.items():
+            if isinstance(rows[0], bytes):
+                # Pre-packed binary records (run_log.py)
+                with path.open("ab") as f:
+                    f.write(b"".join(rows))
+                continue
+            with path.open("a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(rows)
+
+    def close(self) -> None:
+        """Stop the flusher and write whatever is still queued."""
+        self._stopped.set()
+        self._wakeup.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=max(self.flush_interval, 1.0) * 5)
+        # Shutdown (atexit may run after the hub is gone): write inline
+        self.flush(offload=False)
+
+    def attach(self, events) -> None:
+        """Subscribe to Locust ``test_stop``/``quitting`` for the final flush."""
+        events.test_stop.add_listener(lambda **kwargs: self.flush())
+        events.quitting.add_listener(lambda **kwargs: self.close())
+
+
+sink = CsvLogSink()
+atexit.register(sink.close)
@@ -0,0 +1,217 @@
+"""Local stand-in for ``POST /api/ide/llda/branch/main/bps/call``.
+
+Lets the load harness (locustfiles, CSV writers, compare_jobs_vs_events.py)
+be benchmarked end to end on one box without the real engine. Plain asyncio
+HTTP/1.1 with keep-alive, no third-party dependencies.
+
+The response mirrors the engine's job JSON: ``request_meta`` is echoed
+(``request_id``, ``object_id``), ``path`` comes from the query string, and
+``started_at``/``finished_at`` (naive UTC ISO), ``job_duration`` (ms) and
+``job_uuid`` are filled in from the simulated timings:
+
+* ``--queue-delay`` -- time from receiving the request to ``started_at``;
+* ``--latency``     -- job duration from ``started_at`` to ``finished_at``.
+
+Distributions (milliseconds)::
+
+    const:20            always 20
+    uniform:5,50        uniform in [5, 50]
+    exp:20              exponential with mean 20
+    normal:20,5         normal, clipped at 0
+    lognormal:20,0.5    log-normal with median 20 and sigma 0.5
+
+``--error-rate`` answers that fraction of calls with ``--error-status``.
+
+Usage::
+
+    python mock_bps_server.py --port 8000 --latency lognormal:15,0.6 --error-rate 0.01
+    BASE_URL=http://127.0.0.1:8000 locust -f clean_load/locustfile.py ...
+"""
+import argparse
+import asyncio
+import datetime as dt
+import json
+import math
+import random
+import sys
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+BPS_CALL_PATH = "/api/ide/llda/branch/main/bps/call"
+
+_STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+                500: "Internal Server Error", 502: "Bad Gateway", 503: "Service Unavailable"}
+
+
+def parse_distribution(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Sampler (ms) for ``kind:arg[,arg]``, see module docstring."""
+    kind, _, params = spec.partition(":")
+    try:
+        args = [float(x) for x in params.split(",")] if params else []
+        if kind == "const" and len(args) == 1:
+            value = args[0]
+            return lambda: value
+        if kind == "uniform" and len(args) == 2:
+            return lambda: rng.uniform(args[0], args[1])
+        if kind == "exp" and len(args) == 1:
+            return lambda: rng.expovariate(1.0 / args[0]) if args[0] > 0 else 0.0
+        if kind == "normal" and len(args) == 2:
+            return lambda: max(0.0, rng.gauss(args[0], args[1]))
+        if kind == "lognormal" and len(args) == 2:
+            mu = math.log(args[0]) if args[0] > 0 else 0.0
+            return lambda: rng.lognormvariate(mu, args[1])
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"invalid distribution: {spec!r}")
+
+
+class MockBpsServer:
+    """Simulated engine: echoes request_meta and answers after the sampled delays."""
+
+    def __init__(
+        self,
+        latency: Callable[[], float],
+        queue_delay: Callable[[], float],
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        rng: Optional[random.Random] = None,
+    ):
+        self.latency = latency
+        self.queue_delay = queue_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = rng or random.Random()
+        self.stats: Dict[str, int] = {"requests": 0, "ok": 0, "errors": 0, "not_found": 0, "bad_request": 0}
+
+    def build_job(self, received: dt.datetime, meta: dict, path: str) -> Tuple[dict, float]:
+        """Job JSON and the total simulated delay in seconds."""
+        queue_ms = self.queue_delay()
+        duration_ms = self.latency()
+        started = received + dt.timedelta(milliseconds=queue_ms)
+        finished = started + dt.timedelta(milliseconds=duration_ms)
+        job = {
+            "request_id": meta.get("request_id"),
+            "object_id": meta.get("object_id"),
+            "status": "finished",
+            "path": path,
+            "started_at": started.isoformat(),
+            "finished_at": finished.isoformat(),
+            "job_duration": int((finished - started) / dt.timedelta(milliseconds=1)),
+            "job_uuid": str(uuid.uuid4()),
+        }
+        return job, (queue_ms + duration_ms) / 1000.0
+
+    async def handle_call(self, target: str, body: bytes) -> Tuple[int, dict]:
+        received = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+        try:
+            payload = json.loads(body or b"{}")
+            meta = payload.get("request_meta") or {}
+            if not isinstance(meta, dict):
+                raise ValueError("request_meta must be an object")
+        except (ValueError, AttributeError) as exc:
+            self.stats["bad_request"] += 1
+            return 400, {"error": f"bad request body: {exc}"}
+
+        path = parse_qs(urlsplit(target).query).get("path", [""])[0]
+        job, delay_s = self.build_job(received, meta, path)
+        if delay_s > 0:
+            await asyncio.sleep(delay_s)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return self.error_status, {"error": "simulated failure", "request_id": meta.get("request_id")}
+        self.stats["ok"] += 1
+        return 200, job
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, version = (lines[0].split(" ", 2) + ["", ""])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                self.stats["requests"] += 1
+                conn = headers.get("connection", "").lower()
+                keep_alive = conn != "close" and (version == "HTTP/1.1" or conn == "keep-alive")
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    # The body boundary is unknown, so answer 400 and drop the connection
+                    self.stats["bad_request"] += 1
+                    status, data = 400, {"error": f"bad Content-Length: {headers.get('content-length')!r}"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    if method == "POST" and urlsplit(target).path == BPS_CALL_PATH:
+                        status, data = await self.handle_call(target, body)
+                    else:
+                        self.stats["not_found"] += 1
+                        status, data = 404, {"error": f"no route for {method} {target}"}
+
+                payload = json.dumps(data).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, 'Error')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            writer.close()
+
+
+async def serve(server: MockBpsServer, host: str, port: int) -> None:
+    srv = await asyncio.start_server(server.handle_connection, host, port, backlog=4096)
+    print(f"Mock bps/call listening on http://{host}:{port}{BPS_CALL_PATH}")
+    async with srv:
+        try:
+            await srv.serve_forever()
+        finally:
+            print(" | ".join(f"{k}={v}" for k, v in server.stats.items()))
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Local mock of the /bps/call endpoint")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--latency", default="lognormal:10,0.5", help="Job duration distribution, ms (see module docstring)")
+    p.add_argument("--queue-delay", default="const:0", help="Delay before started_at, ms")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with --error-status")
+    p.add_argument("--error-status", type=int, default=500)
+    p.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    args = p.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    try:
+        server = MockBpsServer(
+            latency=parse_distribution(args.latency, rng),
+            queue_delay=parse_distribution(args.queue_delay, rng),
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            rng=rng,
+        )
+    except argparse.ArgumentTypeError as exc:
+        p.error(str(exc))
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
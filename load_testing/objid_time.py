@@ -0,0 +1,169 @@
+"""Parse/format the ``DD.MM.YYYY HH:MM:SS.fffff[Z]`` timestamps used for object_id.
+
+The locustfiles write ``object_id`` and the STARTED/FINISHED event times in
+this fixed layout (UTC, 5-digit fraction, trailing ``Z``), and
+``compare_jobs_vs_events.py`` reads them back. ``strptime`` re-interprets the
+format string on every call; here the fields are sliced at fixed offsets and
+the date part is resolved once per distinct day through a small cache of the
+midnight epoch (likewise ``HH:MM:SS`` once per distinct second). Anything
+that doesn't match the layout exactly falls back to ``strptime``, so results
+(and errors) are the same as before.
+
+Benchmark::
+
+    python objid_time.py bench [-n 1000000]
+"""
+import argparse
+import datetime as dt
+import sys
+import time
+from typing import Dict, Tuple
+
+
+OBJECT_ID_FORMAT = "%d.%m.%Y %H:%M:%S.%f"
+
+_EPOCH = dt.datetime(1970, 1, 1)
+_US_PER_DAY = 86_400_000_000
+_DATE_CACHE_SIZE = 4096
+_FRACTION_SCALE = (0, 100_000, 10_000, 1_000, 100, 10, 1)
+
+# "DD.MM.YYYY" -> (midnight epoch µs, year, month, day)
+_midnights: Dict[str, Tuple[int, int, int, int]] = {}
+# "HH:MM:SS" -> (hour, minute, second, seconds of day); at most 86400 entries
+_clocks: Dict[str, Tuple[int, int, int, int]] = {}
+# day ordinal -> "DD.MM.YYYY"
+_date_strings: Dict[int, str] = {}
+
+
+def _midnight(date_str: str) -> Tuple[int, int, int, int]:
+    entry = _midnights.get(date_str)
+    if entry is None:
+        if len(date_str) != 10 or date_str[2] != "." or date_str[5] != ".":
+            raise ValueError(date_str)
+        digits = date_str[0:2] + date_str[3:5] + date_str[6:10]
+        if not (digits.isascii() and digits.isdigit()):
+            raise ValueError(date_str)
+        day = dt.date(int(date_str[6:10]), int(date_str[3:5]), int(date_str[0:2]))
+        entry = ((day.toordinal() - 719163) * _US_PER_DAY, day.year, day.month, day.day)
+        if len(_midnights) >= _DATE_CACHE_SIZE:
+            _midnights.clear()
+        _midnights[date_str] = entry
+    return entry
+
+
+def _clock(hms: str) -> Tuple[int, int, int, int]:
+    """(hour, minute, second, seconds of day) for ``HH:MM:SS`` (cached)."""
+    entry = _clocks.get(hms)
+    if entry is None:
+        digits = hms[0:2] + hms[3:5] + hms[6:8]
+        if len(hms) != 8 or hms[2] != ":" or hms[5] != ":" or not (digits.isascii() and digits.isdigit()):
+            raise ValueError(hms)
+        hour, minute, second = int(digits[0:2]), int(digits[2:4]), int(digits[4:6])
+        if hour > 23 or minute > 59 or second > 59:
+            raise ValueError(hms)
+        entry = _clocks[hms] = (hour, minute, second, (hour * 60 + minute) * 60 + second)
+    return entry
+
+
+def _fraction_us(s: str) -> int:
+    """Microseconds of the 1-6 digit fraction after s[19] == '.', optional trailing 'Z'."""
+    frac = s[20:-1] if s[-1] == "Z" else s[20:]
+    n = len(frac)
+    if s[19] != "." or not 1 <= n <= 6 or not (frac.isascii() and frac.isdigit()):
+        raise ValueError(s)
+    return int(frac) * _FRACTION_SCALE[n]
+
+
+def parse_object_id(s: str) -> dt.datetime:
+    """Naive (UTC) datetime from ``DD.MM.YYYY HH:MM:SS.fffff`` with optional trailing 'Z'."""
+    try:
+        if s[10] != " ":
+            raise ValueError(s)
+        _, year, month, day = _midnight(s[:10])
+        hour, minute, second, _ = _clock(s[11:19])
+        return dt.datetime(year, month, day, hour, minute, second, _fraction_us(s))
+    except (ValueError, IndexError):
+        return dt.datetime.strptime(s.rstrip("Z"), OBJECT_ID_FORMAT)
+
+
+def parse_object_id_us(s: str) -> int:
+    """Same as :func:`parse_object_id`, as integer microseconds since the Unix epoch."""
+    try:
+        if s[10] != " ":
+            raise ValueError(s)
+        return _midnight(s[:10])[0] + _clock(s[11:19])[3] * 1_000_000 + _fraction_us(s)
+    except (ValueError, IndexError):
+        d = dt.datetime.strptime(s.rstrip("Z"), OBJECT_ID_FORMAT)
+        return (d - _EPOCH) // dt.timedelta(microseconds=1)
+
+
+def parse_event_time(event_date: str, event_time: str) -> dt.datetime:
+    """Datetime of an events CSV row (``event_date`` + ``event_time`` columns)."""
+    return parse_object_id(f"{event_date} {event_time}")
+
+
+def format_date(d: dt.datetime) -> str:
+    """``DD.MM.YYYY`` (cached per day)."""
+    ordinal = d.toordinal()
+    s = _date_strings.get(ordinal)
+    if s is None:
+        if len(_date_strings) >= _DATE_CACHE_SIZE:
+            _date_strings.clear()
+        s = _date_strings[ordinal] = f"{d.day:02d}.{d.month:02d}.{d.year:04d}"
+    return s
+
+
+def format_time(d: dt.datetime, z: bool = True) -> str:
+    """``HH:MM:SS.fffff`` (fraction truncated to 5 digits), with trailing 'Z' by default."""
+    return f"{d.hour:02d}:{d.minute:02d}:{d.second:02d}.{d.microsecond // 10:05d}{'Z' if z else ''}"
+
+
+def format_object_id(d: dt.datetime, z: bool = True) -> str:
+    return f"{format_date(d)} {format_time(d, z)}"
+
+
+def format_object_id_ms(epoch_ms: int) -> str:
+    """object_id string for a UTC epoch-milliseconds value."""
+    return format_object_id(_EPOCH + dt.timedelta(milliseconds=epoch_ms))
+
+
+def _bench(n: int) -> None:
+    start = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    # ~1 ms apart, spanning a couple of days like a long load run
+    stamps = [start + dt.timedelta(microseconds=i * 997 + i % 10 * 10) for i in range(n)]
+    values = [f"{d.strftime('%d.%m.%Y')} {d.strftime('%H:%M:%S')}.{d.strftime('%f')[:5]}Z" for d in stamps]
+
+    def timed(label, fn):
+        t0 = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - t0
+        print(f"{label:<34} {elapsed:8.3f}s  {elapsed / n * 1e9:8.0f} ns/value")
+        return out, elapsed
+
+    slow, t_slow = timed("strptime", lambda: [dt.datetime.strptime(v.rstrip("Z"), OBJECT_ID_FORMAT) for v in values])
+    fast, t_fast = timed("parse_object_id", lambda: [parse_object_id(v) for v in values])
+    fast_us, _ = timed("parse_object_id_us", lambda: [parse_object_id_us(v) for v in values])
+    strf, t_strf = timed(
+        "strftime (writer)",
+        lambda: [f"{d.strftime('%d.%m.%Y')} {d.strftime('%H:%M:%S')}.{d.strftime('%f')[:5]}Z" for d in stamps],
+    )
+    fmt, t_fmt = timed("format_object_id", lambda: [format_object_id(d) for d in stamps])
+
+    assert fast == slow, "parse_object_id differs from strptime"
+    assert fast_us == [(d - _EPOCH) // dt.timedelta(microseconds=1) for d in slow], "parse_object_id_us differs"
+    assert fmt == strf, "format_object_id differs from strftime"
+    print(f"parse speedup x{t_slow / t_fast:.1f}, format speedup x{t_strf / t_fmt:.1f} on {n} values")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="object_id timestamp helpers")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bench", help="Compare against strptime/strftime")
+    b.add_argument("-n", type=int, default=1_000_000, help="Number of values")
+    args = parser.parse_args(argv)
+    _bench(args.n)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
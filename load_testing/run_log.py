@@ -0,0 +1,476 @@
+"""Packed binary run log: one fixed-size record per /bps/call request.
+
+With ``LOCUST_LOG_FORMAT=binary`` (or ``both``) the locustfiles append one
+record per request to ``run_<ts>.bpslog`` instead of writing the same data
+four times as ``requests.csv``, ``requests_report.csv``,
+``requests_events.csv`` and ``jobs_from_responses*.csv``.
+
+Layout: ``MAGIC``, a little-endian uint32 length, a JSON metadata block
+(request path/method/name, the job ``path`` expected back, the record size),
+then ``RECORD`` structs back to back. Timestamps are integer epoch-µs (UTC),
+ids are raw 16-byte UUIDs. Job fields that don't fit the packed encoding
+(an unknown status, a non-UUID job_uuid, a differently formatted started_at,
+...) go verbatim into a small JSON tail after the record, so the legacy CSVs
+can always be reproduced exactly::
+
+    python run_log.py to-csv locust_logs/run_20250101_120000.bpslog [-o out_dir]
+    python run_log.py info locust_logs/run_20250101_120000.bpslog
+
+``compare_jobs_vs_events.py`` reads the log directly (``iter_response_view``).
+"""
+import argparse
+import csv
+import datetime as dt
+import json
+import os
+import shutil
+import struct
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from objid_time import format_date, format_object_id, format_time
+
+
+LOG_FORMAT = os.getenv("LOCUST_LOG_FORMAT", "csv").strip().lower()
+if LOG_FORMAT not in ("csv", "binary", "both"):
+    raise ValueError(f"LOCUST_LOG_FORMAT must be csv, binary or both, got {LOG_FORMAT!r}")
+WRITE_CSV = LOG_FORMAT in ("csv", "both")
+WRITE_BINARY = LOG_FORMAT in ("binary", "both")
+
+MAGIC = b"BPSLOG\x01\n"
+RUN_LOG_GLOB = "run_*.bpslog"
+
+# request_id, intended_ms, start_us, end_us, local_offset_min, status_code, flags,
+# job_status, job_started_us, job_finished_us, job_duration, job_uuid, tail_len
+RECORD = struct.Struct("<16sqqqhHHBqqq16sH")
+
+F_JOB = 1 << 0
+F_STARTED_AT = 1 << 1
+F_FINISHED_AT = 1 << 2
+F_JOB_DURATION = 1 << 3
+F_JOB_UUID = 1 << 4
+F_INTENDED = 1 << 5
+
+# Packed job.status values; anything else goes to the tail
+JOB_STATUSES = (None, "finished", "failed", "error", "running", "queued", "cancelled")
+_STATUS_CODES = {s: i for i, s in enumerate(JOB_STATUSES)}
+
+_UTC_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+_NAIVE_EPOCH = dt.datetime(1970, 1, 1)
+_ONE_US = dt.timedelta(microseconds=1)
+
+REQUESTS_HEADER = [
+    "timestamp_start_ms", "timestamp_start_iso", "timestamp_end_ms", "timestamp_end_iso",
+    "response_time_ms", "method", "name", "path", "status_code", "success", "request_id", "exception",
+    "intended_start_ms", "corrected_response_time_ms",
+]
+REPORT_HEADER = ["request_date", "request_time", "response_date", "response_time", "status_code", "duration_ms", "request_id"]
+EVENTS_HEADER = ["event_type", "event_date", "event_time", "status_code", "duration_ms", "request_id"]
+RESPONSES_HEADER = ["request_id", "object_id", "status", "path", "started_at", "finished_at", "job_duration", "job_uuid"]
+
+
+def epoch_us(d: dt.datetime) -> int:
+    """Epoch microseconds of an aware datetime."""
+    return (d - _UTC_EPOCH) // _ONE_US
+
+
+def _naive_iso_us(value: Any) -> Optional[int]:
+    """Epoch-µs for a naive ISO string that ``isoformat()`` reproduces exactly, else None."""
+    if not isinstance(value, str):
+        return None
+    try:
+        d = dt.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if d.tzinfo is not None or d.isoformat() != value:
+        return None
+    return (d - _NAIVE_EPOCH) // _ONE_US
+
+
+def _uuid_bytes(value: Any) -> Optional[bytes]:
+    if not isinstance(value, str):
+        return None
+    try:
+        u = uuid.UUID(value)
+    except ValueError:
+        return None
+    return u.bytes if str(u) == value else None
+
+
+def write_log_header(path: Path, request_path: str, job_path: str, method: str = "POST", name: str = "POST /bps/call") -> None:
+    """Create ``path`` with the magic and metadata block (module import time only)."""
+    meta = {"version": 1, "record_size": RECORD.size, "path": request_path, "job_path": job_path,
+            "method": method, "name": name}
+    block = json.dumps(meta).encode("utf-8")
+    with path.open("wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(block)) + block)
+
+
+def pack_record(
+    request_id: str,
+    start_dt_utc: dt.datetime,
+    end_dt_utc: dt.datetime,
+    status_code: int,
+    intended_ms: Optional[int] = None,
+    local_offset: Optional[dt.timedelta] = None,
+    job: Optional[dict] = None,
+    object_id: Optional[str] = None,
+    job_path: Optional[str] = None,
+) -> bytes:
+    """One request as bytes, ready for ``sink.write(path, ...)``.
+
+    ``job`` is the parsed response dict (None when the body was not JSON);
+    ``object_id``/``job_path`` are what the request sent, so an echoed value
+    costs nothing.
+    """
+    flags = 0
+    tail: Dict[str, Any] = {}
+    job_status = 0
+    job_started_us = job_finished_us = job_duration = 0
+    job_uuid = b""
+    if intended_ms is not None:
+        flags |= F_INTENDED
+    if job is not None:
+        flags |= F_JOB
+        rid = job.get("request_id", request_id)
+        if rid != request_id:
+            tail["request_id"] = rid
+        obj = job.get("object_id", object_id)
+        if obj != object_id:
+            tail["object_id"] = obj
+        path = job.get("path")
+        if path != job_path:
+            tail["path"] = path
+        status = job.get("status")
+        code = _STATUS_CODES.get(status) if status is None or isinstance(status, str) else None
+        if code is None:
+            tail["status"] = status
+        else:
+            job_status = code
+        for key, bit in (("started_at", F_STARTED_AT), ("finished_at", F_FINISHED_AT)):
+            value = job.get(key)
+            us = _naive_iso_us(value)
+            if us is not None:
+                flags |= bit
+                if bit == F_STARTED_AT:
+                    job_started_us = us
+                else:
+                    job_finished_us = us
+            elif value is not None:
+                tail[key] = value
+        duration = job.get("job_duration")
+        if type(duration) is int and -2 ** 63 <= duration < 2 ** 63:
+            flags |= F_JOB_DURATION
+            job_duration = duration
+        elif duration is not None:
+            tail["job_duration"] = duration
+        ju = job.get("job_uuid")
+        ub = _uuid_bytes(ju)
+        if ub is not None:
+            flags |= F_JOB_UUID
+            job_uuid = ub
+        elif ju is not None:
+            tail["job_uuid"] = ju
+
+    tail_bytes = json.dumps(tail, ensure_ascii=False).encode("utf-8") if tail else b""
+    if len(tail_bytes) > 0xFFFF:
+        # Pathological response; keep a clipped copy rather than fail the request
+        tail_bytes = json.dumps({k: str(v)[:1024] for k, v in tail.items()}).encode("utf-8")
+    offset_min = int(local_offset / dt.timedelta(minutes=1)) if local_offset is not None else 0
+    return RECORD.pack(
+        uuid.UUID(request_id).bytes, intended_ms if intended_ms is not None else 0,
+        epoch_us(start_dt_utc), epoch_us(end_dt_utc), offset_min, status_code, flags,
+        job_status, job_started_us, job_finished_us, job_duration, job_uuid, len(tail_bytes),
+    ) + tail_bytes
+
+
+class RunRecord(NamedTuple):
+    request_id: str
+    intended_ms: Optional[int]
+    start_us: int
+    end_us: int
+    local_offset_min: int
+    status_code: int
+    flags: int
+    job_status: int
+    job_started_us: int
+    job_finished_us: int
+    job_duration: int
+    job_uuid: bytes
+    tail: Dict[str, Any]
+
+
+def read_meta(f) -> dict:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"not a run log: {getattr(f, 'name', f)}")
+    (length,) = struct.unpack("<I", f.read(4))
+    return json.loads(f.read(length).decode("utf-8"))
+
+
+def uuid_str(raw: bytes) -> str:
+    """``str(uuid.UUID(bytes=raw))`` without building a UUID object."""
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def iter_raw(path: Path, chunk_size: int = 1 << 20) -> Iterator[Tuple[tuple, Dict[str, Any]]]:
+    """(unpacked RECORD fields, tail dict) in file order; a truncated last record (killed writer) is ignored."""
+    size = RECORD.size
+    unpack_from = RECORD.unpack_from
+    with path.open("rb") as f:
+        read_meta(f)
+        buf = b""
+        pos = 0
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buf = buf[pos:] + chunk
+            pos = 0
+            end = len(buf)
+            while pos + size <= end:
+                fields = unpack_from(buf, pos)
+                tail_len = fields[12]
+                if tail_len:
+                    if pos + size + tail_len > end:
+                        break
+                    yield fields, json.loads(buf[pos + size:pos + size + tail_len])
+                else:
+                    yield fields, {}
+                pos += size + tail_len
+
+
+def iter_records(path: Path) -> Iterator[RunRecord]:
+    """Decoded records in file order."""
+    for fields, tail in iter_raw(path):
+        yield RunRecord(
+            uuid_str(fields[0]),
+            fields[1] if fields[6] & F_INTENDED else None,
+            *fields[2:12], tail,
+        )
+
+
+_second_strings: Dict[int, Tuple[str, str]] = {}
+
+
+def _second(sec: int) -> Tuple[str, str]:
+    """("DD.MM.YYYY HH:MM:SS", "YYYY-MM-DDTHH:MM:SS") for an epoch second (cached: a run has few distinct ones)."""
+    entry = _second_strings.get(sec)
+    if entry is None:
+        d = _NAIVE_EPOCH + dt.timedelta(seconds=sec)
+        clock = f"{d.hour:02d}:{d.minute:02d}:{d.second:02d}"
+        if len(_second_strings) >= 1 << 16:
+            _second_strings.clear()
+        entry = _second_strings[sec] = (f"{format_date(d)} {clock}", f"{d.date().isoformat()}T{clock}")
+    return entry
+
+
+def _object_id_from_us(us: int) -> str:
+    sec, micro = divmod(us, 1_000_000)
+    return f"{_second(sec)[0]}.{micro // 10:05d}Z"
+
+
+def _isoformat_from_us(us: int) -> str:
+    """Naive ``datetime.isoformat()`` of an epoch-µs value."""
+    sec, micro = divmod(us, 1_000_000)
+    if micro:
+        return f"{_second(sec)[1]}.{micro:06d}"
+    return _second(sec)[1]
+
+
+def _csv_str(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def iter_response_view(path: Path) -> Iterator[Tuple[str, Optional[list], int, int]]:
+    """(request_id, jobs_from_responses row as read back from CSV or None, start_us, end_us).
+
+    The fast path for ``compare_jobs_vs_events.py``: same strings as
+    ``response_row`` after a CSV round trip, without the other legacy rows.
+    """
+    with path.open("rb") as f:
+        job_path = _csv_str(read_meta(f).get("job_path"))
+    for fields, tail in iter_raw(path):
+        (rid_raw, _, start_us, end_us, _, _, flags, job_status,
+         job_started_us, job_finished_us, job_duration, job_uuid, _) = fields
+        request_id = uuid_str(rid_raw)
+        if not flags & F_JOB:
+            yield request_id, None, start_us, end_us
+            continue
+        if tail:
+            row = [
+                _csv_str(tail.get("request_id", request_id)),
+                _csv_str(tail["object_id"]) if "object_id" in tail else _object_id_from_us(start_us),
+                _csv_str(tail.get("status", JOB_STATUSES[job_status])),
+                _csv_str(tail.get("path", job_path)),
+                _isoformat_from_us(job_started_us) if flags & F_STARTED_AT else _csv_str(tail.get("started_at")),
+                _isoformat_from_us(job_finished_us) if flags & F_FINISHED_AT else _csv_str(tail.get("finished_at")),
+                str(job_duration) if flags & F_JOB_DURATION else _csv_str(tail.get("job_duration")),
+                uuid_str(job_uuid) if flags & F_JOB_UUID else _csv_str(tail.get("job_uuid")),
+            ]
+        else:
+            row = [
+                request_id,
+                _object_id_from_us(start_us),
+                _csv_str(JOB_STATUSES[job_status]),
+                job_path,
+                _isoformat_from_us(job_started_us) if flags & F_STARTED_AT else "",
+                _isoformat_from_us(job_finished_us) if flags & F_FINISHED_AT else "",
+                str(job_duration) if flags & F_JOB_DURATION else "",
+                uuid_str(job_uuid) if flags & F_JOB_UUID else "",
+            ]
+        yield request_id, row, start_us, end_us
+
+
+class LegacyRows(NamedTuple):
+    requests: list
+    report: list
+    started: list
+    finished: list
+    response: Optional[list]
+
+
+def epoch_ms(us: int) -> int:
+    """``int(datetime.timestamp() * 1000)`` as the locustfiles compute it."""
+    return int(us / 10 ** 6 * 1000)
+
+
+def response_row(rec: RunRecord, meta: dict, object_id: Optional[str] = None) -> Optional[list]:
+    """jobs_from_responses row, or None when the response had no JSON job."""
+    if not rec.flags & F_JOB:
+        return None
+    tail = rec.tail
+    if "object_id" in tail:
+        object_id = tail["object_id"]
+    elif object_id is None:
+        object_id = format_object_id(_UTC_EPOCH + dt.timedelta(microseconds=rec.start_us))
+    return [
+        tail.get("request_id", rec.request_id),
+        object_id,
+        tail.get("status", JOB_STATUSES[rec.job_status]),
+        tail.get("path", meta.get("job_path")),
+        (_NAIVE_EPOCH + dt.timedelta(microseconds=rec.job_started_us)).isoformat()
+        if rec.flags & F_STARTED_AT else tail.get("started_at"),
+        (_NAIVE_EPOCH + dt.timedelta(microseconds=rec.job_finished_us)).isoformat()
+        if rec.flags & F_FINISHED_AT else tail.get("finished_at"),
+        rec.job_duration if rec.flags & F_JOB_DURATION else tail.get("job_duration"),
+        uuid_str(rec.job_uuid) if rec.flags & F_JOB_UUID else tail.get("job_uuid"),
+    ]
+
+
+def legacy_rows(rec: RunRecord, meta: dict) -> LegacyRows:
+    """The rows the CSV writers would have produced for this request."""
+    start_dt = _UTC_EPOCH + dt.timedelta(microseconds=rec.start_us)
+    end_dt = _UTC_EPOCH + dt.timedelta(microseconds=rec.end_us)
+    start_ms = epoch_ms(rec.start_us)
+    end_ms = epoch_ms(rec.end_us)
+    intended_ms = rec.intended_ms if rec.intended_ms is not None else start_ms
+    response_time_ms = end_ms - start_ms
+    status = rec.status_code
+    success = 200 <= status < 400
+    request_id = rec.request_id
+    object_id = format_object_id(start_dt)
+
+    tz_local = dt.timezone(dt.timedelta(minutes=rec.local_offset_min))
+    start_local = start_dt.astimezone(tz_local)
+    end_local = end_dt.astimezone(tz_local)
+
+    response = response_row(rec, meta, object_id)
+
+    return LegacyRows(
+        requests=[
+            start_ms, start_dt.isoformat(), end_ms, end_dt.isoformat(), response_time_ms,
+            meta.get("method", "POST"), meta.get("name", "POST /bps/call"), meta.get("path"),
+            status, success, request_id, "" if success else f"HTTP {status}",
+            intended_ms, end_ms - intended_ms,
+        ],
+        report=[
+            format_date(start_local), format_time(start_local, z=False),
+            format_date(end_local), format_time(end_local, z=False),
+            status, response_time_ms, request_id,
+        ],
+        started=["STARTED", format_date(start_dt), format_time(start_dt), "", "", request_id],
+        finished=["FINISHED", format_date(end_dt), format_time(end_dt), status, response_time_ms, request_id],
+        response=response,
+    )
+
+
+def to_csv(path: Path, out_dir: Path) -> Dict[str, int]:
+    """Write the four legacy CSVs for ``path`` into ``out_dir``; returns rows per file."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with path.open("rb") as f:
+        meta = read_meta(f)
+    names = {
+        "requests.csv": REQUESTS_HEADER,
+        "requests_report.csv": REPORT_HEADER,
+        "requests_events.csv": EVENTS_HEADER,
+        "jobs_from_responses.csv": RESPONSES_HEADER,
+    }
+    files = {name: (out_dir / name).open("w", newline="", encoding="utf-8") for name in names}
+    counts = {name: 0 for name in names}
+    try:
+        writers = {name: csv.writer(f) for name, f in files.items()}
+        for name, header in names.items():
+            writers[name].writerow(header)
+        w_req, w_rep, w_ev, w_resp = (writers[n] for n in names)
+        for rec in iter_records(path):
+            rows = legacy_rows(rec, meta)
+            w_req.writerow(rows.requests)
+            w_rep.writerow(rows.report)
+            w_ev.writerow(rows.started)
+            w_ev.writerow(rows.finished)
+            counts["requests.csv"] += 1
+            counts["requests_report.csv"] += 1
+            counts["requests_events.csv"] += 2
+            if rows.response is not None:
+                w_resp.writerow(rows.response)
+                counts["jobs_from_responses.csv"] += 1
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+def concat_run_logs(sources: Iterable[Path], dest: Path) -> int:
+    """Append the records of ``sources`` (same metadata) after the header of the first one."""
+    sources = list(sources)
+    with dest.open("wb") as out:
+        for i, src in enumerate(sources):
+            with src.open("rb") as f:
+                start = f.tell()
+                read_meta(f)
+                if i == 0:
+                    header_len = f.tell() - start
+                    f.seek(start)
+                    out.write(f.read(header_len))
+                shutil.copyfileobj(f, out, 1 << 20)
+    return len(sources)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect/convert packed run logs")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("to-csv", help="Emit the legacy CSVs")
+    c.add_argument("log", type=Path)
+    c.add_argument("-o", "--out-dir", type=Path, default=None, help="Default: next to the log")
+    i = sub.add_parser("info", help="Print metadata and record count")
+    i.add_argument("log", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "to-csv":
+        counts = to_csv(args.log, args.out_dir or args.log.parent)
+        for name, n in counts.items():
+            print(f"{name}: {n} rows")
+    else:
+        with args.log.open("rb") as f:
+            meta = read_meta(f)
+        count = sum(1 for _ in iter_records(args.log))
+        print(json.dumps(meta))
+        print(f"records: {count} | bytes: {args.log.stat().st_size}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
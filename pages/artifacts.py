@@ -0,0 +1,180 @@
+"""
+Артефакты упавших тестов: скриншоты, DOM и trace Playwright
+
+Диагностические точки в тестах и page-объектах вызывают capture():
+
+    artifacts.capture(self.page, f"diagnostic_no_input_{file_name}")
+
+В режиме on-failure (по умолчанию) capture() ничего не снимает, а только отмечает
+точку (имя и время от начала теста): историю страницы хранит trace контекста, который
+пишется всё время теста (tracing.start в conftest.py). Если тест упал, end_test
+снимает финальный скриншот + HTML и сохраняет в screenshots/ (ARTIFACTS_DIR)
+<тест>_trace.zip и <тест>_markers.txt — смотреть: playwright show-trace.
+
+Сохранение в файлы (кодирование HTML, запись на диск) идёт в фоновом потоке,
+вызовы Playwright не ждут диска. Режим — pytest --artifacts:
+on-failure (по умолчанию), always (снимать и писать каждую точку сразу), off.
+Вне теста (утилиты, отладка) снимки пишутся сразу.
+"""
+import collections
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+MODES = ("on-failure", "always", "off")
+
+ARTIFACTS_DIR = Path(os.getenv("ARTIFACTS_DIR", "screenshots"))
+# Сколько последних отметок теста держать в памяти
+MAX_MARKERS = 100
+
+_mode = "on-failure"
+_current_test = None
+_test_started = 0.0
+# (имя, мс от начала теста) диагностических точек текущего теста
+_markers = collections.deque(maxlen=MAX_MARKERS)
+_reserved = set()
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+_futures = []
+
+
+def configure(mode="on-failure", directory=None):
+    global _mode, ARTIFACTS_DIR
+    if mode not in MODES:
+        raise ValueError(f"Неизвестный режим артефактов: {mode} (ожидается {', '.join(MODES)})")
+    _mode = mode
+    if directory is not None:
+        ARTIFACTS_DIR = Path(directory)
+
+
+def tracing_enabled():
+    return _mode != "off"
+
+
+def _slug(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_")[:150] or "artifact"
+
+
+def _reserve(name, suffix):
+    """Путь для нового файла; как и раньше, при совпадении имени добавляется время"""
+    path = ARTIFACTS_DIR / f"{_slug(name)}{suffix}"
+    if path.exists() or path in _reserved:
+        path = ARTIFACTS_DIR / f"{_slug(name)}_{int(time.time() * 1000)}{suffix}"
+    _reserved.add(path)
+    return path
+
+
+def _write_file(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(data, str):
+        path.write_text(data, encoding="utf-8")
+    else:
+        path.write_bytes(data)
+    _reserved.discard(path)
+
+
+def _submit(path, data):
+    _futures[:] = [future for future in _futures if not future.done()]
+    _futures.append(_writer.submit(_write_file, path, data))
+
+
+def _snapshot(page):
+    """Скриншот видимой области и HTML; при ошибке (страница закрыта) — None"""
+    try:
+        png = page.screenshot()
+    except Exception as e:
+        print(f"[WARN] Скриншот не снят: {e}")
+        png = None
+    try:
+        html = page.content()
+    except Exception:
+        html = None
+    return png, html
+
+
+def _save(name, png, html):
+    paths = []
+    if png is not None:
+        paths.append(_reserve(name, ".png"))
+        _submit(paths[-1], png)
+    if html is not None:
+        paths.append(_reserve(name, ".html"))
+        _submit(paths[-1], html)
+    return paths
+
+
+def capture(page, name):
+    """
+    Диагностическая точка: в режиме on-failure внутри теста — только отметка для trace,
+    иначе снимок страницы сразу пишется в файлы
+
+    Returns:
+        Path: Путь скриншота (None, если снимок не снимался)
+    """
+    if _mode == "off":
+        return None
+    if _current_test is not None and _mode == "on-failure":
+        _markers.append((name, round((time.monotonic() - _test_started) * 1000)))
+        return None
+    paths = _save(name, *_snapshot(page))
+    return paths[0] if paths else None
+
+
+def begin_test(nodeid, context=None):
+    """Начало теста (conftest.py): сброс отметок и запуск trace контекста"""
+    global _current_test, _test_started
+    _current_test = nodeid
+    _test_started = time.monotonic()
+    _markers.clear()
+    if context is not None and tracing_enabled():
+        try:
+            context.tracing.start(screenshots=True, snapshots=True, sources=False)
+        except Exception as e:
+            print(f"[WARN] Trace не запущен: {e}")
+
+
+def end_test(failed, page=None, context=None):
+    """
+    Конец теста: при падении — финальный снимок, отметки и trace в файлы,
+    иначе всё отбрасывается
+
+    Returns:
+        list: Пути записываемых файлов
+    """
+    global _current_test
+    nodeid, _current_test = _current_test, None
+    paths = []
+    keep = failed and _mode != "off"
+    if keep:
+        if page is not None:
+            paths.extend(_save(f"{nodeid}_failure", *_snapshot(page)))
+        if _markers:
+            paths.append(_reserve(f"{nodeid}_markers", ".txt"))
+            _submit(paths[-1], "".join(f"{ms:>8} мс  {name}\n" for name, ms in _markers))
+    _markers.clear()
+    if context is not None and tracing_enabled():
+        try:
+            if keep:
+                trace_path = _reserve(f"{nodeid}_trace", ".zip")
+                trace_path.parent.mkdir(parents=True, exist_ok=True)
+                context.tracing.stop(path=str(trace_path))
+                _reserved.discard(trace_path)
+                paths.append(trace_path)
+            else:
+                context.tracing.stop()
+        except Exception as e:
+            print(f"[WARN] Trace не сохранён: {e}")
+    if paths:
+        print(f"[ARTIFACTS] {nodeid}: {', '.join(str(p) for p in paths)}")
+    return paths
+
+
+def flush():
+    """Дождаться записи всех файлов (конец сессии)"""
+    while _futures:
+        future = _futures.pop()
+        try:
+            future.result()
+        except OSError as e:
+            print(f"[WARN] Артефакт не записан: {e}")
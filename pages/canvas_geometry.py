@@ -0,0 +1,201 @@
+"""
+Индекс геометрии диаграммы: заголовки компонентов и точки соединения с координатами
+
+Один page.evaluate собирает все текстовые элементы поверх canvas (заголовки
+компонентов и подписи точек соединения "right"/"left"/...) с их
+bounding box; у подписи точки — заголовки из ближайшего общего с ней контейнера. Снимок кешируется: в браузере MutationObserver и события
+canvas (wheel, pointerup, keyup, resize окна) увеличивают номер версии, и
+пока версия не изменилась, evaluate возвращает только её — без повторного
+обхода DOM. После собственных действий на canvas можно вызвать invalidate().
+"""
+from playwright.sync_api import Page
+
+
+PORT_DIRECTIONS = ("right", "left", "top", "bottom")
+
+# Точка соединения относится к компоненту, если она ближе этого расстояния (px) от центра
+PORT_MAX_DISTANCE = 100
+
+_SNAPSHOT_JS = """([cachedVersion, portNames]) => {
+    const canvas = document.querySelector('canvas');
+    if (!canvas) return {version: -1, data: null};
+    let st = window.__canvasGeometry;
+    if (!st || st.canvas !== canvas) {
+        if (st && st.observer) st.observer.disconnect();
+        st = window.__canvasGeometry = {canvas, version: 0};
+        const bump = () => { st.version++; };
+        st.observer = new MutationObserver(bump);
+        st.observer.observe(canvas.parentElement || document.body,
+            {subtree: true, childList: true, attributes: true, characterData: true});
+        for (const ev of ['wheel', 'pointerup', 'keyup']) canvas.addEventListener(ev, bump, {passive: true});
+        window.addEventListener('resize', bump);
+    }
+    if (cachedVersion === st.version) return {version: st.version, data: null};
+
+    const area = canvas.getBoundingClientRect();
+    const box = r => ({x: r.x, y: r.y, width: r.width, height: r.height});
+    const labels = [], labelEls = [];
+    const ports = [], portEls = [];
+    for (const el of document.body.querySelectorAll('*')) {
+        let text = '';
+        for (const node of el.childNodes) if (node.nodeType === Node.TEXT_NODE) text += node.textContent;
+        text = text.trim();
+        if (!text) continue;
+        const r = el.getBoundingClientRect();
+        if (r.width <= 0 || r.height <= 0) continue;
+        const cx = r.x + r.width / 2, cy = r.y + r.height / 2;
+        if (cx < area.left || cx > area.right || cy < area.top || cy > area.bottom) continue;
+        if (portNames.includes(text)) {
+            ports.push({text, box: box(r)});
+            portEls.push(el);
+        } else {
+            labels.push({text, box: box(r)});
+            labelEls.push(el);
+        }
+    }
+    // owners: индексы заголовков в ближайшем предке подписи, где заголовки вообще есть
+    ports.forEach((port, i) => {
+        port.owners = [];
+        for (let anc = portEls[i].parentElement; anc && !port.owners.length; anc = anc.parentElement) {
+            labelEls.forEach((el, j) => { if (anc.contains(el)) port.owners.push(j); });
+        }
+    });
+    return {version: st.version, data: {canvas: box(area), labels, ports}};
+}"""
+
+
+def _center(box):
+    return box['x'] + box['width'] / 2, box['y'] + box['height'] / 2
+
+
+def _distance2(box, x, y):
+    center_x, center_y = _center(box)
+    return (x - center_x) ** 2 + (y - center_y) ** 2
+
+
+def _on_side(box, x, y, direction):
+    """Лежит ли точка по направлению direction от центра box"""
+    center_x, center_y = _center(box)
+    return {"right": x > center_x, "left": x < center_x, "top": y < center_y, "bottom": y > center_y}.get(direction, True)
+
+
+def edge_point(box, direction):
+    """Точка на границе box по направлению (как у точек соединения компонента)"""
+    center_x, center_y = _center(box)
+    if direction == "right":
+        return {'x': box['x'] + box['width'], 'y': center_y}
+    if direction == "left":
+        return {'x': box['x'], 'y': center_y}
+    if direction == "top":
+        return {'x': center_x, 'y': box['y']}
+    if direction == "bottom":
+        return {'x': center_x, 'y': box['y'] + box['height']}
+    return {'x': center_x, 'y': center_y}
+
+
+class CanvasGeometry:
+    """Кешируемый снимок координат компонентов диаграммы"""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.version = None
+        self.data = None
+
+    def invalidate(self):
+        """Сбросить снимок (следующий запрос соберёт его заново)"""
+        self.version = None
+        self.data = None
+
+    def snapshot(self):
+        """
+        Актуальный снимок: {"canvas": box, "labels": [{"text", "box"}], "ports": [{"text", "box"}]}
+        или None, если canvas на странице нет
+        """
+        result = self.page.evaluate(_SNAPSHOT_JS, [self.version, list(PORT_DIRECTIONS)])
+        if result['version'] < 0:
+            self.invalidate()
+            return None
+        if result['data'] is not None:
+            self.version = result['version']
+            self.data = result['data']
+        return self.data
+
+    def _label_indices(self, title, exact=True):
+        """Индексы заголовков title в snapshot()['labels']"""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return []
+        labels = snapshot['labels']
+        if exact:
+            return [i for i, label in enumerate(labels) if label['text'] == title]
+        needle = title.lower()
+        return [i for i, label in enumerate(labels) if needle in label['text'].lower()]
+
+    def components(self, title, exact=True):
+        """Все заголовки title на canvas (по порядку в DOM): список box"""
+        return [self.data['labels'][i]['box'] for i in self._label_indices(title, exact)]
+
+    def component_box(self, title, exact=True, index=0):
+        """box заголовка компонента или None"""
+        boxes = self.components(title, exact)
+        return boxes[index] if len(boxes) > index else None
+
+    def component_center(self, title, exact=True, index=0):
+        box = self.component_box(title, exact, index)
+        if not box:
+            return None
+        x, y = _center(box)
+        return {'x': x, 'y': y}
+
+    def port_label(self, title, direction="right", exact=True, index=0):
+        """
+        Центр подписи точки соединения direction рядом с заголовком компонента.
+        Подписи рисуются только у выделенного компонента; подписи соседних
+        компонентов (того же направления и так же близко) не учитываются
+
+        Returns:
+            dict: {'x', 'y'} или None, если компонента или подписи нет
+        """
+        indices = self._label_indices(title, exact)
+        if len(indices) <= index:
+            return None
+        label = indices[index]
+        center_x, center_y = _center(self.data['labels'][label]['box'])
+        best = None
+        for port in self.data['ports']:
+            if port['text'] != direction or not self._port_of(port, label):
+                continue
+            port_x, port_y = _center(port['box'])
+            if abs(port_x - center_x) < PORT_MAX_DISTANCE and abs(port_y - center_y) < PORT_MAX_DISTANCE:
+                distance = _distance2(port['box'], center_x, center_y)
+                if best is None or distance < best[0]:
+                    best = (distance, {'x': port_x, 'y': port_y})
+        return best[1] if best else None
+
+    def _port_of(self, port, label):
+        """
+        Относится ли подпись точки к компоненту с заголовком labels[label]: по общему
+        контейнеру в DOM, а если он общий для всех заголовков — к ближайшему заголовку,
+        от которого подпись лежит по своему направлению ("right" — правее центра и т.д.)
+        """
+        labels = self.data['labels']
+        if 0 < len(port['owners']) < len(labels):
+            return label in port['owners']
+        port_x, port_y = _center(port['box'])
+        candidates = [i for i, other in enumerate(labels) if _on_side(other['box'], port_x, port_y, port['text'])]
+        nearest = min(candidates, key=lambda i: _distance2(labels[i]['box'], port_x, port_y), default=None)
+        return nearest == label
+
+    def port(self, title, direction="right", exact=True, index=0):
+        """
+        Точка соединения компонента: подпись direction (port_label), если она есть в DOM,
+        иначе точка на границе заголовка
+
+        Returns:
+            dict: {'x', 'y'} или None, если компонент не найден
+        """
+        point = self.port_label(title, direction, exact, index)
+        if point:
+            return point
+        box = self.component_box(title, exact, index)
+        return edge_point(box, direction) if box else None
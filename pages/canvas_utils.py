@@ -1,5 +1,8 @@
 from playwright.sync_api import Page
 import time
+from .waits import Waits
+from .canvas_geometry import CanvasGeometry
+from .steps import timed_step
 
 
 class CanvasUtils:
@@ -9,7 +12,10 @@ class CanvasUtils:
     
     def __init__(self, page: Page):
         self.page = page
+        self.waits = Waits(page)
+        self.geometry = CanvasGeometry(page)
     
+    @timed_step
     def find_component_by_title(self, title, exact=True, timeout=10000):
         """
         Находит компонент на canvas по заголовку
@@ -27,24 +33,21 @@ class CanvasUtils:
         try:
             canvas = self.page.locator('canvas').first
             canvas.wait_for(state="visible", timeout=timeout)
-            time.sleep(0.5)
+            self.waits.canvas_repaint(canvas, timeout=timeout)
             
-            # Метод 1: Поиск по тексту
+            # Метод 1: Координаты заголовка из индекса геометрии диаграммы
             try:
-                if exact:
-                    component_label = self.page.get_by_text(title, exact=True).first
-                else:
-                    component_label = self.page.get_by_text(title).first
-                    
-                if component_label.is_visible():
-                    component_label.dblclick()
-                    time.sleep(1)
+                center = self.geometry.component_center(title, exact=exact)
+                if center:
+                    self.page.mouse.dblclick(center['x'], center['y'])
+                    self.geometry.invalidate()
+                    self.waits.dom_settled()
                     print(f"[SUCCESS] Двойной клик по компоненту '{title}' выполнен")
                     return True
                 else:
-                    print(f"[WARN] Компонент '{title}' не найден через текст")
+                    print(f"[WARN] Компонент '{title}' не найден в геометрии диаграммы")
             except Exception as e:
-                print(f"[WARN] Не удалось найти '{title}' через текст: {e}")
+                print(f"[WARN] Не удалось найти '{title}' через геометрию диаграммы: {e}")
             
             # Метод 2: Поиск через координаты canvas (fallback)
             print(f"[INFO] Пробуем найти '{title}' через координаты canvas")
@@ -61,7 +64,7 @@ class CanvasUtils:
                     for i, pos in enumerate(positions):
                         try:
                             canvas.click(position=pos, click_count=2)
-                            time.sleep(0.5)
+                            self.waits.dom_settled()
                             print(f"[INFO] Двойной клик по позиции {i+1} выполнен")
                             # Проверяем, открылось ли что-то (например, модальное окно или сайдбар)
                             if self._check_component_opened():
@@ -98,7 +101,7 @@ class CanvasUtils:
         try:
             canvas = self.page.locator('canvas').first
             canvas.wait_for(state="visible", timeout=timeout)
-            time.sleep(0.5)
+            self.waits.canvas_repaint(canvas, timeout=timeout)
             
             box = canvas.bounding_box()
             if not box:
@@ -111,7 +114,7 @@ class CanvasUtils:
             }
             
             canvas.click(position=pos, click_count=2)
-            time.sleep(0.5)
+            self.waits.dom_settled()
             print(f"[SUCCESS] Двойной клик по координатам ({x_percent*100}%, {y_percent*100}%) выполнен")
             return True
             
@@ -177,6 +180,7 @@ class CanvasUtils:
         except Exception:
             return False
     
+    @timed_step
     def select_structure_data(self, structure_name, schema_name=None, timeout=10000):
         """
         Выбирает структуру данных и схему в правом сайдбаре (как в первом тесте)
@@ -198,14 +202,13 @@ class CanvasUtils:
                 switcher = self.page.get_by_role("button", name="diagram_details_panel_switcher")
                 if switcher.is_visible():
                     switcher.click()
-                    time.sleep(0.3)
+                    self.waits.element_stable(details_panel, timeout=timeout)
                     print("[INFO] Правый сайдбар открыт")
 
             # 1. Выбираем структуру данных через кнопку "Выбрать файл" (только если сайдбар уже открыт)
             select_file_btn = self.page.get_by_role("button", name="textfield_select_file_button")
             if select_file_btn.is_visible():
                 select_file_btn.click()
-                time.sleep(0.5)
                 print("[INFO] Кнопка 'Выбрать файл' нажата")
                 
                 # Ждем появления модального окна выбора файла
@@ -221,7 +224,6 @@ class CanvasUtils:
                 
                 if file_item.is_visible():
                     file_item.click()
-                    time.sleep(0.2)
                     print(f"[INFO] Выбран файл структуры данных: {structure_name}")
                 else:
                     raise Exception(f"Файл структуры данных '{structure_name}' не найден в модальном окне")
@@ -235,7 +237,7 @@ class CanvasUtils:
                 
                 choose_btn.click()
                 modal.wait_for(state="detached", timeout=5000)
-                time.sleep(0.3)
+                self.waits.dom_settled()
                 print("[INFO] Модальное окно закрыто, структура данных выбрана")
             else:
                 print("[INFO] Кнопка 'Выбрать файл' не найдена, возможно структура уже выбрана")
@@ -252,7 +254,7 @@ class CanvasUtils:
                     time.sleep(0.25)
                 
                 schema_field.click()
-                time.sleep(0.2)
+                self.waits.dom_settled(quiet_ms=150)
                 print("[INFO] Поле схемы активировано")
                 
                 # Ищем и выбираем схему в правом сайдбаре
@@ -260,7 +262,7 @@ class CanvasUtils:
                 option_loc = details_panel.get_by_text(schema_name, exact=True)
                 try:
                     option_loc.first.click()
-                    time.sleep(2)
+                    self.waits.dom_settled(quiet_ms=500)
                     print(f"[SUCCESS] Выбрана схема: {schema_name}")
                 except Exception as e:
                     print(f"[WARN] Не удалось выбрать схему '{schema_name}': {str(e)}")
@@ -297,7 +299,7 @@ class CanvasUtils:
                     tab = self.page.get_by_text(tab_name, exact=True)
                     if tab.is_visible():
                         tab.click()
-                        time.sleep(0.5)
+                        self.waits.dom_settled()
                         print(f"[INFO] Переключились на вкладку '{tab_name}'")
                         break
                 except Exception:
@@ -307,7 +309,7 @@ class CanvasUtils:
             structure_option = self.page.get_by_text(structure_name, exact=True)
             if structure_option.is_visible():
                 structure_option.click()
-                time.sleep(0.5)
+                self.waits.dom_settled()
                 print(f"[SUCCESS] Выбрана структура данных '{structure_name}' в сайдбаре")
                 return True
             else:
@@ -315,7 +317,7 @@ class CanvasUtils:
                 structure_option = self.page.locator('*').filter(has_text=structure_name).first
                 if structure_option.is_visible():
                     structure_option.click()
-                    time.sleep(0.5)
+                    self.waits.dom_settled()
                     print(f"[SUCCESS] Выбрана структура данных '{structure_name}' в сайдбаре (частичное совпадение)")
                     return True
                 else:
@@ -342,7 +344,7 @@ class CanvasUtils:
                     confirm_btn = self.page.get_by_role("button", name=button_name).first
                     if confirm_btn.is_visible():
                         confirm_btn.click()
-                        time.sleep(1)
+                        self.waits.dom_settled()
                         print(f"[INFO] Выбор подтвержден кнопкой '{button_name}'")
                         return
                 except Exception:
@@ -353,6 +355,7 @@ class CanvasUtils:
         except Exception as e:
             print(f"[INFO] Ошибка при подтверждении выбора: {e}")
     
+    @timed_step
     def find_arrow_by_component(self, component_name, timeout=10000):
         """
         Находит стрелку, выходящую из указанного компонента
@@ -368,7 +371,7 @@ class CanvasUtils:
         
         try:
             # Ждем стабилизации интерфейса
-            time.sleep(1)
+            self.waits.canvas_repaint(timeout=timeout)
             
             # Селекторы для поиска стрелок/соединений
             arrow_selectors = [
@@ -399,7 +402,7 @@ class CanvasUtils:
                                 if arrow.is_visible():
                                     # Делаем двойной клик по стрелке
                                     arrow.dblclick()
-                                    time.sleep(1)
+                                    self.waits.dom_settled()
                                     print(f"[INFO] Двойной клик по стрелке {i+1} выполнен (селектор: {selector})")
                                     
                                     # Проверяем, открылся ли правый сайдбар
@@ -469,7 +472,7 @@ class CanvasUtils:
                 }
             
             canvas.click(position=arrow_pos, click_count=2)
-            time.sleep(1)
+            self.waits.dom_settled()
             print(f"[INFO] Двойной клик по координатам ({arrow_pos['x']}, {arrow_pos['y']}) выполнен")
             
             # Проверяем, открылся ли правый сайдбар
@@ -485,6 +488,7 @@ class CanvasUtils:
             print(f"[ERROR] Ошибка при fallback поиске стрелки: {e}")
             return False
 
+    @timed_step
     def select_condition_in_arrow_field(self, condition_name="condition_name", timeout=10000):
         """
         Выбирает условие в поле стрелки из выпадающего списка
@@ -517,12 +521,12 @@ class CanvasUtils:
             try:
                 # Фокусируемся на поле
                 condition_field.click()
-                time.sleep(0.5)
+                self.waits.dom_settled()
                 print("[INFO] Фокус установлен на поле условия")
                 
                 # Открываем выпадающий список
                 condition_field.press("ArrowDown")
-                time.sleep(1)
+                self.waits.dom_settled()
                 print("[INFO] Выпадающий список открыт через клавиатуру")
                 
                 # Проверяем, что список открылся
@@ -561,7 +565,7 @@ class CanvasUtils:
                         condition_option = self.page.locator(f'[role="treeitem"][aria-label="{condition_name}"]')
                         if condition_option.is_visible():
                             condition_option.click()
-                            time.sleep(0.5)
+                            self.waits.dom_settled()
                             print(f"[SUCCESS] Условие '{condition_name}' выбрано по aria-label")
                             condition_selected = True
                     except Exception as e:
@@ -573,7 +577,7 @@ class CanvasUtils:
                             condition_option = self.page.locator(f'.TreeItem__LabelPrimary___vzajD:has-text("{condition_name}")')
                             if condition_option.is_visible():
                                 condition_option.click()
-                                time.sleep(0.5)
+                                self.waits.dom_settled()
                                 print(f"[SUCCESS] Условие '{condition_name}' выбрано по тексту")
                                 condition_selected = True
                         except Exception as e:
@@ -585,7 +589,7 @@ class CanvasUtils:
                             condition_option = self.page.get_by_text(condition_name, exact=True)
                             if condition_option.is_visible():
                                 condition_option.click()
-                                time.sleep(0.5)
+                                self.waits.dom_settled()
                                 print(f"[SUCCESS] Условие '{condition_name}' выбрано по точному тексту")
                                 condition_selected = True
                         except Exception as e:
@@ -597,7 +601,7 @@ class CanvasUtils:
                             first_option = self.page.locator('[role="treeitem"]').first
                             if first_option.is_visible():
                                 first_option.click()
-                                time.sleep(0.5)
+                                self.waits.dom_settled()
                                 print("[INFO] Выбрано первое доступное условие")
                                 condition_selected = True
                         except Exception as e:
@@ -607,7 +611,7 @@ class CanvasUtils:
                     if not condition_selected:
                         try:
                             condition_field.press("Enter")
-                            time.sleep(0.5)
+                            self.waits.dom_settled()
                             print("[INFO] Fallback: нажатие Enter для выбора")
                         except Exception as e:
                             print(f"[WARN] Ошибка при выборе через клавиатуру: {e}")
@@ -615,21 +619,21 @@ class CanvasUtils:
                     # Если список не открылся, пробуем альтернативный способ
                     print("[WARN] Выпадающий список не открылся, пробуем альтернативный способ")
                     condition_field.click()
-                    time.sleep(1)
+                    self.waits.dom_settled()
                     
                     # Пробуем найти элементы списка напрямую
                     try:
                         condition_option = self.page.get_by_text(condition_name, exact=True)
                         if condition_option.is_visible():
                             condition_option.click()
-                            time.sleep(0.5)
+                            self.waits.dom_settled()
                             print(f"[SUCCESS] Условие '{condition_name}' выбрано кликом")
                         else:
                             # Выбираем первое доступное
                             first_option = self.page.locator('[role="option"], .option, [class*="option"]').first
                             if first_option.is_visible():
                                 first_option.click()
-                                time.sleep(0.5)
+                                self.waits.dom_settled()
                                 print("[INFO] Выбрано первое доступное условие кликом")
                             else:
                                 raise Exception("Не удалось найти элементы списка")
@@ -643,7 +647,7 @@ class CanvasUtils:
             
             # Проверяем результат
             try:
-                time.sleep(1)  # Даем время на обновление
+                self.waits.dom_settled()  # Ждем обновления поля
                 field_value = condition_field.input_value()
                 if field_value:
                     print(f"[SUCCESS] Условие выбрано: '{field_value}'")
@@ -659,6 +663,7 @@ class CanvasUtils:
             print(f"[ERROR] Ошибка при выборе условия '{condition_name}': {e}")
             return False
 
+    @timed_step
     def wait_for_canvas_load(self, timeout=10000):
         """
         Ждет загрузки canvas диаграммы
@@ -672,7 +677,8 @@ class CanvasUtils:
         try:
             canvas = self.page.locator('canvas').first
             canvas.wait_for(state="visible", timeout=timeout)
-            time.sleep(2)  # Дополнительное время для полной загрузки
+            # Ждем, пока диаграмма дорисуется
+            self.waits.canvas_repaint(canvas, timeout=timeout)
             print("[SUCCESS] Canvas диаграммы загружен")
             return True
         except Exception as e:
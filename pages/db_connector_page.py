@@ -1,6 +1,7 @@
 from playwright.sync_api import Page
 from .base_page import BasePage
 import time
+from . import artifacts
 
 class DBConnectorPage(BasePage):
     def __init__(self, page: Page):
@@ -27,7 +28,7 @@ class DBConnectorPage(BasePage):
             time.sleep(1)
             return True
         except Exception as e:
-            self.page.screenshot(path=f'screenshots/db_treeitem_fail_{int(time.time())}.png', full_page=True)
+            artifacts.capture(self.page, 'db_treeitem_fail')
             raise Exception(f"Не удалось создать файл-коннектор к БД: {e}")
 
     def configure_connection_string(self, connection_string: str = "$env.DATABASE_URL", pool_size: str = "10"):
@@ -57,7 +58,7 @@ class DBConnectorPage(BasePage):
         error_message = self.page.locator('div:has-text("Ошибка подключения"), div:has-text("Connection failed"), div:has-text("Error")')
         if error_message.count() > 0:
             error_text = error_message.first.inner_text()
-            self.page.screenshot(path=f'screenshots/db_connection_error_{int(time.time())}.png', full_page=True)
+            artifacts.capture(self.page, 'db_connection_error')
             raise Exception(f"Ошибка подключения к БД: {error_text}")
         
         # 5. Проверить наличие успешной нотификации
@@ -65,7 +66,7 @@ class DBConnectorPage(BasePage):
             self.page.wait_for_selector(self.CONNECTION_SUCCESS_MESSAGE, timeout=timeout)
         except Exception as e:
             # Делаем скриншот для диагностики
-            self.page.screenshot(path=f'screenshots/db_connection_timeout_{int(time.time())}.png', full_page=True)
+            artifacts.capture(self.page, 'db_connection_timeout')
             raise Exception(f"Не удалось подтвердить успешное подключение к БД. Timeout: {e}")
 
     def save_connection(self):
@@ -1,5 +1,6 @@
 from playwright.sync_api import Page
 from .base_page import BasePage
+from .dom_snapshot import DomSnapshot
 import time
 
 
@@ -258,20 +259,17 @@ class DecisionTablePage(BasePage):
     def get_table_structure(self):
         """Получает структуру таблицы (количество строк и колонок)"""
         try:
-            # Ищем заголовки колонок
-            column_headers = self.page.locator(self.TABLE_COLUMN).all()
-            # Ищем заголовки строк
-            row_headers = self.page.locator(self.TABLE_ROW).all()
-            
-            columns_count = len(column_headers)
-            rows_count = len(row_headers)
+            # Заголовки строк и колонок одним запросом к странице
+            grid = DomSnapshot(self.page).grid(self.TABLE_ROW, self.TABLE_COLUMN)
+            rows_count = len(grid['row_headers'])
+            columns_count = len(grid['column_headers'])
             
             print(f"[INFO] Структура таблицы: {rows_count} строк, {columns_count} колонок")
             return {
                 'rows': rows_count,
                 'columns': columns_count,
-                'row_headers': [h.inner_text() for h in row_headers],
-                'column_headers': [h.inner_text() for h in column_headers]
+                'row_headers': grid['row_headers'],
+                'column_headers': grid['column_headers']
             }
         except Exception as e:
             print(f"[ERROR] Ошибка при получении структуры таблицы: {e}")
@@ -1,8 +1,9 @@
 """
 Page Object Model для управления диаграммами
 """
-import time
 from playwright.sync_api import Page
+from .waits import Waits
+from .steps import timed_step
 
 
 class DiagramPage:
@@ -10,7 +11,9 @@ class DiagramPage:
     
     def __init__(self, page: Page):
         self.page = page
+        self.waits = Waits(page)
     
+    @timed_step
     def run_diagram(self, timeout: int = 10000) -> bool:
         """
         Запускает диаграмму
@@ -31,7 +34,7 @@ class DiagramPage:
                 play_button.wait_for(state="visible", timeout=timeout)
                 print("[INFO] Кнопка запуска диаграммы найдена")
                 play_button.click()
-                time.sleep(2)
+                self.waits.dom_settled()
                 print("[INFO] Диаграмма запущена")
                 return True
             except Exception as e:
@@ -42,6 +45,7 @@ class DiagramPage:
             print(f"[ERROR] Ошибка при запуске диаграммы: {e}")
             return False
     
+    @timed_step
     def wait_for_diagram_completion(self, timeout: int = 60000) -> bool:
         """
         Ждет завершения выполнения диаграммы
@@ -54,7 +58,6 @@ class DiagramPage:
         """
         try:
             print("[INFO] Ожидание завершения выполнения диаграммы...")
-            time.sleep(5)  # Даем время на выполнение
             
             # Ждем появления toast сообщения
             toast = self.page.locator('[aria-label="toast"]')
@@ -144,7 +147,7 @@ class DiagramPage:
             details_panel_switcher = self.page.get_by_role("button", name="diagram_details_panel_switcher")
             if details_panel_switcher.is_visible():
                 details_panel_switcher.click()
-                time.sleep(1)
+                self.waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт")
                 return True
             else:
@@ -165,7 +168,7 @@ class DiagramPage:
             filemanager_button = self.page.get_by_role("button", name="board_toolbar_filemanager_button")
             if filemanager_button.is_visible():
                 filemanager_button.click()
-                time.sleep(1)
+                self.waits.dom_settled()
                 print("[INFO] Файловая панель закрыта")
                 return True
             else:
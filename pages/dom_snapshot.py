@@ -0,0 +1,85 @@
+"""
+Пакетное чтение DOM: один page.evaluate вместо запроса на каждый элемент
+
+query_selector_all + get_attribute/inner_text по каждому элементу — это
+отдельный round-trip к браузеру на элемент. Здесь нужные поля собираются
+за один evaluate и возвращаются обычными списками/словарями Python.
+"""
+from playwright.sync_api import Page
+
+
+_ATTRIBUTES_JS = """([selector, names]) => Array.from(document.querySelectorAll(selector), el => {
+    const out = {};
+    for (const name of names) out[name] = el.getAttribute(name);
+    return out;
+})"""
+
+_TEXTS_JS = """(selector) => Array.from(document.querySelectorAll(selector), el => el.innerText)"""
+
+_TREE_JS = """(selector) => Array.from(document.querySelectorAll(selector), el => ({
+    label: el.getAttribute('aria-label'),
+    level: Number(el.getAttribute('aria-level')) || null,
+    expanded: el.getAttribute('aria-expanded') === null ? null : el.getAttribute('aria-expanded') === 'true',
+    selected: el.getAttribute('aria-selected') === 'true',
+}))"""
+
+_GRID_JS = """([rowSelector, columnSelector]) => ({
+    row_headers: Array.from(document.querySelectorAll(rowSelector), el => el.innerText),
+    column_headers: Array.from(document.querySelectorAll(columnSelector), el => el.innerText),
+})"""
+
+_CARD_LINK_JS = """([cardSelector, titleSelector, linkSelector, wanted]) => {
+    for (const card of document.querySelectorAll(cardSelector)) {
+        const title = card.querySelector(titleSelector);
+        if (title && title.innerText.trim() === wanted) return card.querySelector(linkSelector);
+    }
+    return null;
+}"""
+
+
+class DomSnapshot:
+    """Снимки DOM за один вызов evaluate"""
+
+    TREE_ITEM = 'div[role="treeitem"]'
+    PROJECT_CARD = 'div[aria-label="projects_card"]'
+    PROJECT_CARD_TITLE = 'div[aria-label="projects_card_title"]'
+    PROJECT_CARD_LINK = 'a[aria-label="projects_card_link"]'
+
+    def __init__(self, page: Page):
+        self.page = page
+
+    def attributes(self, selector, names):
+        """Значения атрибутов names у всех элементов selector: [{имя: значение или None}]"""
+        return self.page.evaluate(_ATTRIBUTES_JS, [selector, list(names)])
+
+    def texts(self, selector):
+        """innerText всех элементов selector"""
+        return self.page.evaluate(_TEXTS_JS, selector)
+
+    def tree_items(self, selector=TREE_ITEM):
+        """
+        Элементы файлового дерева по порядку
+
+        Returns:
+            list: [{"label": aria-label ("/путь"), "level", "expanded", "selected"}]
+        """
+        return self.page.evaluate(_TREE_JS, selector)
+
+    def grid(self, row_selector, column_selector):
+        """Заголовки строк и колонок таблицы: {"row_headers": [...], "column_headers": [...]}"""
+        return self.page.evaluate(_GRID_JS, [row_selector, column_selector])
+
+    def project_card_link(self, title):
+        """
+        Ссылка первой карточки проекта с заголовком title — найдена и возвращена тем же evaluate
+
+        Returns:
+            ElementHandle: Ссылка карточки или None (нет карточки или ссылки в ней)
+        """
+        handle = self.page.evaluate_handle(
+            _CARD_LINK_JS, [self.PROJECT_CARD, self.PROJECT_CARD_TITLE, self.PROJECT_CARD_LINK, title]
+        )
+        element = handle.as_element()
+        if element is None:
+            handle.dispose()
+        return element
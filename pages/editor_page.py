@@ -1,6 +1,7 @@
 from playwright.sync_api import Page
 from .base_page import BasePage
 import time
+from .steps import timed_step
 
 class EditorPage(BasePage):
     def __init__(self, page: Page):
@@ -86,6 +87,7 @@ class EditorPage(BasePage):
         
         return textareas_info
 
+    @timed_step
     def fill_and_save_python_script(self, script_name: str, python_code: str):
         """Полный цикл заполнения и сохранения Python скрипта"""
         # Ждем, пока файл откроется в редакторе
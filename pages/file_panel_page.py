@@ -1,6 +1,9 @@
 from playwright.sync_api import Page
 from .base_page import BasePage
 import time
+from .steps import timed_step
+from .dom_snapshot import DomSnapshot
+from . import artifacts
 
 class FilePanelPage(BasePage):
     TREE_ITEM_SELECTOR = 'div[role="treeitem"][aria-label="/{name}"]'
@@ -34,6 +37,7 @@ class FilePanelPage(BasePage):
             buttons.extend(popup.query_selector_all('[role="treeitem"]'))
         return buttons
 
+    @timed_step
     def create_file_or_folder_of_type(self, file_type_button, file_name):
         time.sleep(0.5)
         file_type_button.click()
@@ -42,11 +46,8 @@ class FilePanelPage(BasePage):
         self.page.wait_for_selector(input_selector, timeout=5000)
         input_box = self.page.query_selector(input_selector)
         if not input_box:
-            screenshot_path = f'screenshots/diagnostic_no_input_{file_name}.png'
-            self.page.screenshot(path=screenshot_path, full_page=True)
-            print(f'[DIAG] Инпут для имени не найден! Скриншот: {screenshot_path}')
-            print('[DIAG] HTML:')
-            print(self.page.content())
+            artifacts.capture(self.page, f'diagnostic_no_input_{file_name}')
+            print('[DIAG] Инпут для имени не найден! Скриншот и DOM сохранятся в артефактах теста')
             raise Exception('Input for file/folder name not found!')
         current_value = input_box.input_value()
         if current_value and current_value.strip() != '':
@@ -88,28 +89,18 @@ class FilePanelPage(BasePage):
             else:
                 print(f'[WARN] Файл {file_name} не найден в дереве файлов')
                 print(f'[WARN] Доступные файлы: {all_files}')
-                # Делаем скриншот для диагностики
-                screenshot_path = f'screenshots/diagnostic_autofile_{file_name}.png'
-                self.page.screenshot(path=screenshot_path, full_page=True)
-                print(f'[WARN] Скриншот сохранен: {screenshot_path}')
+                # Снимок для диагностики (запишется, если тест упадёт)
+                artifacts.capture(self.page, f'diagnostic_autofile_{file_name}')
                 return False
         except Exception as e:
-            screenshot_path = f'screenshots/diagnostic_autofile_{file_name}.png'
-            self.page.screenshot(path=screenshot_path, full_page=True)
-            print(f'[FAIL] Не удалось создать {file_name}: {e}. Скриншот: {screenshot_path}')
-            print('[FAIL] HTML:')
-            print(self.page.content())
+            artifacts.capture(self.page, f'diagnostic_autofile_{file_name}')
+            print(f'[FAIL] Не удалось создать {file_name}: {e}. Скриншот и DOM сохранятся в артефактах теста')
             return False
 
     def get_all_tree_names(self):
         # Возвращает список имён всех файлов и папок в дереве (без слеша в начале)
-        items = self.page.query_selector_all('div[role="treeitem"]')
-        names = []
-        for item in items:
-            aria = item.get_attribute('aria-label')
-            if aria and aria.startswith('/'):
-                names.append(aria[1:])
-        return names
+        items = DomSnapshot(self.page).tree_items()
+        return [item['label'][1:] for item in items if item['label'] and item['label'].startswith('/')]
 
     def click_toolbar_filemanager_button(self):
         self.page.get_by_role("button", name="board_toolbar_filemanager_button").click()
@@ -328,6 +319,7 @@ class FilePanelPage(BasePage):
         print("[FAIL] Кнопка типа 'Файл' не найдена!")
         return None
 
+    @timed_step
     def delete_tree_item(self, name, timeout=10000):
         selector = self.TREE_ITEM_SELECTOR.format(name=name)
         treeitem = self.page.query_selector(selector)
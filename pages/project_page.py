@@ -2,6 +2,8 @@ from playwright.sync_api import Page
 from .base_page import BasePage
 import os
 import time
+from .steps import timed_step
+from .dom_snapshot import DomSnapshot
 
 class ProjectPage(BasePage):
     CREATE_BUTTON = 'button:has-text("Создать проект")'
@@ -25,6 +27,7 @@ class ProjectPage(BasePage):
         self.page.click(self.CREATE_BUTTON)
         self.page.wait_for_selector(self.MODAL_FORM, timeout=10000)
 
+    @timed_step
     def create_project(self, title: str, code: str, git: str, default_branch: str):
         for label, value in [
             ('title', title),
@@ -40,15 +43,10 @@ class ProjectPage(BasePage):
         self.page.wait_for_selector(self.MODAL_FORM, state='detached', timeout=15000)
 
     def find_project_in_list(self, title: str):
-        self.page.wait_for_selector('div[aria-label="projects_card"]', timeout=10000)
-        cards = self.page.query_selector_all('div[aria-label="projects_card"]')
-        for card in cards:
-            title_div = card.query_selector('div[aria-label="projects_card_title"]')
-            if title_div and title_div.inner_text().strip() == title:
-                link = card.query_selector('a[aria-label="projects_card_link"]')
-                return link
-        return None
+        self.page.wait_for_selector(DomSnapshot.PROJECT_CARD, timeout=10000)
+        return DomSnapshot(self.page).project_card_link(title)
 
+    @timed_step
     def goto_project(self, code: str):
         # Обновляем страницу проектов и пытаемся найти ссылку, содержащую код
         self.goto()
@@ -58,11 +56,12 @@ class ProjectPage(BasePage):
             pass
 
         for _ in range(20):  # до ~10 секунд с полсекундным ожиданием
-            links = self.page.query_selector_all(self.PROJECT_ROW)
-            for link in links:
-                href = link.get_attribute('href')
+            # Все href одним запросом, кликаем по найденной ссылке
+            links = DomSnapshot(self.page).attributes(self.PROJECT_ROW, ['href'])
+            for i, link in enumerate(links):
+                href = link['href']
                 if href and code in href:
-                    link.click()
+                    self.page.locator(self.PROJECT_ROW).nth(i).click()
                     self.page.wait_for_load_state('networkidle')
                     return True
             # Если не нашли — обновим список и попробуем ещё раз
@@ -73,6 +72,7 @@ class ProjectPage(BasePage):
             time.sleep(0.5)
         return False
 
+    @timed_step
     def goto_first_available_project(self, timeout=15000):
         self.page.wait_for_selector('div[aria-label="projects_card"]', timeout=timeout)
         cards = self.page.query_selector_all('div[aria-label="projects_card"]')
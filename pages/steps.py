@@ -0,0 +1,140 @@
+"""
+Замер длительности шагов UI-тестов
+
+В тесте шаг начинается вызовом step() (печатает ту же строку "[INFO] Шаг ..."),
+а заканчивается следующим step() или концом теста:
+
+    step("Шаг 1: Создание Python скрипта")
+    ...
+    step("Шаг 2: Открытие диаграммы")
+
+Или блоком:
+
+    with step("Запуск диаграммы"):
+        ...
+
+Методы page-объектов замеряются декоратором:
+
+    @timed_step
+    def goto_project(self, code): ...
+
+Записи копятся в STEP_LOG; conftest.py пишет их в файл сессии и печатает
+самые медленные шаги в конце прогона.
+"""
+import functools
+import json
+import time
+from pathlib import Path
+
+
+# {"test", "step", "kind" ("step"|"method"), "ms", "ok"}
+STEP_LOG = []
+
+# Текущий тест (nodeid) и незакрытый последовательный шаг
+_current_test = None
+_open_step = None
+
+
+def set_current_test(nodeid):
+    """Начало/конец теста (вызывается из conftest.py); None закрывает открытый шаг"""
+    global _current_test
+    close_open_step(ok=True)
+    _current_test = nodeid
+
+
+def close_open_step(ok=True):
+    global _open_step
+    if _open_step is not None:
+        opened, _open_step = _open_step, None
+        opened.close(ok)
+
+
+class _Step:
+    def __init__(self, name, kind="step"):
+        self.name = name
+        self.kind = kind
+        self.test = _current_test
+        self.started = time.monotonic()
+        self.closed = False
+
+    def close(self, ok=True):
+        if self.closed:
+            return
+        self.closed = True
+        STEP_LOG.append({
+            "test": self.test,
+            "step": self.name,
+            "kind": self.kind,
+            "ms": round((time.monotonic() - self.started) * 1000, 1),
+            "ok": ok,
+        })
+
+    def __enter__(self):
+        global _open_step
+        # Шаг-блок закрывается сам, а не следующим step()
+        if _open_step is self:
+            _open_step = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(ok=exc_type is None)
+        return False
+
+
+def step(name):
+    """
+    Начинает шаг теста: закрывает предыдущий последовательный шаг и печатает name
+
+    Returns:
+        _Step: можно использовать как контекстный менеджер
+    """
+    global _open_step
+    close_open_step(ok=True)
+    print(f"[INFO] {name}")
+    _open_step = _Step(name)
+    return _open_step
+
+
+def timed_step(func):
+    """Декоратор метода page-объекта: пишет в STEP_LOG время вызова как Класс.метод"""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with _Step(f"{type(self).__name__}.{func.__name__}", kind="method") as record:
+            result = func(self, *args, **kwargs)
+            # Методы page-объектов сообщают о неудаче через False
+            if result is False:
+                record.close(ok=False)
+            return result
+    return wrapper
+
+
+def write_step_log(path):
+    """Пишет STEP_LOG в path (JSON Lines)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for record in STEP_LOG:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def read_step_logs(paths):
+    records = []
+    for path in paths:
+        with Path(path).open(encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def slowest_steps(records, limit=50):
+    return sorted(records, key=lambda r: r["ms"], reverse=True)[:limit]
+
+
+def format_slowest(records, limit=50):
+    """Текст таблицы самых медленных шагов"""
+    lines = [f"{'мс':>10}  {'тип':<6}  {'тест':<50}  шаг"]
+    for r in slowest_steps(records, limit):
+        mark = "" if r["ok"] else "  [FAIL]"
+        test = (r["test"] or "-").split("::")[-1]
+        lines.append(f"{r['ms']:>10.0f}  {r['kind']:<6}  {test:<50}  {r['step']}{mark}")
+    return "\n".join(lines)
@@ -0,0 +1,282 @@
+"""
+Ожидания по событиям страницы вместо фиксированных time.sleep
+
+    waits = Waits(page)
+    waits.network_quiet(["/api/projects"])   # нет запросов к этим маршрутам
+    waits.dom_settled()                      # DOM перестал меняться
+    waits.element_stable(locator)            # элемент виден и не двигается
+    sig = waits.canvas_signature()
+    ...                                      # действие на canvas
+    waits.canvas_repaint(previous=sig)       # canvas перерисовался и затих
+
+У каждого ожидания есть таймаут (мс); результат — True/False, как у методов
+page-объектов. Фактическое время ожидания пишется в Waits.last_ms и в общий
+WAIT_LOG (последние WAIT_LOG_SIZE ожиданий).
+"""
+import time
+import weakref
+from collections import deque
+from playwright.sync_api import Locator, Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+
+# Последние ожидания процесса: {"wait": имя, "ms": фактическое время, "ok": дождались ли}
+WAIT_LOG_SIZE = 1000
+WAIT_LOG = deque(maxlen=WAIT_LOG_SIZE)
+
+# Шаг опроса, мс
+POLL_MS = 50
+
+# Трекеры запросов по страницам: слушатели вешаются один раз на страницу
+_network_trackers = weakref.WeakKeyDictionary()
+
+
+class _NetworkTracker:
+    """Запросы страницы в полёте и время последних событий по ним"""
+
+    def __init__(self, page: Page):
+        self.inflight = {}
+        # (monotonic время, url) последних начатых/завершённых запросов
+        self.events = deque(maxlen=1000)
+        page.on("request", self._started)
+        page.on("requestfinished", self._done)
+        page.on("requestfailed", self._done)
+
+    def _started(self, request):
+        self.inflight[id(request)] = request.url
+        self.events.append((time.monotonic(), request.url))
+
+    def _done(self, request):
+        self.inflight.pop(id(request), None)
+        self.events.append((time.monotonic(), request.url))
+
+    def busy(self, url_parts, quiet_ms):
+        """Есть ли подходящие запросы в полёте или события по ним за последние quiet_ms"""
+        def matches(url):
+            return not url_parts or any(part in url for part in url_parts)
+
+        if any(matches(url) for url in list(self.inflight.values())):
+            return True
+        horizon = time.monotonic() - quiet_ms / 1000
+        return any(t >= horizon and matches(url) for t, url in reversed(self.events))
+
+
+# Отметка времени последней мутации в поддереве selector
+_DOM_SETTLED_JS = """([selector, quiet]) => {
+    const root = document.querySelector(selector);
+    if (!root) return false;
+    if (!root.__waitObserver) {
+        root.__waitLastMutation = performance.now();
+        root.__waitObserver = new MutationObserver(() => { root.__waitLastMutation = performance.now(); });
+        root.__waitObserver.observe(root, {subtree: true, childList: true, attributes: true, characterData: true});
+    }
+    return performance.now() - root.__waitLastMutation >= quiet;
+}"""
+
+_DOM_SETTLED_CLEANUP_JS = """(selector) => {
+    const root = document.querySelector(selector);
+    if (root && root.__waitObserver) {
+        root.__waitObserver.disconnect();
+        delete root.__waitObserver;
+        delete root.__waitLastMutation;
+    }
+}"""
+
+# Позиция и размер элемента не менялись quiet мс
+_ELEMENT_STABLE_JS = """([el, quiet]) => {
+    if (!el.isConnected) return false;
+    const r = el.getBoundingClientRect();
+    const key = `${r.x},${r.y},${r.width},${r.height}`;
+    const now = performance.now();
+    if (el.__waitRect !== key) {
+        el.__waitRect = key;
+        el.__waitRectSince = now;
+        return false;
+    }
+    return r.width > 0 && r.height > 0 && now - el.__waitRectSince >= quiet;
+}"""
+
+# Контрольная сумма уменьшенной копии canvas (null, если canvas не читается)
+_CANVAS_SIGNATURE_JS = """(c) => {
+    try {
+        const size = 96;
+        const copy = document.createElement('canvas');
+        copy.width = size;
+        copy.height = size;
+        const ctx = copy.getContext('2d');
+        ctx.drawImage(c, 0, 0, size, size);
+        const data = ctx.getImageData(0, 0, size, size).data;
+        let h = 0;
+        for (let i = 0; i < data.length; i++) h = (Math.imul(h, 31) + data[i]) >>> 0;
+        return `${c.width}x${c.height}:${h}`;
+    } catch (e) {
+        return null;
+    }
+}"""
+
+# Сначала (если задан previous) ждём изменения картинки, затем quiet мс без изменений
+_CANVAS_REPAINT_JS = """([c, previous, quiet]) => {
+    const signature = """ + _CANVAS_SIGNATURE_JS + """;
+    const sig = signature(c);
+    const now = performance.now();
+    const st = c.__waitRepaint || (c.__waitRepaint = {changed: previous === null, sig: undefined, since: now});
+    if (!st.changed) {
+        if (sig === previous) return false;
+        st.changed = true;
+    }
+    if (sig !== st.sig) {
+        st.sig = sig;
+        st.since = now;
+        return false;
+    }
+    return now - st.since >= quiet;
+}"""
+
+
+class Waits:
+    """Набор ожиданий для страницы"""
+
+    CANVAS = 'canvas'
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.last_ms = 0.0
+        if page not in _network_trackers:
+            _network_trackers[page] = _NetworkTracker(page)
+        self._network = _network_trackers[page]
+
+    def _record(self, name, started, ok):
+        self.last_ms = (time.monotonic() - started) * 1000
+        WAIT_LOG.append({"wait": name, "ms": round(self.last_ms, 1), "ok": ok})
+        if not ok:
+            print(f"[WARN] Ожидание '{name}' не завершилось за {self.last_ms:.0f}мс")
+        return ok
+
+    def _locator(self, target):
+        if target is None:
+            return self.page.locator(self.CANVAS).first
+        if isinstance(target, Locator):
+            return target
+        return self.page.locator(target).first
+
+    def network_quiet(self, url_parts=None, quiet_ms=500, timeout=10000):
+        """
+        Ждет, пока к маршрутам не будет запросов в полёте и новых событий quiet_ms
+
+        Учитываются запросы, начатые после первого создания Waits для страницы.
+
+        Args:
+            url_parts (list): Подстроки URL (например, ["/api/"]); None — все запросы,
+                включая long-poll и websocket, с которыми сеть может так и не затихнуть
+            quiet_ms (int): Сколько должно пройти без активности
+            timeout (int): Таймаут ожидания в миллисекундах
+
+        Returns:
+            bool: True если сеть затихла до таймаута
+        """
+        if isinstance(url_parts, str):
+            url_parts = [url_parts]
+        started = time.monotonic()
+        deadline = started + timeout / 1000
+        while True:
+            if not self._network.busy(url_parts, quiet_ms):
+                return self._record("network_quiet", started, True)
+            if time.monotonic() >= deadline:
+                return self._record("network_quiet", started, False)
+            # wait_for_timeout прокачивает события playwright (request/requestfinished)
+            self.page.wait_for_timeout(POLL_MS)
+
+    def dom_settled(self, selector="body", quiet_ms=300, timeout=10000):
+        """
+        Ждет, пока DOM внутри selector не будет меняться quiet_ms (MutationObserver)
+
+        Args:
+            selector (str): Корень наблюдения
+            quiet_ms (int): Сколько должно пройти без мутаций
+            timeout (int): Таймаут ожидания в миллисекундах
+
+        Returns:
+            bool: True если DOM успокоился до таймаута
+        """
+        started = time.monotonic()
+        try:
+            self.page.wait_for_function(_DOM_SETTLED_JS, arg=[selector, quiet_ms], polling=POLL_MS, timeout=timeout)
+            ok = True
+        except PlaywrightTimeoutError:
+            ok = False
+        finally:
+            try:
+                self.page.evaluate(_DOM_SETTLED_CLEANUP_JS, selector)
+            except Exception:
+                pass
+        return self._record("dom_settled", started, ok)
+
+    def element_stable(self, target, quiet_ms=200, timeout=10000):
+        """
+        Ждет, пока элемент станет видимым и перестанет двигаться/менять размер
+
+        Args:
+            target: Locator или селектор
+            quiet_ms (int): Сколько позиция должна оставаться неизменной
+            timeout (int): Таймаут ожидания в миллисекундах
+
+        Returns:
+            bool: True если элемент стабилен до таймаута
+        """
+        started = time.monotonic()
+        try:
+            locator = self._locator(target)
+            locator.wait_for(state="visible", timeout=timeout)
+            left = max(1, timeout - int((time.monotonic() - started) * 1000))
+            handle = locator.element_handle(timeout=left)
+            self.page.wait_for_function(_ELEMENT_STABLE_JS, arg=[handle, quiet_ms], polling="raf", timeout=left)
+            ok = True
+        except PlaywrightTimeoutError:
+            ok = False
+        return self._record("element_stable", started, ok)
+
+    def canvas_signature(self, canvas=None):
+        """
+        Контрольная сумма текущей картинки canvas (для canvas_repaint(previous=...))
+
+        Returns:
+            str: Подпись или None, если canvas не найден / не читается
+        """
+        try:
+            return self._locator(canvas).evaluate(_CANVAS_SIGNATURE_JS)
+        except Exception:
+            return None
+
+    def canvas_repaint(self, canvas=None, previous=None, quiet_ms=300, timeout=10000):
+        """
+        Ждет перерисовки canvas и её завершения
+
+        Args:
+            canvas: Locator или селектор canvas (по умолчанию первый canvas)
+            previous (str): Подпись из canvas_signature() до действия — сначала ждём,
+                пока картинка изменится; None — только ждём, пока она перестанет меняться
+            quiet_ms (int): Сколько картинка должна оставаться неизменной
+            timeout (int): Таймаут ожидания в миллисекундах
+
+        Returns:
+            bool: True если canvas перерисовался и затих до таймаута
+        """
+        started = time.monotonic()
+        handle = None
+        try:
+            locator = self._locator(canvas)
+            locator.wait_for(state="visible", timeout=timeout)
+            left = max(1, timeout - int((time.monotonic() - started) * 1000))
+            handle = locator.element_handle(timeout=left)
+            handle.evaluate("c => { delete c.__waitRepaint; }")
+            self.page.wait_for_function(_CANVAS_REPAINT_JS, arg=[handle, previous, quiet_ms], polling="raf", timeout=left)
+            ok = True
+        except PlaywrightTimeoutError:
+            ok = False
+        finally:
+            if handle is not None:
+                try:
+                    handle.evaluate("c => { delete c.__waitRepaint; }")
+                except Exception:
+                    pass
+        return self._record("canvas_repaint", started, ok)
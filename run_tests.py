@@ -1,81 +1,205 @@
 #!/usr/bin/env python3
 """
 Простой скрипт для запуска тестов с выбором хоста
+
+Несколько хостов через запятую (st1,st2,st3,st4) запускаются параллельно,
+каждый в своём процессе pytest: переменные окружения передаются процессу
+напрямую, общий .env не переписывается. Результаты сводятся в матрицу
+тест x хост в reports/hosts/<время запуска>/, там же артефакты упавших
+тестов (<хост>/) и длительности (<хост>_durations.json) каждого хоста —
+после запуска длительности сливаются в общую историю.
 """
 
 import os
+import shutil
 import sys
 import subprocess
+import time
+from datetime import datetime
 from pathlib import Path
 
-def main():
-    if len(sys.argv) < 2:
-        print("Использование: python run_tests.py <хост> [аргументы pytest]")
-        print("\nПримеры:")
-        print("  python run_tests.py http://192.168.0.7:3333/")
-        print("  python run_tests.py st1 -v")
-        print("  python run_tests.py local-a tests/ui/test_login.py")
-        sys.exit(1)
-    
-    host_arg = sys.argv[1]
-    pytest_args = sys.argv[2:] if len(sys.argv) > 2 else []
-    
-    # Маппинг хостов на URL
-    host_urls = {
-        "st1": "https://decision-flow-web-1.df-st1.cloud.b-pl.pro",
-        "st2": "https://decision-flow-web-1.df-st2.cloud2.b-pl.pro", 
-        "st3": "https://decision-flow-frontend-st3.df-st.b-pl.cloud2",
-        "st4": "https://decision-flow-web-1.df-st4.cloud2.b-pl.pro",
-        "local-a": "http://localhost:3333",
-        "local-b": "http://localhost:3334", 
-        "local-c": "http://localhost:3335",
-        "local-192": "http://192.168.0.7:3333"
-    }
-    
-    # Определяем URL хоста
+from utils.test_durations import HISTORY_FILE, load_history, run_durations, update_history
+from utils.host_matrix import read_junit, format_matrix, write_matrix
+
+# Маппинг хостов на URL
+HOST_URLS = {
+    "st1": "https://decision-flow-web-1.df-st1.cloud.b-pl.pro",
+    "st2": "https://decision-flow-web-1.df-st2.cloud2.b-pl.pro",
+    "st3": "https://decision-flow-frontend-st3.df-st.b-pl.cloud2",
+    "st4": "https://decision-flow-web-1.df-st4.cloud2.b-pl.pro",
+    "local-a": "http://localhost:3333",
+    "local-b": "http://localhost:3334",
+    "local-c": "http://localhost:3335",
+    "local-192": "http://192.168.0.7:3333"
+}
+
+# Переменная-признак: окружение передано процессу, conftest.py не читает .env
+ENV_INJECTED_FLAG = "TESTS_ENV_INJECTED"
+
+HOSTS_REPORTS_DIR = Path(__file__).parent / "reports" / "hosts"
+
+
+def resolve_host(host_arg):
+    """Алиас или URL хоста -> (host_id, base_url); None, если хост неизвестен"""
     if host_arg.startswith("http://") or host_arg.startswith("https://"):
-        base_url = host_arg.rstrip("/")
-        host_id = "custom"
-    elif host_arg in host_urls:
-        base_url = host_urls[host_arg]
-        host_id = host_arg
-    else:
-        available_hosts = ", ".join(host_urls.keys())
-        print(f"Ошибка: Неизвестный хост '{host_arg}'")
-        print(f"Доступные хосты: {available_hosts}")
-        print("Или используйте полный URL: http://192.168.0.7:3333/")
-        sys.exit(1)
-    
+        return "custom", host_arg.rstrip("/")
+    if host_arg in HOST_URLS:
+        return host_arg, HOST_URLS[host_arg]
+    return None
+
+
+def host_env(base_url):
+    """Переменные окружения тестов для хоста (то же, что пишется в .env)"""
+    return {
+        "BASE_URL": base_url,
+        "LOGIN": "admin@balance-pl.ru",
+        "PASSWORD": "admin",
+        "DATABASE_URL": "$env.DATABASE_URL",
+        "REPO_URL_FLOW": "git@gitlab.infra.b-pl.pro:ilya.kurilin/qa_auto_test.git",
+    }
+
+
+def unknown_host(host_arg):
+    available_hosts = ", ".join(HOST_URLS.keys())
+    print(f"Ошибка: Неизвестный хост '{host_arg}'")
+    print(f"Доступные хосты: {available_hosts}")
+    print("Или используйте полный URL: http://192.168.0.7:3333/")
+    sys.exit(1)
+
+
+def run_single(host_id, base_url, pytest_args):
     # Обновляем .env файл
     env_path = Path(__file__).parent / ".env"
+    variables = host_env(base_url)
     env_content = f"""# Конфигурация хостов для тестирования
 # Автоматически обновлено для хоста: {host_id}
 
-BASE_URL={base_url}
-LOGIN=admin@balance-pl.ru
-PASSWORD=admin
+BASE_URL={variables['BASE_URL']}
+LOGIN={variables['LOGIN']}
+PASSWORD={variables['PASSWORD']}
 
-DATABASE_URL=$env.DATABASE_URL
-REPO_URL_FLOW=git@gitlab.infra.b-pl.pro:ilya.kurilin/qa_auto_test.git
+DATABASE_URL={variables['DATABASE_URL']}
+REPO_URL_FLOW={variables['REPO_URL_FLOW']}
 """
-    
+
     with open(env_path, 'w', encoding='utf-8') as f:
         f.write(env_content)
-    
+
     print(f"[HOST] Выбран хост: {host_id}")
     print(f"[URL] BASE_URL установлен: {base_url}")
     print(f"[ARGS] Аргументы pytest: {pytest_args}")
-    
+
     # Запускаем pytest
     cmd = ["python", "-m", "pytest"] + pytest_args
     print(f"[CMD] Выполняется: {' '.join(cmd)}")
-    
+
     try:
         result = subprocess.run(cmd, check=False)
+        if "--collect-only" not in pytest_args:
+            print(f"[HISTORY] Длительность тестов: {HISTORY_FILE}")
         sys.exit(result.returncode)
     except KeyboardInterrupt:
         print("\n[INFO] Тестирование прервано пользователем")
         sys.exit(1)
 
+
+def run_fanout(hosts, pytest_args):
+    """
+    Параллельный запуск на нескольких хостах: процесс pytest на хост,
+    вывод — в <хост>.log, результаты — <хост>.xml и общая матрица
+    """
+    run_dir = HOSTS_REPORTS_DIR / datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    auth_dir = Path(__file__).parent / ".auth"
+    # Каждый процесс копит длительности в своей копии истории, общая обновляется в конце
+    base_history = load_history()
+
+    print(f"[HOSTS] Хосты: {', '.join(host_id for host_id, _ in hosts)}")
+    print(f"[ARGS] Аргументы pytest: {pytest_args}")
+    print(f"[REPORT] Каталог запуска: {run_dir}")
+
+    processes = {}
+    logs = {}
+    started = time.monotonic()
+    try:
+        for host_id, base_url in hosts:
+            env = dict(os.environ)
+            env.update(host_env(base_url))
+            env[ENV_INJECTED_FLAG] = "1"
+            # Состояние авторизации у каждого хоста своё, чтобы процессы не перезаписывали его друг другу
+            env["AUTH_STATE_FILE"] = str(auth_dir / f"storage_state_{host_id}.json")
+            # Имена артефактов у хостов совпадают — у каждого свой каталог
+            env["ARTIFACTS_DIR"] = str(run_dir / host_id)
+            durations_file = run_dir / f"{host_id}_durations.json"
+            if HISTORY_FILE.exists():
+                shutil.copyfile(HISTORY_FILE, durations_file)
+            env["TEST_DURATIONS_FILE"] = str(durations_file)
+            cmd = ["python", "-m", "pytest"] + pytest_args + [f"--junitxml={run_dir / f'{host_id}.xml'}"]
+            logs[host_id] = open(run_dir / f"{host_id}.log", "w", encoding="utf-8")
+            processes[host_id] = subprocess.Popen(cmd, env=env, stdout=logs[host_id], stderr=subprocess.STDOUT)
+            print(f"[START] {host_id}: {base_url} (pid {processes[host_id].pid})")
+
+        exit_codes = {}
+        for host_id, process in processes.items():
+            exit_codes[host_id] = process.wait()
+            print(f"[DONE] {host_id}: код {exit_codes[host_id]}, {time.monotonic() - started:.0f}с с начала запуска")
+    except KeyboardInterrupt:
+        print("\n[INFO] Тестирование прервано пользователем")
+        for process in processes.values():
+            process.terminate()
+        sys.exit(1)
+    finally:
+        for log in logs.values():
+            log.close()
+
+    for host_id, _ in hosts:
+        durations = run_durations(run_dir / f"{host_id}_durations.json", base_history)
+        if durations:
+            update_history(durations)
+    if "--collect-only" not in pytest_args:
+        print(f"[HISTORY] Длительность тестов: {HISTORY_FILE}")
+
+    host_results = {host_id: read_junit(run_dir / f"{host_id}.xml") for host_id, _ in hosts}
+    report = write_matrix(run_dir, host_results, exit_codes, dict(hosts))
+    print()
+    print(format_matrix(host_results, exit_codes))
+    print(f"\n[REPORT] Матрица: {report}")
+    sys.exit(max(exit_codes.values(), default=0))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python run_tests.py <хост>[,<хост>...] [аргументы pytest]")
+        print("\nПримеры:")
+        print("  python run_tests.py http://192.168.0.7:3333/")
+        print("  python run_tests.py st1 -v")
+        print("  python run_tests.py local-a tests/ui/test_login.py")
+        print("  python run_tests.py st1 -n 4            # самые долгие тесты первыми по истории")
+        print("  python run_tests.py st1 --shard 1/2     # первая из двух равных по времени частей")
+        print("  python run_tests.py st1,st2,st3,st4 -n 2  # параллельно на четырёх хостах, общая матрица")
+        sys.exit(1)
+
+    host_arg = sys.argv[1]
+    pytest_args = sys.argv[2:] if len(sys.argv) > 2 else []
+
+    if "," in host_arg:
+        hosts = []
+        for part in filter(None, host_arg.split(",")):
+            resolved = resolve_host(part.strip())
+            if resolved is None:
+                unknown_host(part)
+            if resolved[0] == "custom":
+                # У нескольких URL должны быть разные имена отчётов и логов
+                resolved = (f"custom{len(hosts) + 1}", resolved[1])
+            if resolved not in hosts:
+                hosts.append(resolved)
+        run_fanout(hosts, pytest_args)
+        return
+
+    resolved = resolve_host(host_arg)
+    if resolved is None:
+        unknown_host(host_arg)
+    run_single(*resolved, pytest_args)
+
 if __name__ == "__main__":
     main()
@@ -5,6 +5,7 @@ from pages.file_panel_page import FilePanelPage
 from pages.diagram_page import DiagramPage
 from pages.canvas_utils import CanvasUtils
 from pages.connection_page import ConnectionPage
+from pages.steps import step
 from conftest import save_screenshot, get_project_by_code, delete_project_by_id
 from locators import (
     FilePanelLocators,
@@ -31,7 +32,7 @@ def test_flow_flow_component(login_page, shared_flow_project):
     assert project_page.goto_project(project_code), f"Проект с кодом {project_code} не найден!"
     time.sleep(2)
 
-    print("[INFO] Шаг 1: Создание файла 'Процесс' в корне проекта")
+    step("Шаг 1: Создание файла 'Процесс' в корне проекта")
     file_panel.open_file_panel()
     time.sleep(1)
     
@@ -78,7 +79,7 @@ def test_flow_flow_component(login_page, shared_flow_project):
     time.sleep(1)
     print("[INFO] Все панели закрыты")
     
-    print("[INFO] Шаг 2: Добавление элемента Input на канвас")
+    step("Шаг 2: Добавление элемента Input на канвас")
     
     page.get_by_role("button", name="diagram_create_button").click()
     time.sleep(0.5)
@@ -94,7 +95,7 @@ def test_flow_flow_component(login_page, shared_flow_project):
     time.sleep(1)
     print("[SUCCESS] Элемент Input размещен на канвасе")
     
-    print("[INFO] Шаг 3: Добавление элемента Output на канвас")
+    step("Шаг 3: Добавление элемента Output на канвас")
     
     diagram_page.close_right_sidebar()
     time.sleep(0.5)
@@ -114,7 +115,7 @@ def test_flow_flow_component(login_page, shared_flow_project):
     diagram_page.close_right_sidebar()
     time.sleep(0.5)
     
-    print("[INFO] Шаг 4: Соединение Input -> Output стрелкой")
+    step("Шаг 4: Соединение Input -> Output стрелкой")
     
     success = connection_page.create_connection("Input", "Output", "right", "center")
     if success:
@@ -137,7 +138,7 @@ def test_flow_flow_component(login_page, shared_flow_project):
                 connection_page.create_connection_by_coordinates(from_x, from_y, to_x, to_y)
                 print("[SUCCESS] Соединение создано по координатам")
     
-    print("[INFO] Шаг 5: Заполнение поля 'Данные' для компонента Output")
+    step("Шаг 5: Заполнение поля 'Данные' для компонента Output")
     
     output_component = page.locator(ComponentLocators.OUTPUT)
     output_component.dblclick()
@@ -164,7 +165,7 @@ def test_flow_flow_component(login_page, shared_flow_project):
         print(f"[WARN] Ошибка при заполнении поля 'Данные': {e}")
         page.screenshot(path='screenshots/debug_output_data_error.png', full_page=True)
     
-    print("[INFO] Шаг 6: Переход к диаграмме test_flow")
+    step("Шаг 6: Переход к диаграмме test_flow")
     
     file_panel.open_file_panel()
     time.sleep(1)
@@ -197,7 +198,7 @@ def test_flow_flow_component(login_page, shared_flow_project):
     
     print("[SUCCESS] Диаграмма test_flow открыта!")
     
-    print("[INFO] Шаг 7: Поиск компонента Flow_proc на канвасе")
+    step("Шаг 7: Поиск компонента Flow_proc на канвасе")
     flow_proc_found = canvas_utils.find_component_by_title("Flow_proc", exact=True)
     
     if flow_proc_found:
@@ -263,7 +264,7 @@ def test_flow_flow_component(login_page, shared_flow_project):
         print("[ERROR] Компонент 'Flow_proc' не найден на канвасе!")
         assert False, "Компонент Flow_proc не найден!"
 
-    print("[INFO] Шаг 8: Выполнение диаграммы и проверка результата")
+    step("Шаг 8: Выполнение диаграммы и проверка результата")
     
     success = diagram_page.run_diagram_and_wait(completion_timeout=15000)
     assert success, "Диаграмма не выполнилась успешно!"
@@ -4,6 +4,7 @@ from pages.project_page import ProjectPage
 from pages.file_panel_page import FilePanelPage
 from pages.diagram_page import DiagramPage
 from pages.canvas_utils import CanvasUtils
+from pages.steps import step
 from conftest import save_screenshot, get_project_by_code, delete_project_by_id
 from locators import (
     FilePanelLocators,
@@ -29,7 +30,7 @@ def test_flow_catch(login_page, shared_flow_project):
     assert project_page.goto_project(project_code), f"Проект с кодом {project_code} не найден!"
     time.sleep(2)
 
-    print("[INFO] Шаг 1: Открытие диаграммы test_catch.df.json")
+    step("Шаг 1: Открытие диаграммы test_catch.df.json")
     file_panel.open_file_panel()
     time.sleep(1)
     
@@ -49,7 +50,7 @@ def test_flow_catch(login_page, shared_flow_project):
     time.sleep(1)
     print("[SUCCESS] Диаграмма test_catch открыта и панели закрыты!")
 
-    print("[INFO] Шаг 2: Поиск и настройка компонента Output2")
+    step("Шаг 2: Поиск и настройка компонента Output2")
     output2_found = canvas_utils.find_component_by_title("Output2", exact=True)
     assert output2_found, "Компонент 'Output2' не найден на канвасе!"
     print("[SUCCESS] Компонент 'Output2' найден на канвасе!")
@@ -84,7 +85,7 @@ def test_flow_catch(login_page, shared_flow_project):
     time.sleep(1)
     print("[SUCCESS] Сайдбар закрыт после настройки Output2")
 
-    print("[INFO] Шаг 3: Выполнение диаграммы")
+    step("Шаг 3: Выполнение диаграммы")
     success = diagram_page.run_diagram_and_wait(completion_timeout=15000)
     if success:
         print("[SUCCESS] Диаграмма завершилась успешно!")
@@ -100,7 +101,7 @@ def test_flow_catch(login_page, shared_flow_project):
     else:
         print("[WARN] Диаграмма не завершилась успешно, но продолжаем проверку")
 
-    print("[INFO] Шаг 4: Проверка вывода компонента Output2 в анализе")
+    step("Шаг 4: Проверка вывода компонента Output2 в анализе")
     output2_component = page.get_by_text("Output2").first
     output2_component.dblclick(force=True)
     time.sleep(1)
@@ -5,6 +5,7 @@ from pages.file_panel_page import FilePanelPage
 from pages.diagram_page import DiagramPage
 from pages.canvas_utils import CanvasUtils
 from pages.connection_page import ConnectionPage
+from pages.steps import step
 from conftest import save_screenshot, get_project_by_code, delete_project_by_id
 from locators import (
     FilePanelLocators,
@@ -33,7 +34,7 @@ def test_flow_cycle(login_page, shared_flow_project):
 
     print("[INFO] Тест test_flow_cycle начат")
 
-    print("[INFO] Шаг 1: Создание Python скрипта для циклических операций")
+    step("Шаг 1: Создание Python скрипта для циклических операций")
     
     file_panel.open_file_panel()
     time.sleep(1)
@@ -153,7 +154,7 @@ def test_flow_cycle(login_page, shared_flow_project):
     time.sleep(1)
     print("[SUCCESS] Python скрипт создан и сохранен успешно!")
 
-    print("[INFO] Шаг 2: Открытие диаграммы test_cycle.df.json")
+    step("Шаг 2: Открытие диаграммы test_cycle.df.json")
 
     test_flow_component_folder = page.locator(FilePanelLocators.get_treeitem_by_name("test_flow_component"))
     if test_flow_component_folder.count() > 0:
@@ -181,7 +182,7 @@ def test_flow_cycle(login_page, shared_flow_project):
     
     print("[SUCCESS] Диаграмма test_cycle.df.json открыта, панели закрыты!")
 
-    print("[INFO] Шаг 3: Настройка компонента Function на canvas")
+    step("Шаг 3: Настройка компонента Function на canvas")
 
     function_component = page.locator(DiagramLocators.FUNCTION_COMPONENT)
     if function_component.count() > 0:
@@ -256,7 +257,7 @@ def test_flow_cycle(login_page, shared_flow_project):
 
     print("[SUCCESS] Компонент Function настроен успешно!")
 
-    print("[INFO] Шаг 4: Заполнение входных данных для функции count_to_n")
+    step("Шаг 4: Заполнение входных данных для функции count_to_n")
 
     time.sleep(2)
 
@@ -274,7 +275,7 @@ def test_flow_cycle(login_page, shared_flow_project):
 
     print("[SUCCESS] Все входные данные заполнены!")
 
-    print("[INFO] Шаг 5: Настройка компонента Loop на canvas")
+    step("Шаг 5: Настройка компонента Loop на canvas")
 
     print("[INFO] Поиск компонента Loop на канвасе")
     
@@ -376,7 +377,7 @@ def test_flow_cycle(login_page, shared_flow_project):
 
     print("[SUCCESS] Компонент Loop найден и готов к настройке!")
 
-    print("[INFO] Шаг 6: Настройка параметров цикла Loop")
+    step("Шаг 6: Настройка параметров цикла Loop")
     
     details_panel = page.locator(DiagramLocators.DETAILS_PANEL)
     if not details_panel.is_visible():
@@ -469,7 +470,7 @@ def test_flow_cycle(login_page, shared_flow_project):
 
     print("[SUCCESS] Параметры цикла Loop настроены успешно!")
 
-    print("[INFO] Шаг 7: Закрытие сайдбара и настройка компонента Output")
+    step("Шаг 7: Закрытие сайдбара и настройка компонента Output")
     
     print("[INFO] Закрытие правого сайдбара")
     try:
@@ -521,7 +522,7 @@ def test_flow_cycle(login_page, shared_flow_project):
 
     print("[SUCCESS] Компонент Output настроен успешно!")
 
-    print("[INFO] Шаг 8: Запуск диаграммы")
+    step("Шаг 8: Запуск диаграммы")
 
     print("[INFO] Закрытие правого сайдбара перед запуском")
     try:
@@ -10,6 +10,7 @@ from pages.file_panel_page import FilePanelPage
 from pages.data_struct_page import DataStructPage
 from pages.canvas_utils import CanvasUtils
 from pages.diagram_page import DiagramPage
+from pages.steps import step
 from conftest import save_screenshot
 from locators import (
     FilePanelLocators, DiagramLocators, CanvasLocators, 
@@ -45,7 +46,7 @@ def test_flow_func(login_page, shared_flow_project):
         time.sleep(0.5)
     print("[INFO] Открыта файловая панель")
 
-    print("[INFO] Шаг 1: Создание Python скрипта в проекте")
+    step("Шаг 1: Создание Python скрипта в проекте")
 
     scripts_folder = page.locator(FilePanelLocators.get_treeitem_by_name("scripts"))
     if scripts_folder.count() > 0:
@@ -84,7 +85,7 @@ def test_flow_func(login_page, shared_flow_project):
     time.sleep(2)
     print("[INFO] Создан Python файл 'math_functions.py'")
 
-    print("[INFO] Шаг 2: Заполнение Python скрипта содержимым")
+    step("Шаг 2: Заполнение Python скрипта содержимым")
 
     python_file = page.locator(FilePanelLocators.get_treeitem_by_name("math_functions.py"))
     if python_file.count() > 0:
@@ -191,7 +192,7 @@ def test_flow_func(login_page, shared_flow_project):
     
     print("[SUCCESS] Python скрипт создан и сохранен успешно!")
 
-    print("[INFO] Шаг 3: Открытие диаграммы test_func.df.json")
+    step("Шаг 3: Открытие диаграммы test_func.df.json")
 
     test_flow_component_folder = page.locator(FilePanelLocators.get_treeitem_by_name("test_flow_component"))
     if test_flow_component_folder.count() > 0:
@@ -221,7 +222,7 @@ def test_flow_func(login_page, shared_flow_project):
     
     print("[SUCCESS] Диаграмма test_func.df.json открыта, панели закрыты!")
 
-    print("[INFO] Шаг 4: Настройка компонента Function на canvas")
+    step("Шаг 4: Настройка компонента Function на canvas")
 
     function_component = page.locator('text="Function"')
     if function_component.count() > 0:
@@ -296,7 +297,7 @@ def test_flow_func(login_page, shared_flow_project):
 
     print("[SUCCESS] Компонент Function настроен успешно!")
 
-    print("[INFO] Шаг 5: Заполнение входных данных для функции")
+    step("Шаг 5: Заполнение входных данных для функции")
 
     time.sleep(2)
 
@@ -362,7 +363,7 @@ def test_flow_func(login_page, shared_flow_project):
 
     print("[SUCCESS] Все входные данные заполнены!")
 
-    print("[INFO] Шаг 6: Закрытие правого сайдбара и настройка компонента Output")
+    step("Шаг 6: Закрытие правого сайдбара и настройка компонента Output")
 
     print("[INFO] Закрытие правого сайдбара")
     try:
@@ -414,7 +415,7 @@ def test_flow_func(login_page, shared_flow_project):
 
     print("[SUCCESS] Компонент Output настроен успешно!")
 
-    print("[INFO] Шаг 7: Запуск диаграммы")
+    step("Шаг 7: Запуск диаграммы")
 
     print("[INFO] Закрытие правого сайдбара перед запуском")
     try:
@@ -432,7 +433,7 @@ def test_flow_func(login_page, shared_flow_project):
     assert success, "Диаграмма не выполнилась успешно!"
     print("[SUCCESS] Диаграмма выполнена успешно!")
     
-    print("[INFO] Шаг 8: Проверка консоли с print-ами из функции")
+    step("Шаг 8: Проверка консоли с print-ами из функции")
     
     try:
         output_panel_button = page.get_by_role("button", name="outputpanel_switch_button")
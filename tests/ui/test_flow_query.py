@@ -8,6 +8,7 @@ from pages.data_struct_page import DataStructPage
 from pages.canvas_utils import CanvasUtils
 from pages.db_connector_page import DBConnectorPage
 from pages.diagram_page import DiagramPage
+from pages.steps import step
 from conftest import save_screenshot
 from locators import (
     FilePanelLocators, DiagramLocators, CanvasLocators, 
@@ -41,7 +42,7 @@ def test_flow_query(login_page, shared_flow_project):
         time.sleep(0.5)
     print("[INFO] Файловая панель открыта")
 
-    print("[INFO] Шаг 1: Создание файла базы данных 'db_query' в папке 'db_connection'")
+    step("Шаг 1: Создание файла базы данных 'db_query' в папке 'db_connection'")
 
     db_connection_folder = page.locator(FilePanelLocators.get_treeitem_by_name("db_connection"))
     assert db_connection_folder.count() > 0, "Папка 'db_connection' не найдена в файловой панели!"
@@ -75,7 +76,7 @@ def test_flow_query(login_page, shared_flow_project):
     time.sleep(2)
     print(f"[INFO] Создан файл базы данных '{db_file_name}'")
 
-    print("[INFO] Шаг 2: Настройка подключения к базе данных")
+    step("Шаг 2: Настройка подключения к базе данных")
 
     db_file_item = page.locator(FilePanelLocators.get_treeitem_by_name(db_file_name))
     assert db_file_item.is_visible(), f"Файл базы данных '{db_file_name}' не найден!"
@@ -92,7 +93,7 @@ def test_flow_query(login_page, shared_flow_project):
     db_connector.configure_and_save_connection()
     print("[INFO] Подключение к базе данных настроено и сохранено")
 
-    print("[INFO] Шаг 3: Открытие диаграммы 'test_query.df.json' в папке 'test_flow_component'")
+    step("Шаг 3: Открытие диаграммы 'test_query.df.json' в папке 'test_flow_component'")
 
     test_flow_folder = page.locator(FilePanelLocators.get_treeitem_by_name("test_flow_component"))
     assert test_flow_folder.count() > 0, "Папка 'test_flow_component' не найдена в файловой панели!"
@@ -134,7 +135,7 @@ def test_flow_query(login_page, shared_flow_project):
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт или не найден: {e}")
 
-    print("[INFO] Шаг 4: Поиск и настройка компонента Query на канвасе")
+    step("Шаг 4: Поиск и настройка компонента Query на канвасе")
 
     canvas_utils = CanvasUtils(page)
     query_found = canvas_utils.find_component_by_title("Query", timeout=10000)
@@ -145,7 +146,7 @@ def test_flow_query(login_page, shared_flow_project):
     details_panel.wait_for(state="visible", timeout=10000)
     print("[INFO] Правый сайдбар открыт")
 
-    print("[INFO] Шаг 5: Настройка подключения к БД в компоненте Query")
+    step("Шаг 5: Настройка подключения к БД в компоненте Query")
 
     select_file_button = page.get_by_role("button", name="textfield_select_file_button")
     assert select_file_button.is_visible(), "Кнопка выбора файла не найдена!"
@@ -179,7 +180,7 @@ def test_flow_query(login_page, shared_flow_project):
     modal.wait_for(state="hidden", timeout=10000)
     print("[INFO] Модалка выбора БД закрыта")
 
-    print("[INFO] Шаг 6: Заполнение SQL запроса в поле редактора")
+    step("Шаг 6: Заполнение SQL запроса в поле редактора")
 
     sql_editor = page.get_by_role("textbox", name="editor_view").first
     assert sql_editor.is_visible(), "Поле редактора SQL не найдено!"
@@ -201,7 +202,7 @@ def test_flow_query(login_page, shared_flow_project):
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт или не найден: {e}")
 
-    print("[INFO] Шаг 7: Настройка компонента Output")
+    step("Шаг 7: Настройка компонента Output")
 
     output_found = canvas_utils.find_component_by_title("Output", timeout=10000)
     assert output_found, "Компонент 'Output' не найден на канвасе!"
@@ -230,14 +231,14 @@ def test_flow_query(login_page, shared_flow_project):
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт: {e}")
 
-    print("[INFO] Шаг 8: Запуск диаграммы")
+    step("Шаг 8: Запуск диаграммы")
 
     success = diagram_page.run_diagram_and_wait(completion_timeout=15000)
     
     assert success, "Диаграмма не выполнилась успешно!"
     print("[INFO] Диаграмма завершилась успешно!")
 
-    print("[INFO] Шаг 9: Проверка JSON данных в модальном окне")
+    step("Шаг 9: Проверка JSON данных в модальном окне")
 
     canvas = page.locator(CanvasLocators.CANVAS).first
     canvas.dblclick(force=True)
@@ -1,10 +1,12 @@
 import time
 import os
+from pathlib import Path
 from pages.project_page import ProjectPage
 from pages.file_panel_page import FilePanelPage
-from pages.data_struct_page import DataStructPage
 from pages.canvas_utils import CanvasUtils
 from pages.diagram_page import DiagramPage
+from pages.steps import step
+from pages.waits import Waits
 from conftest import save_screenshot, get_project_by_code, delete_project_by_id
 from locators import (
     FilePanelLocators, DiagramLocators, CanvasLocators, 
@@ -12,22 +14,54 @@ from locators import (
 )
 
 
-def test_flow_split(login_page, shared_flow_project):
+SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "scripts"
+
+SPLIT_SCHEMA_NAME = "split_schema"
+
+# Структура данных shema/shema_for_split.ds.json: схема со всеми типами атрибутов.
+# Поля те же, что у формы редактора (attributes.N.name / schema.type / schema.description)
+SHEMA_FOR_SPLIT = {
+    "schemas": [
+        {
+            "name": SPLIT_SCHEMA_NAME,
+            "attributes": [
+                {"name": "id", "schema": {"type": "integer", "description": "Уникальный идентификатор"}},
+                {"name": "name", "schema": {"type": "string", "description": "Название элемента"}},
+                {"name": "value", "schema": {"type": "float", "description": "Числовое значение"}},
+                {"name": "active", "schema": {"type": "boolean", "description": "Активен ли элемент"}},
+                {"name": "tags", "schema": {"type": "list", "items": {"type": "string"},
+                                            "description": "Список тегов"}},
+            ],
+        }
+    ]
+}
+
+
+def test_flow_split(login_page, seed_project):
     """
     Тест для работы с компонентом Split
     """
     page = login_page
-    project_code = shared_flow_project
     project_page = ProjectPage(page)
     diagram_page = DiagramPage(page)
+    waits = Waits(page)
+    
+    step("Шаг 1: Наполнение проекта: структура данных 'shema_for_split' и скрипты")
+    
+    project_code = seed_project({
+        "shema/shema_for_split.ds.json": SHEMA_FOR_SPLIT,
+        "scripts/math_functions.py": SCRIPTS_DIR / "math_functions.py",
+    })
+    schema_name = SPLIT_SCHEMA_NAME
     
     print(f"[INFO] Начинаем тест Split в проекте: {project_code}")
     
+    step("Шаг 2: Открытие проекта")
+    
     assert project_page.goto_project(project_code), f"Проект с кодом {project_code} не найден!"
-    time.sleep(2)
+    waits.network_quiet(["/api/"])
     
     file_panel = FilePanelPage(page)
-    data_struct = DataStructPage(page)
     
     try:
         is_open = page.locator(ToolbarLocators.BOARD_TOOLBAR_PANEL).is_visible()
@@ -35,110 +69,31 @@ def test_flow_split(login_page, shared_flow_project):
         is_open = False
     if not is_open:
         file_panel.open_file_panel()
-        time.sleep(0.5)
+        waits.dom_settled()
     print("[INFO] Панель файлов открыта")
     
-    print("[INFO] Шаг 1: Создание структуры данных 'shema_for_split' в папке 'shema'")
-    
-    shema_folder = page.locator(FilePanelLocators.get_treeitem_by_name("shema"))
-    assert shema_folder.count() > 0, "Папка 'shema' не найдена в проекте!"
-    print("[INFO] Папка 'shema' найдена")
-    shema_folder.first.click(button="right")
-    time.sleep(1)
-    print("[INFO] Правый клик по папке 'shema' выполнен")
-    
-    create_menu = page.get_by_text("Создать", exact=True)
-    assert create_menu.is_visible(), "Пункт 'Создать' не найден в контекстном меню!"
-    create_menu.click()
-    time.sleep(0.5)
-    print("[INFO] Выбран пункт 'Создать' из контекстного меню")
-    
-    data_structures_menu = page.get_by_text("Структуры данных", exact=True)
-    assert data_structures_menu.is_visible(), "Пункт 'Структуры данных' не найден в подменю!"
-    data_structures_menu.click()
-    time.sleep(1)
-    print("[INFO] Выбран пункт 'Структуры данных' из подменю")
-    
-    name_input = page.get_by_role("textbox", name="treeitem_label_field")
-    name_input.wait_for(state="visible", timeout=10000)
-    assert name_input.is_visible(), "Поле ввода имени не появилось!"
-    name_input.fill("shema_for_split")
-    name_input.press("Enter")
-    time.sleep(2)
-    print("[INFO] Создана структура данных 'shema_for_split'")
-    
-    print("[INFO] Шаг 2: Создание схемы в структуре со всеми атрибутами")
-    
-    shema_for_split = page.locator(FilePanelLocators.get_treeitem_by_name("shema_for_split"))
-    assert shema_for_split.is_visible(), "Структура 'shema_for_split' не найдена!"
-    shema_for_split.click()
-    time.sleep(1)
-    print("[INFO] Клик по структуре 'shema_for_split' выполнен")
-    
-    details_panel = page.locator(DiagramLocators.DETAILS_PANEL)
-    if not details_panel.is_visible():
-        switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
-        if switcher.is_visible():
-            switcher.click()
-            time.sleep(0.3)
-            print("[INFO] Панель деталей диаграммы открыта")
-    
-    schema_name = f"split_schema_{int(time.time())}"
-    data_struct.click_create_schema_button(schema_name)
-    time.sleep(0.5)
-    print(f"[INFO] Создана схема: {schema_name}")
-    
-    attributes_data = [
-        {"name": "id", "type": "integer", "desc": "Уникальный идентификатор"},
-        {"name": "name", "type": "string", "desc": "Название элемента"},
-        {"name": "value", "type": "float", "desc": "Числовое значение"},
-        {"name": "active", "type": "boolean", "desc": "Активен ли элемент"},
-        {"name": "tags", "type": "list", "desc": "Список тегов"}
-    ]
-    
-    for idx, attr in enumerate(attributes_data):
-        data_struct.click_create_attribute_button()
-        time.sleep(1)
-        
-        data_struct.fill_attribute_name_by_index(idx, attr["name"])
-        data_struct.press_enter_attribute_name_by_index(idx)
-        time.sleep(0.5)
-        
-        if attr["type"] == "list":
-            data_struct.select_attribute_type_by_index(idx, "list")
-            time.sleep(0.5)
-            data_struct.select_list_element_type_in_modal("string")
-            time.sleep(0.5)
-        else:
-            data_struct.select_attribute_type_by_index(idx, attr["type"])
-            time.sleep(0.5)
-        
-        data_struct.fill_attribute_description_by_index(idx, attr["desc"])
-        time.sleep(0.5)
-        
-        print(f"[INFO] Создан атрибут {idx}: {attr['name']} ({attr['type']})")
-    
-    print("[INFO] Схема с атрибутами создана")
+    assert page.locator(FilePanelLocators.get_treeitem_by_name("shema")).count() > 0, \
+        "Папка 'shema' не найдена в проекте!"
     
-    print("[INFO] Шаг 3: Открытие диаграммы 'test_split.df.json' в папке 'test_flow_component'")
+    step("Шаг 3: Открытие диаграммы 'test_split.df.json' в папке 'test_flow_component'")
     
     test_flow_folder = page.locator(FilePanelLocators.get_treeitem_by_name("test_flow_component"))
     assert test_flow_folder.count() > 0, "Папка 'test_flow_component' не найдена в проекте!"
     print("[INFO] Папка 'test_flow_component' найдена")
     test_flow_folder.click()
-    time.sleep(1)
+    waits.dom_settled()
     print("[INFO] Клик по папке 'test_flow_component' выполнен")
     
     test_split_file = page.locator(FilePanelLocators.get_treeitem_by_name("test_split.df.json"))
     assert test_split_file.count() > 0, "Файл 'test_split.df.json' не найден в проекте!"
     print("[INFO] Файл 'test_split.df.json' найден")
     test_split_file.dblclick()
-    time.sleep(2)
+    waits.network_quiet(["/api/"])
     print("[INFO] Диаграмма 'test_split.df.json' открыта")
     
     canvas = page.locator(CanvasLocators.CANVAS).first
     canvas.wait_for(state="visible", timeout=10000)
-    time.sleep(2)
+    waits.canvas_repaint(canvas)
     print("[INFO] Canvas диаграммы загружен")
     
     try:
@@ -146,7 +101,7 @@ def test_flow_split(login_page, shared_flow_project):
             file_manager_btn = page.get_by_role("button", name="board_toolbar_filemanager_button")
             if file_manager_btn.is_visible():
                 file_manager_btn.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Файловая панель закрыта")
     except Exception as e:
         print(f"[INFO] Файловая панель уже закрыта или не найдена: {e}")
@@ -157,21 +112,21 @@ def test_flow_split(login_page, shared_flow_project):
             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
             if switcher.is_visible():
                 switcher.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт")
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт или не найден: {e}")
     
     save_screenshot(page, f"split_test_steps_1_2_3_complete_{project_code}")
     
-    print("[INFO] Шаг 4: Поиск компонента Input на canvas")
+    step("Шаг 4: Поиск компонента Input на canvas")
     
     canvas_utils = CanvasUtils(page)
     
     if not canvas_utils.find_component_by_title("Input", exact=True):
         raise Exception("Не удалось найти или кликнуть по компоненту Input")
     
-    print("[INFO] Шаг 5: Выбор созданной структуры данных и схемы")
+    step("Шаг 5: Выбор созданной структуры данных и схемы")
     
     if not canvas_utils.select_structure_data("shema_for_split", schema_name):
         save_screenshot(page, f"structure_selection_error_{project_code}")
@@ -179,7 +134,7 @@ def test_flow_split(login_page, shared_flow_project):
     
     save_screenshot(page, f"split_test_steps_4_5_complete_{project_code}")
     
-    print("[INFO] Шаг 6: Закрытие правого сайдбара")
+    step("Шаг 6: Закрытие правого сайдбара")
     
     try:
         details_panel = page.locator(DiagramLocators.DETAILS_PANEL)
@@ -187,19 +142,19 @@ def test_flow_split(login_page, shared_flow_project):
             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
             if switcher.is_visible():
                 switcher.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт")
         else:
             print("[INFO] Правый сайдбар уже закрыт")
     except Exception as e:
         print(f"[INFO] Ошибка при закрытии правого сайдбара: {e}")
     
-    print("[INFO] Шаг 7: Поиск компонента Split на canvas")
+    step("Шаг 7: Поиск компонента Split на canvas")
     
     if not canvas_utils.find_component_by_title("Split", exact=True):
         raise Exception("Не удалось найти или кликнуть по компоненту Split")
     
-    print("[INFO] Шаг 8: Создание условия для компонента Split")
+    step("Шаг 8: Создание условия для компонента Split")
     
     try:
         details_panel = page.locator(DiagramLocators.DETAILS_PANEL)
@@ -209,19 +164,19 @@ def test_flow_split(login_page, shared_flow_project):
         add_button = page.locator('.decision-flow__Button__Content___83B4Z:has-text("Добавить")').first
         if add_button.is_visible():
             add_button.click()
-            time.sleep(2)  # Увеличиваем время ожидания
+            waits.dom_settled(quiet_ms=500)
             print("[INFO] Кнопка 'Добавить' нажата")
         else:
             add_button = page.locator(DiagramLocators.ADD_BUTTON).first
             if add_button.is_visible():
                 add_button.click()
-                time.sleep(2)
+                waits.dom_settled(quiet_ms=500)
                 print("[INFO] Кнопка 'Добавить' найдена через fallback селектор")
             else:
                 add_button = page.locator('button:has-text("Добавить")').first
                 if add_button.is_visible():
                     add_button.click()
-                    time.sleep(2)
+                    waits.dom_settled(quiet_ms=500)
                     print("[INFO] Кнопка 'Добавить' найдена через button селектор")
                 else:
                     raise Exception("Кнопка 'Добавить' не найдена")
@@ -231,10 +186,10 @@ def test_flow_split(login_page, shared_flow_project):
         save_screenshot(page, f"split_condition_error_{project_code}")
         raise
     
-    print("[INFO] Шаг 9: Заполнение полей условия")
+    step("Шаг 9: Заполнение полей условия")
     
     try:
-        time.sleep(1)
+        waits.dom_settled()
         
         name_selectors = [
             'textarea[name="config.patterns.0.name"][aria-label="config.patterns.0.name"]',
@@ -255,9 +210,9 @@ def test_flow_split(login_page, shared_flow_project):
         
         if name_field and name_field.is_visible():
             name_field.click()
-            time.sleep(0.5)
+            waits.dom_settled(quiet_ms=150)
             name_field.fill("condition_name")
-            time.sleep(0.5)
+            waits.dom_settled(quiet_ms=150)
             print("[INFO] Поле name условия заполнено: 'condition_name'")
         else:
             raise Exception("Поле name условия не найдено")
@@ -281,9 +236,9 @@ def test_flow_split(login_page, shared_flow_project):
         
         if expression_field and expression_field.is_visible():
             expression_field.click()
-            time.sleep(0.5)
+            waits.dom_settled(quiet_ms=150)
             expression_field.fill("$node.Input.data.active")
-            time.sleep(0.5)
+            waits.dom_settled(quiet_ms=150)
             print("[INFO] Поле expression заполнено: '$node.Input.data.active'")
         else:
             print("[ERROR] Поле expression не найдено или не видимо")
@@ -294,7 +249,7 @@ def test_flow_split(login_page, shared_flow_project):
         save_screenshot(page, f"split_condition_fields_error_{project_code}")
         raise
     
-    print("[INFO] Шаг 10: Закрытие правого сайдбара после создания условия")
+    step("Шаг 10: Закрытие правого сайдбара после создания условия")
     
     try:
         details_panel = page.locator(DiagramLocators.DETAILS_PANEL)
@@ -302,14 +257,14 @@ def test_flow_split(login_page, shared_flow_project):
             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
             if switcher.is_visible():
                 switcher.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт после создания условия")
         else:
             print("[INFO] Правый сайдбар уже закрыт")
     except Exception as e:
         print(f"[INFO] Ошибка при закрытии правого сайдбара: {e}")
     
-    print("[INFO] Шаг 11: Поиск стрелки, выходящей из Split компонента")
+    step("Шаг 11: Поиск стрелки, выходящей из Split компонента")
     
     if not canvas_utils.find_arrow_by_component("Split"):
         print("[WARN] Не удалось найти стрелку через утилиту, пробуем альтернативные методы")
@@ -317,7 +272,7 @@ def test_flow_split(login_page, shared_flow_project):
     else:
         print("[SUCCESS] Стрелка найдена и обработана через CanvasUtils")
     
-    print("[INFO] Шаг 12: Выбор созданного условия в поле стрелки")
+    step("Шаг 12: Выбор созданного условия в поле стрелки")
     
     try:
         if not canvas_utils.select_condition_in_arrow_field("condition_name"):
@@ -329,9 +284,9 @@ def test_flow_split(login_page, shared_flow_project):
                 condition_field = page.locator(ComponentLocators.DATA_VALUE_FALLBACK)
                 if condition_field.is_visible():
                     condition_field.click()
-                    time.sleep(0.5)
+                    waits.dom_settled(quiet_ms=150)
                     condition_field.fill("condition_name")
-                    time.sleep(0.5)
+                    waits.dom_settled(quiet_ms=150)
                     print("[INFO] Поле условия заполнено напрямую")
                 else:
                     print("[WARN] Поле условия не найдено для прямого заполнения")
@@ -343,19 +298,19 @@ def test_flow_split(login_page, shared_flow_project):
         print(f"[WARN] Ошибка при выборе условия: {e}")
         print("[INFO] Продолжаем выполнение теста без выбора условия")
     
-    print("[INFO] Шаг 13: Переход на вкладку 'Процесс' и подвкладку 'Анализ'")
+    step("Шаг 13: Переход на вкладку 'Процесс' и подвкладку 'Анализ'")
     
     try:
         page.get_by_text("Процесс", exact=True).click()
-        time.sleep(0.3)
+        waits.dom_settled()
         print("[INFO] Переключились на вкладку 'Процесс'")
         
         page.get_by_text("Анализ", exact=True).click()
-        time.sleep(0.3)
+        waits.dom_settled()
         print("[INFO] Переключились на подвкладку 'Анализ'")
         
         page.locator('xpath=/html/body/div[1]/div[2]/div[1]/div[5]/div/div[3]/div[3]/div[2]/div[3]/div/div[1]/div/div[2]/div[1]/button[1]').click()
-        time.sleep(2)  # Пауза после предзаполнения
+        waits.dom_settled(quiet_ms=500)  # Ждем, пока предзаполнение отрисуется
         print("[INFO] Кнопка 'Предзаполнить' нажата")
         
         try:
@@ -367,7 +322,7 @@ def test_flow_split(login_page, shared_flow_project):
     except Exception as e:
         print(f"[WARN] Ошибка при настройке процесса и анализа: {e}")
     
-    print("[INFO] Шаг 14: Запуск диаграммы (первый раз - ожидаем ошибку)")
+    step("Шаг 14: Запуск диаграммы (первый раз - ожидаем ошибку)")
     
     try:
         success = diagram_page.run_diagram()
@@ -406,7 +361,7 @@ def test_flow_split(login_page, shared_flow_project):
         save_screenshot(page, f"diagram_run_error_{project_code}")
         raise
     
-    print("[INFO] Шаг 15: Исправление значения active: false на active: true в поле анализа")
+    step("Шаг 15: Исправление значения active: false на active: true в поле анализа")
     
     try:
         analysis_fields = page.locator('.view-lines.monaco-mouse-cursor-text')
@@ -428,30 +383,30 @@ def test_flow_split(login_page, shared_flow_project):
             print("[WARN] Используем первое доступное поле анализа")
         
         analysis_field.click(force=True)
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         
         page.keyboard.press("Control+F")
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         
         page.keyboard.type('false')
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         
         page.keyboard.press("Enter")
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         
         page.keyboard.press("Escape")
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         
         page.keyboard.press("Control+D")  # Выделить текущее слово
-        time.sleep(0.3)
+        waits.dom_settled(quiet_ms=150)
         
         page.keyboard.type('true')
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         print("[SUCCESS] Значение active изменено с false на true")
         
         page.keyboard.press("Control+S")
-        time.sleep(1)
+        waits.network_quiet(["/api/"])
         print("[INFO] Изменения в поле анализа сохранены")
         
         print("[INFO] Значение active обновлено в структуре данных через поле анализа")
@@ -462,7 +417,7 @@ def test_flow_split(login_page, shared_flow_project):
                 switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
                 if switcher.is_visible():
                     switcher.click()
-                    time.sleep(0.5)
+                    waits.dom_settled()
                     print("[INFO] Правый сайдбар закрыт после изменения структуры")
         except Exception as e:
             print(f"[WARN] Не удалось закрыть правый сайдбар: {e}")
@@ -472,12 +427,12 @@ def test_flow_split(login_page, shared_flow_project):
         save_screenshot(page, f"analysis_field_error_{project_code}")
         raise
     
-    print("[INFO] Шаг 16: Настройка компонента Output2 и запуск диаграммы повторно")
+    step("Шаг 16: Настройка компонента Output2 и запуск диаграммы повторно")
     
     print("[INFO] Подшаг 16.1: Заполнение компонента Output2")
     
     try:
-        time.sleep(2)
+        waits.dom_settled(quiet_ms=500)
         
         try:
             process_tab = page.get_by_text("Процесс", exact=True)
@@ -490,15 +445,15 @@ def test_flow_split(login_page, shared_flow_project):
                             print("[INFO] Уже находимся на вкладке 'Процесс'")
                         else:
                             process_tab.click()
-                            time.sleep(0.5)
+                            waits.dom_settled()
                             print("[INFO] Переключились на вкладку 'Процесс'")
                     else:
                         process_tab.click()
-                        time.sleep(0.5)
+                        waits.dom_settled()
                         print("[INFO] Переключились на вкладку 'Процесс'")
                 except Exception:
                     process_tab.click()
-                    time.sleep(0.5)
+                    waits.dom_settled()
                     print("[INFO] Переключились на вкладку 'Процесс' (fallback)")
             else:
                 print("[WARN] Вкладка 'Процесс' не найдена")
@@ -516,7 +471,7 @@ def test_flow_split(login_page, shared_flow_project):
                     parameters_tab = page.get_by_text("Параметры", exact=True)
                     if parameters_tab.is_visible():
                         parameters_tab.click()
-                        time.sleep(0.5)
+                        waits.dom_settled()
                         print("[INFO] Переключились на вкладку 'Параметры'")
                 except Exception as e:
                     print(f"[WARN] Не удалось переключиться на вкладку 'Параметры': {e}")
@@ -525,9 +480,9 @@ def test_flow_split(login_page, shared_flow_project):
                     data_field = page.get_by_role("textbox", name="inputs_config.data.value")
                     if data_field.is_visible():
                         data_field.click()
-                        time.sleep(0.5)
+                        waits.dom_settled(quiet_ms=150)
                         data_field.fill('{"result" : $node.Split."1"}')
-                        time.sleep(0.5)
+                        waits.dom_settled(quiet_ms=150)
                         print("[INFO] Поле 'data' заполнено: {\"result\" : $node.Split.\"1\"}")
                     else:
                         print("[WARN] Поле 'data' не найдено")
@@ -540,7 +495,7 @@ def test_flow_split(login_page, shared_flow_project):
                         switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
                         if switcher.is_visible():
                             switcher.click()
-                            time.sleep(0.5)
+                            waits.dom_settled()
                             print("[INFO] Правый сайдбар закрыт после настройки Output2")
                 except Exception as e:
                     print(f"[WARN] Не удалось закрыть правый сайдбар: {e}")
@@ -569,7 +524,7 @@ def test_flow_split(login_page, shared_flow_project):
                     "y": box['y'] + box['height'] * 0.5
                 }
                 canvas.click(position=arrow_pos, click_count=2)
-                time.sleep(1)
+                waits.dom_settled()
                 print(f"[INFO] Клик по стрелке для заполнения условия: ({arrow_pos['x']}, {arrow_pos['y']})")
                 
                 details_panel = page.locator(DiagramLocators.DETAILS_PANEL)
@@ -580,7 +535,7 @@ def test_flow_split(login_page, shared_flow_project):
                         parameters_tab = page.get_by_text("Параметры", exact=True)
                         if parameters_tab.is_visible():
                             parameters_tab.click()
-                            time.sleep(0.5)
+                            waits.dom_settled()
                             print("[INFO] Перешли на подвкладку 'Параметры' стрелки")
                         else:
                             print("[WARN] Подвкладка 'Параметры' не найдена")
@@ -609,7 +564,7 @@ def test_flow_split(login_page, shared_flow_project):
                         print("[INFO] Заполняем поле условия")
                         
                         condition_field.click()
-                        time.sleep(1)
+                        waits.dom_settled(quiet_ms=150)
                         print("[INFO] Клик по полю условия выполнен")
                         
                         try:
@@ -632,12 +587,12 @@ def test_flow_split(login_page, shared_flow_project):
                                         condition_option = page.get_by_text("1. condition_name", exact=True)
                                         if condition_option.is_visible():
                                             condition_option.click()
-                                            time.sleep(0.5)
+                                            waits.dom_settled()
                                             print("[SUCCESS] Выбрано условие '1. condition_name'")
                                         else:
                                             first_option = options.first
                                             first_option.click()
-                                            time.sleep(0.5)
+                                            waits.dom_settled()
                                             print("[SUCCESS] Выбрана первая опция")
                                     except Exception as e:
                                         print(f"[WARN] Ошибка при выборе условия: {e}")
@@ -653,7 +608,7 @@ def test_flow_split(login_page, shared_flow_project):
                             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
                             if switcher.is_visible():
                                 switcher.click()
-                                time.sleep(0.5)
+                                waits.dom_settled()
                                 print("[SUCCESS] Сайдбар закрыт")
                         except Exception as e:
                             print(f"[WARN] Не удалось закрыть сайдбар: {e}")
@@ -663,7 +618,7 @@ def test_flow_split(login_page, shared_flow_project):
                             reset_button = page.get_by_role("button", name="diagram_reset_button")
                             if reset_button.is_visible():
                                 reset_button.click()
-                                time.sleep(1)
+                                waits.canvas_repaint()
                                 print("[SUCCESS] Диаграмма сброшена")
                         except Exception as e:
                             print(f"[WARN] Ошибка при сбросе диаграммы: {e}")
@@ -673,7 +628,7 @@ def test_flow_split(login_page, shared_flow_project):
                             play_button = page.get_by_role("button", name="diagram_play_button")
                             if play_button.is_visible():
                                 play_button.click()
-                                time.sleep(1)
+                                waits.network_quiet(["/api/"])
                                 print("[SUCCESS] Диаграмма запущена")
                         except Exception as e:
                             print(f"[WARN] Ошибка при запуске диаграммы: {e}")
@@ -688,7 +643,7 @@ def test_flow_split(login_page, shared_flow_project):
         print(f"[WARN] Ошибка при заполнении условия стрелки: {e}")
     
     try:
-        time.sleep(2)
+        waits.dom_settled(quiet_ms=500)
         
         try:
             process_tab = page.get_by_text("Процесс", exact=True)
@@ -701,15 +656,15 @@ def test_flow_split(login_page, shared_flow_project):
                             print("[INFO] Уже находимся на вкладке 'Процесс'")
                         else:
                             process_tab.click()
-                            time.sleep(0.5)
+                            waits.dom_settled()
                             print("[INFO] Переключились на вкладку 'Процесс'")
                     else:
                         process_tab.click()
-                        time.sleep(0.5)
+                        waits.dom_settled()
                         print("[INFO] Переключились на вкладку 'Процесс'")
                 except Exception:
                     process_tab.click()
-                    time.sleep(0.5)
+                    waits.dom_settled()
                     print("[INFO] Переключились на вкладку 'Процесс' (fallback)")
             else:
                 print("[WARN] Вкладка 'Процесс' не найдена")
@@ -727,7 +682,7 @@ def test_flow_split(login_page, shared_flow_project):
                     parameters_tab = page.get_by_text("Параметры", exact=True)
                     if parameters_tab.is_visible():
                         parameters_tab.click()
-                        time.sleep(0.5)
+                        waits.dom_settled()
                         print("[INFO] Переключились на вкладку 'Параметры'")
                 except Exception as e:
                     print(f"[WARN] Не удалось переключиться на вкладку 'Параметры': {e}")
@@ -736,9 +691,9 @@ def test_flow_split(login_page, shared_flow_project):
                     data_field = page.get_by_role("textbox", name="inputs_config.data.value")
                     if data_field.is_visible():
                         data_field.click()
-                        time.sleep(0.5)
+                        waits.dom_settled(quiet_ms=150)
                         data_field.fill('{"result" : $node.Split."1"}')
-                        time.sleep(1)
+                        waits.dom_settled(quiet_ms=150)
                         print('[INFO] Поле "Данные" заполнено: {"result" : $node.Split."1"}')
                     else:
                         print("[WARN] Поле 'Данные' не найдено")
@@ -751,7 +706,7 @@ def test_flow_split(login_page, shared_flow_project):
                         switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
                         if switcher.is_visible():
                             switcher.click()
-                            time.sleep(0.5)
+                            waits.dom_settled()
                             print("[INFO] Правый сайдбар закрыт после настройки Output2")
                 except Exception as e:
                     print(f"[WARN] Не удалось закрыть правый сайдбар: {e}")
@@ -765,7 +720,7 @@ def test_flow_split(login_page, shared_flow_project):
             reset_btn = page.get_by_role("button", name="diagram_reset_button")
             reset_btn.wait_for(state="visible", timeout=5000)
             reset_btn.click()
-            time.sleep(1)
+            waits.canvas_repaint()
             print("[INFO] Диаграмма сброшена (reset)")
         except Exception as e:
             print(f"[WARN] Не удалось нажать кнопку reset: {e}")
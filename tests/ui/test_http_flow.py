@@ -2,13 +2,14 @@
 Тест для HTTP компонентов с реальной диаграммой
 Input → Http_GET → Http_POST → Http_PUT → Http_PATCH → Http_DEL → Output
 """
-import time
 import json
 import pytest
 from pages.project_page import ProjectPage
 from pages.file_panel_page import FilePanelPage
 from pages.canvas_utils import CanvasUtils
 from pages.diagram_page import DiagramPage
+from pages.steps import step
+from pages.waits import Waits
 from conftest import save_screenshot
 from locators import (
     FilePanelLocators, DiagramLocators, CanvasLocators, 
@@ -48,12 +49,13 @@ def test_http_flow(login_page, shared_flow_project, api_server):
     page = login_page
     project_code = shared_flow_project
     project_page = ProjectPage(page)
+    waits = Waits(page)
 
     print(f"[INFO] Запуск теста HTTP Flow Sequence в проекте: {project_code}")
     print(f"[INFO] API server URL: {api_server['base_url']}")
 
     assert project_page.goto_project(project_code), f"Переход в проект {project_code} не удался!"
-    time.sleep(2)
+    waits.network_quiet(["/api/"])
 
     file_panel = FilePanelPage(page)
     diagram_page = DiagramPage(page)
@@ -64,15 +66,15 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         is_open = False
     if not is_open:
         file_panel.open_file_panel()
-        time.sleep(0.5)
+        waits.dom_settled()
     print("[INFO] Файловая панель открыта")
 
-    print("[INFO] Шаг 1: Открытие диаграммы")
+    step("Шаг 1: Открытие диаграммы")
 
     test_flow_folder = page.locator(FilePanelLocators.get_treeitem_by_name("test_flow_component"))
     assert test_flow_folder.count() > 0, "Папка 'test_flow_component' не найдена!"
     test_flow_folder.click()
-    time.sleep(1)
+    waits.dom_settled()
 
     diagram_files = [
         'test_http.df.json',
@@ -90,12 +92,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
     
     assert diagram_file is not None, f"Диаграмма не найдена! Искали: {diagram_files}"
     diagram_file.dblclick()
-    time.sleep(2)
+    waits.network_quiet(["/api/"])
     print("[INFO] Диаграмма открыта")
 
     canvas = page.locator(CanvasLocators.CANVAS).first
     canvas.wait_for(state="visible", timeout=10000)
-    time.sleep(2)
+    waits.canvas_repaint(canvas)
     print("[INFO] Canvas диаграммы загружен")
 
     print("[INFO] Закрытие панелей")
@@ -103,7 +105,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
 
     canvas_utils = CanvasUtils(page)
 
-    print("[INFO] Шаг 2: Настройка Http_GET компонента")
+    step("Шаг 2: Настройка Http_GET компонента")
     
     http_get_found = canvas_utils.find_component_by_title("Http_GET", timeout=10000)
     assert http_get_found, "Компонент 'Http_GET' не найден на канвасе!"
@@ -120,7 +122,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
     assert url_field.count() > 0, "Поле 'URL' не найдено!"
     get_url = f'"{api_server["users_endpoint"]}/2?_limit=1&_fields=id,name,email"'
     url_field.fill(get_url)
-    time.sleep(1)
+    waits.dom_settled(quiet_ms=150)
     print(f"[INFO] Http_GET URL настроен: {get_url}")
 
     try:
@@ -130,12 +132,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         
         if method_field.count() > 0:
             method_field.click()
-            time.sleep(1)
+            waits.dom_settled(quiet_ms=150)
             
             get_option = page.get_by_role("treeitem", name="GET").locator("div").nth(1)
             if get_option.count() > 0:
                 get_option.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Http_GET метод настроен: GET")
             else:
                 print("[WARN] Опция GET не найдена в dropdown")
@@ -147,12 +149,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
             if switcher.is_visible():
                 switcher.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт после настройки Http_GET")
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт: {e}")
 
-    print("[INFO] Шаг 3: Настройка Http_POST компонента")
+    step("Шаг 3: Настройка Http_POST компонента")
     
     http_post_found = canvas_utils.find_component_by_title("Http_POST", timeout=10000)
     assert http_post_found, "Компонент 'Http_POST' не найден на канвасе!"
@@ -167,7 +169,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
     
     post_url = f'"{api_server["users_endpoint"]}?_fields=id,name,email"'
     url_field.fill(post_url)
-    time.sleep(1)
+    waits.dom_settled(quiet_ms=150)
     print(f"[INFO] Http_POST URL настроен: {post_url}")
 
     try:
@@ -177,12 +179,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         
         if method_field.count() > 0:
             method_field.click()
-            time.sleep(1)
+            waits.dom_settled(quiet_ms=150)
             
             post_option = page.get_by_role("treeitem", name="POST").locator("div").nth(1)
             if post_option.count() > 0:
                 post_option.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Http_POST метод настроен: POST")
             else:
                 print("[WARN] Опция POST не найдена в dropdown")
@@ -191,56 +193,56 @@ def test_http_flow(login_page, shared_flow_project, api_server):
 
     try:
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.0.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.0.name").fill("\"Content-Type\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.0.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.0.value").fill("\"application/json\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.1.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.1.name").fill("\"Accept\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.1.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.1.value").fill("\"application/json\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.2.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.2.name").fill("\"Accept-Encoding\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.2.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.2.value").fill("\"gzip\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.3.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.3.name").fill("\"X-Requested-With\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.3.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.3.value").fill("\"XMLHttpRequest\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         print("[INFO] Http_POST заголовки настроены: Content-Type, Accept, Accept-Encoding, X-Requested-With")
     except Exception as e:
@@ -254,7 +256,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         if body_field.count() > 0:
             post_body = '{"name": "Test User", "username": "testuser", "email": "test@example.com"}'
             body_field.fill(post_body)
-            time.sleep(1)
+            waits.dom_settled(quiet_ms=150)
             print(f"[INFO] Http_POST тело запроса настроено: {post_body}")
     except Exception as e:
         print(f"[INFO] Поле тела запроса не найдено: {e}")
@@ -264,12 +266,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
             if switcher.is_visible():
                 switcher.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт после настройки Http_POST")
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт: {e}")
 
-    print("[INFO] Шаг 4: Настройка Http_PUT компонента")
+    step("Шаг 4: Настройка Http_PUT компонента")
     
     http_put_found = canvas_utils.find_component_by_title("Http_PUT", timeout=10000)
     assert http_put_found, "Компонент 'Http_PUT' не найден на канвасе!"
@@ -284,7 +286,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
     
     put_url = f'"{api_server["users_endpoint"]}/2?_fields=id,name,email"'
     url_field.fill(put_url)
-    time.sleep(1)
+    waits.dom_settled(quiet_ms=150)
     print(f"[INFO] Http_PUT URL настроен: {put_url}")
 
     try:
@@ -294,12 +296,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         
         if method_field.count() > 0:
             method_field.click()
-            time.sleep(1)
+            waits.dom_settled(quiet_ms=150)
             
             put_option = page.get_by_role("treeitem", name="PUT").locator("div").nth(1)
             if put_option.count() > 0:
                 put_option.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Http_PUT метод настроен: PUT")
             else:
                 print("[WARN] Опция PUT не найдена в dropdown")
@@ -308,43 +310,43 @@ def test_http_flow(login_page, shared_flow_project, api_server):
 
     try:
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.0.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.0.name").fill("\"Content-Type\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.0.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.0.value").fill("\"application/json\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.1.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.1.name").fill("\"Accept\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.1.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.1.value").fill("\"application/json\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.2.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.2.name").fill("\"X-Requested-With\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.2.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.2.value").fill("\"XMLHttpRequest\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         print("[INFO] Http_PUT заголовки настроены: Content-Type, Accept, X-Requested-With")
     except Exception as e:
@@ -358,7 +360,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         if body_field.count() > 0:
             put_body = '{"name": "Updated User", "username": "updateduser", "email": "updated@example.com"}'
             body_field.fill(put_body)
-            time.sleep(1)
+            waits.dom_settled(quiet_ms=150)
             print(f"[INFO] Http_PUT тело запроса настроено: {put_body}")
     except Exception as e:
         print(f"[INFO] Поле тела запроса не найдено: {e}")
@@ -368,12 +370,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
             if switcher.is_visible():
                 switcher.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт после настройки Http_PUT")
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт: {e}")
 
-    print("[INFO] Шаг 5: Настройка Http_PATCH компонента")
+    step("Шаг 5: Настройка Http_PATCH компонента")
     
     http_patch_found = canvas_utils.find_component_by_title("Http_PATCH", timeout=10000)
     assert http_patch_found, "Компонент 'Http_PATCH' не найден на канвасе!"
@@ -388,7 +390,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
     
     patch_url = f'"{api_server["users_endpoint"]}/2?_fields=id,name,email"'
     url_field.fill(patch_url)
-    time.sleep(1)
+    waits.dom_settled(quiet_ms=150)
     print(f"[INFO] Http_PATCH URL настроен: {patch_url}")
 
     try:
@@ -398,12 +400,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         
         if method_field.count() > 0:
             method_field.click()
-            time.sleep(1)
+            waits.dom_settled(quiet_ms=150)
             
             patch_option = page.get_by_role("treeitem", name="PATCH").locator("div").nth(1)
             if patch_option.count() > 0:
                 patch_option.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Http_PATCH метод настроен: PATCH")
             else:
                 print("[WARN] Опция PATCH не найдена в dropdown")
@@ -412,43 +414,43 @@ def test_http_flow(login_page, shared_flow_project, api_server):
 
     try:
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.0.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.0.name").fill("\"Content-Type\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.0.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.0.value").fill("\"application/json\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.1.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.1.name").fill("\"Accept\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.1.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.1.value").fill("\"application/json\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("button", name="extendable_list_add_button").click()
-        time.sleep(1)
+        waits.dom_settled()
         
         page.get_by_role("textbox", name="inputs_config.headers.value.2.name").click()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.2.name").fill("\"X-Requested-With\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         page.get_by_role("textbox", name="inputs_config.headers.value.2.value").dblclick()
-        time.sleep(0.5)
+        waits.dom_settled(quiet_ms=150)
         page.get_by_role("textbox", name="inputs_config.headers.value.2.value").fill("\"XMLHttpRequest\"")
-        time.sleep(1)
+        waits.dom_settled(quiet_ms=150)
         
         print("[INFO] Http_PATCH заголовки настроены: Content-Type, Accept, X-Requested-With")
     except Exception as e:
@@ -462,7 +464,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         if body_field.count() > 0:
             patch_body = '{"email": "patched@example.com"}'
             body_field.fill(patch_body)
-            time.sleep(1)
+            waits.dom_settled(quiet_ms=150)
             print(f"[INFO] Http_PATCH тело запроса настроено: {patch_body}")
     except Exception as e:
         print(f"[INFO] Поле тела запроса не найдено: {e}")
@@ -472,12 +474,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
             if switcher.is_visible():
                 switcher.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт после настройки Http_PATCH")
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт: {e}")
 
-    print("[INFO] Шаг 6: Настройка Http_DEL компонента")
+    step("Шаг 6: Настройка Http_DEL компонента")
     
     http_del_found = canvas_utils.find_component_by_title("Http_DEL", timeout=10000)
     assert http_del_found, "Компонент 'Http_DEL' не найден на канвасе!"
@@ -492,7 +494,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
     
     del_url = f'"{api_server["users_endpoint"]}/2?_fields=id"'
     url_field.fill(del_url)
-    time.sleep(1)
+    waits.dom_settled(quiet_ms=150)
     print(f"[INFO] Http_DEL URL настроен: {del_url}")
 
     try:
@@ -502,12 +504,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         
         if method_field.count() > 0:
             method_field.click()
-            time.sleep(1)
+            waits.dom_settled(quiet_ms=150)
             
             delete_option = page.get_by_role("treeitem", name="DELETE").locator("div").nth(1)
             if delete_option.count() > 0:
                 delete_option.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Http_DEL метод настроен: DELETE")
             else:
                 print("[WARN] Опция DELETE не найдена в dropdown")
@@ -520,12 +522,12 @@ def test_http_flow(login_page, shared_flow_project, api_server):
             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
             if switcher.is_visible():
                 switcher.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт после настройки Http_DEL")
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт: {e}")
 
-    print("[INFO] Шаг 7: Настройка Output компонента для сбора всех HTTP ответов")
+    step("Шаг 7: Настройка Output компонента для сбора всех HTTP ответов")
     
     output_found = canvas_utils.find_component_by_title("Output", timeout=10000)
     assert output_found, "Компонент 'Output' не найден на канвасе!"
@@ -539,13 +541,13 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         expression_button = page.get_by_role("button", name="textfield_expression_button")
         if expression_button.count() > 0:
             expression_button.click()
-            time.sleep(1)
+            waits.dom_settled()
             print("[INFO] Кнопка раскрытия поля 'Данные' нажата")
         else:
             expression_button = page.locator(ComponentLocators.HTTP_EXPRESSION_BUTTON)
             if expression_button.count() > 0:
                 expression_button.first.click()
-                time.sleep(1)
+                waits.dom_settled()
                 print("[INFO] Кнопка раскрытия поля 'Данные' найдена через альтернативный селектор")
             else:
                 print("[WARN] Кнопка раскрытия поля 'Данные' не найдена")
@@ -568,7 +570,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
             all_responses_json = '''{"Get": $node.Http_GET.response.body,"Post": $node.Http_POST.response.body,"Put": $node.Http_PUT.response.body,"Patch": $node.Http_PATCH.response.body,"Delete": $node.Http_DEL.response.body,"summary": {"total_requests": 5,"methods": ["GET", "POST", "PUT", "PATCH", "DELETE"],"api_url": "''' + api_server["base_url"] + '''"}}'''
             
             editor_field.fill(all_responses_json)
-            time.sleep(1)
+            waits.dom_settled(quiet_ms=150)
             print("[INFO] JSON со всеми HTTP ответами введен в редактор")
             print(f"[INFO] JSON содержит ответы от всех 5 HTTP методов")
         else:
@@ -580,17 +582,17 @@ def test_http_flow(login_page, shared_flow_project, api_server):
         save_button = page.get_by_role("button", name="expressioneditor_submit_button")
         if save_button.count() > 0:
             save_button.click()
-            time.sleep(1)
+            waits.dom_settled()
             print("[INFO] Модальное окно закрыто с сохранением через expressioneditor_submit_button")
         else:
             save_button = page.locator('button:has-text("Сохранить"), button:has-text("Save"), button:has-text("OK")')
             if save_button.count() > 0:
                 save_button.first.click()
-                time.sleep(1)
+                waits.dom_settled()
                 print("[INFO] Модальное окно закрыто с сохранением через fallback")
             else:
                 page.keyboard.press("Escape")
-                time.sleep(1)
+                waits.dom_settled()
                 print("[INFO] Модальное окно закрыто через Escape")
     except Exception as e:
         print(f"[WARN] Ошибка при закрытии модального окна: {e}")
@@ -600,23 +602,23 @@ def test_http_flow(login_page, shared_flow_project, api_server):
             switcher = page.get_by_role("button", name="diagram_details_panel_switcher")
             if switcher.is_visible():
                 switcher.click()
-                time.sleep(0.5)
+                waits.dom_settled()
                 print("[INFO] Правый сайдбар закрыт после настройки Output")
     except Exception as e:
         print(f"[INFO] Правый сайдбар уже закрыт: {e}")
 
-    print("[INFO] Шаг 8: Запуск диаграммы")
+    step("Шаг 8: Запуск диаграммы")
 
     success = diagram_page.run_diagram_and_wait(completion_timeout=60000)
     
     assert success, "Диаграмма не выполнилась успешно!"
     print("[INFO] Диаграмма завершилась успешно!")
 
-    print("[INFO] Шаг 9: Проверка результатов в Output компоненте")
+    step("Шаг 9: Проверка результатов в Output компоненте")
 
     canvas = page.locator(CanvasLocators.CANVAS).first
     canvas.dblclick(force=True)
-    time.sleep(1)
+    waits.dom_settled()
     print("[INFO] Двойной клик по канвасу выполнен")
 
     details_panel = page.locator(DiagramLocators.DETAILS_PANEL)
@@ -626,20 +628,20 @@ def test_http_flow(login_page, shared_flow_project, api_server):
     process_tab = page.get_by_text("Процесс", exact=True)
     assert process_tab.is_visible(), "Вкладка 'Процесс' не найдена!"
     process_tab.click()
-    time.sleep(1)
+    waits.dom_settled()
     print("[INFO] Переход на вкладку 'Процесс' выполнен")
 
     analysis_tab = page.get_by_text("Анализ", exact=True)
     assert analysis_tab.is_visible(), "Подвкладка 'Анализ' не найдена!"
     analysis_tab.click()
-    time.sleep(1)
+    waits.dom_settled()
     print("[INFO] Переход на подвкладку 'Анализ' выполнен")
 
     try:
         full_view_button = page.get_by_role("button", name="formitem_full_view_button").nth(1)
         if full_view_button.count() > 0:
             full_view_button.click()
-            time.sleep(1)
+            waits.dom_settled()
             print("[INFO] Кнопка 'formitem_full_view_button' (nth(1)) нажата")
 
             json_modal = page.locator(ModalLocators.JSON_MODAL)
@@ -648,7 +650,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
             
             save_screenshot(page, f"http_all_responses_{project_code}")
             
-            time.sleep(3)
+            waits.dom_settled(ModalLocators.JSON_MODAL_VIEW_LINES, quiet_ms=500)
 
             view_lines = page.locator(ModalLocators.JSON_MODAL_VIEW_LINES)
             assert view_lines.count() > 0, "Monaco Editor не найден в модальном окне!"
@@ -702,7 +704,7 @@ def test_http_flow(login_page, shared_flow_project, api_server):
             close_button = page.locator(ModalLocators.MODAL_CLOSE_BUTTON)
             if close_button.count() > 0:
                 close_button.first.click()
-                time.sleep(1)
+                waits.dom_settled()
                 print("[INFO] Модальное окно закрыто")
         else:
             print("[WARN] Кнопка 'formitem_full_view_button' не найдена")
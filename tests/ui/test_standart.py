@@ -5,6 +5,7 @@ from pages.file_panel_page import FilePanelPage
 from pages.data_struct_page import DataStructPage
 from pages.canvas_utils import CanvasUtils
 from pages.diagram_page import DiagramPage
+from pages.steps import step
 from conftest import save_screenshot, get_project_by_code, delete_project_by_id
 from locators import (
     FilePanelLocators, DiagramLocators, CanvasLocators, 
@@ -177,7 +178,7 @@ def test_flow_standart(login_page, shared_flow_project):
         except Exception:
             print("[WARN] Диаграмма может быть не загружена")
 
-    print("[INFO] Шаг 6: Поиск и клик по компоненту Input")
+    step("Шаг 6: Поиск и клик по компоненту Input")
     
     canvas_utils = CanvasUtils(page)
     
@@ -208,7 +209,7 @@ def test_flow_standart(login_page, shared_flow_project):
     except Exception as e:
         print(f"[WARN] Ошибка при настройке процесса и анализа: {e}")
     
-    print("[INFO] Шаг 7: Поиск и клик по компоненту Output")
+    step("Шаг 7: Поиск и клик по компоненту Output")
     
     if not canvas_utils.find_component_by_title("Output", exact=True):
         print("[WARN] Не удалось найти компонент Output через точный поиск, пробуем альтернативные методы")
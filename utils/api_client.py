@@ -0,0 +1,173 @@
+"""
+Общий API-клиент для conftest.py, utils/clear_projects.py и API-тестов
+
+Один requests.Session с пулом соединений на процесс: вход через
+/api/auth/sign_in выполняется один раз, кука переиспользуется и обновляется
+только при ответе 401. Сетевые ошибки и 502/503/504 повторяются с backoff.
+
+    from utils.api_client import get_api_client
+    client = get_api_client()
+    projects = client.list_projects()
+"""
+import os
+import threading
+import time
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Отключаем предупреждения о небезопасных запросах
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+SIGN_IN_PATH = "/api/auth/sign_in"
+PROJECTS_PATH = "/api/projects"
+
+
+class ApiClient:
+    """Авторизованный клиент API с пулом соединений"""
+
+    def __init__(self, base_url=None, email=None, password=None,
+                 pool_size=16, retries=3, backoff=0.5, timeout=30, verify=False):
+        self.base_url = (base_url or os.getenv("BASE_URL", "http://localhost:3333")).rstrip("/")
+        self.email = email if email is not None else os.getenv("LOGIN")
+        self.password = password if password is not None else os.getenv("PASSWORD")
+        self.timeout = timeout
+        self.verify = verify
+        self._login_lock = threading.Lock()
+        self._logged_in = False
+        # Номер входа: растёт после каждого успешного sign_in
+        self._login_generation = 0
+
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            # POST (вход, создание проекта) не повторяем: он не идемпотентен
+            allowed_methods=frozenset({"GET", "HEAD", "DELETE", "PUT", "OPTIONS"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        return path if path.startswith("http") else f"{self.base_url}{path}"
+
+    def login(self):
+        """Вход через API; кука авторизации остаётся в сессии"""
+        with self._login_lock:
+            self._login()
+
+    def _login(self):
+        self.session.cookies.clear()
+        resp = self.session.post(
+            self.url(SIGN_IN_PATH),
+            json={"email": self.email, "password": self.password},
+            verify=self.verify,
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        self._logged_in = True
+        self._login_generation += 1
+
+    def _ensure_login(self):
+        if self._logged_in:
+            return
+        with self._login_lock:
+            if not self._logged_in:
+                self._login()
+
+    def _relogin(self, generation):
+        """
+        Повторный вход после 401, только если с отправки запроса (generation)
+        никто не вошёл заново: параллельные потоки не сбрасывают куки друг другу
+        """
+        with self._login_lock:
+            if self._login_generation == generation:
+                self._login()
+
+    def auth_cookies(self):
+        """Куки авторизованной сессии (для кода, который ходит в API сам)"""
+        self._ensure_login()
+        return self.session.cookies
+
+    def request(self, method, path, **kwargs):
+        """Запрос с авторизацией; при 401 — повторный вход и один повтор"""
+        self._ensure_login()
+        kwargs.setdefault("verify", self.verify)
+        kwargs.setdefault("timeout", self.timeout)
+        generation = self._login_generation
+        resp = self.session.request(method, self.url(path), **kwargs)
+        if resp.status_code == 401:
+            self._relogin(generation)
+            resp = self.session.request(method, self.url(path), **kwargs)
+        return resp
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    # --- проекты ---
+
+    def list_projects(self):
+        resp = self.get(PROJECTS_PATH)
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_project_by_code(self, code):
+        for prj in self.list_projects():
+            if prj.get("code") == code:
+                return prj
+        return None
+
+    def delete_project(self, project_id):
+        resp = self.delete(f"{PROJECTS_PATH}/{project_id}")
+        resp.raise_for_status()
+        return resp.status_code == 204
+
+    def create_project(self, title, code, git, default_branch="main"):
+        """Создать проект (те же поля, что в модальном окне); описание проекта или None"""
+        payload = {"title": title, "code": code, "git": git, "default_branch": default_branch}
+        resp = self.post(PROJECTS_PATH, json=payload)
+        resp.raise_for_status()
+        try:
+            prj = resp.json()
+        except ValueError:
+            return None
+        return prj if isinstance(prj, dict) and prj.get("id") else None
+
+    def wait_for_project(self, code, timeout=30):
+        """Ждать появления проекта code в списке проектов"""
+        deadline = time.monotonic() + timeout
+        while True:
+            prj = self.get_project_by_code(code)
+            if prj:
+                return prj
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Проект {code} не появился за {timeout}с")
+            time.sleep(0.5)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_api_client():
+    """Клиент для текущих BASE_URL/LOGIN (один на процесс)"""
+    key = (os.getenv("BASE_URL", "http://localhost:3333").rstrip("/"), os.getenv("LOGIN"))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = ApiClient(base_url=key[0])
+        return client
@@ -0,0 +1,193 @@
+"""
+Локальный кеш статики фронтенда (JS-бандлы, воркеры Monaco, CSS, шрифты, картинки)
+
+Каждый новый контекст браузера заново скачивает SPA со стенда. AssetCache
+вешает на контекст context.route только для статики хоста BASE_URL:
+первый запрос уходит в сеть, ответ сохраняется на диск, последующие
+загрузки страниц (ProjectPage.goto, LoginPage.goto, ...) получают его
+через route.fulfill без обращения к стенду.
+
+Содержимое хранится по sha256 (blobs/<hash>), index.json сопоставляет
+URL -> хеш и content-type. Кеш привязан к build id фронтенда — хешу ссылок
+на скрипты/стили в index.html (или ASSET_BUILD_ID): после выкладки новой
+сборки индекс сбрасывается.
+
+Каталог — .cache/assets/<хост> (ASSET_CACHE_DIR), отключение — ASSET_CACHE=0
+или pytest --no-asset-cache.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from utils.api_client import get_api_client
+
+ASSET_CACHE_DIR = Path(os.getenv("ASSET_CACHE_DIR", Path(__file__).parent.parent / ".cache" / "assets"))
+
+STATIC_EXTENSIONS = (
+    ".js", ".mjs", ".css", ".map", ".wasm",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico",
+)
+
+# Пути, которые никогда не кешируются, даже с "статическим" расширением
+EXCLUDED_PREFIXES = ("/api/",)
+
+_ASSET_REF = re.compile(r'<(?:script|link)\b[^>]*?(?:src|href)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
+
+def env_enabled():
+    return os.getenv("ASSET_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def build_id_from_html(html):
+    """Build id сборки: хеш ссылок на скрипты и стили в index.html (или всего документа)"""
+    refs = sorted(set(_ASSET_REF.findall(html)))
+    source = "\n".join(refs) if refs else html
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def fetch_build_id(base_url, timeout=10):
+    """Build id фронтенда на base_url; None, если стенд не ответил"""
+    override = os.getenv("ASSET_BUILD_ID")
+    if override:
+        return override
+    client = get_api_client()
+    try:
+        resp = client.session.get(f"{base_url.rstrip('/')}/", verify=client.verify, timeout=timeout)
+        resp.raise_for_status()
+    except Exception as e:
+        print(f"[WARNING] Кеш статики отключён: не удалось получить index.html ({e})")
+        return None
+    return build_id_from_html(resp.text)
+
+
+class AssetCache:
+    """Кеш статики одного хоста; один экземпляр на процесс pytest"""
+
+    def __init__(self, base_url, build_id, cache_dir=ASSET_CACHE_DIR):
+        parts = urlsplit(base_url)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.build_id = build_id
+        self.root = Path(cache_dir) / re.sub(r"[^\w.-]", "_", parts.netloc)
+        self.blobs = self.root / "blobs"
+        self.index_file = self.root / "index.json"
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_host(cls, base_url=None):
+        """Кеш для BASE_URL с актуальным build id; None, если кеш выключен или build id неизвестен"""
+        base_url = base_url or os.getenv("BASE_URL")
+        if not base_url or not env_enabled():
+            return None
+        build_id = fetch_build_id(base_url)
+        if build_id is None:
+            return None
+        return cls(base_url, build_id)
+
+    def _load(self):
+        try:
+            index = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            index = {}
+        if index.get("build_id") == self.build_id:
+            self.entries = index.get("entries", {})
+            return
+        if index:
+            print(f"[INFO] Сборка фронтенда изменилась ({index.get('build_id')} -> {self.build_id}), кеш статики сброшен")
+            shutil.rmtree(self.blobs, ignore_errors=True)
+        self.entries = {}
+        self._dirty = True
+
+    def save(self):
+        """Записать index.json (атомарно, с объединением записей других воркеров той же сборки)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self.entries)
+            self._dirty = False
+        try:
+            current = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            current = {}
+        if current.get("build_id") == self.build_id:
+            entries = {**current.get("entries", {}), **entries}
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_name(f"{self.index_file.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"build_id": self.build_id, "entries": entries}, indent=1), encoding="utf-8")
+        os.replace(tmp, self.index_file)
+
+    def is_cacheable(self, url):
+        parts = urlsplit(url)
+        if f"{parts.scheme}://{parts.netloc}" != self.origin:
+            return False
+        if parts.path.startswith(EXCLUDED_PREFIXES):
+            return False
+        return parts.path.lower().endswith(STATIC_EXTENSIONS)
+
+    def _blob(self, digest):
+        return self.blobs / digest[:2] / digest
+
+    def _store(self, url, body, content_type):
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self._blob(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, blob)
+        with self._lock:
+            self.entries[url] = {"sha256": digest, "content_type": content_type}
+            self._dirty = True
+
+    def _cached(self, url):
+        entry = self.entries.get(url)
+        if not entry:
+            return None
+        try:
+            return entry, self._blob(entry["sha256"]).read_bytes()
+        except OSError:
+            return None
+
+    def _handle(self, route):
+        request = route.request
+        if request.method != "GET":
+            route.fallback()
+            return
+        cached = self._cached(request.url)
+        if cached:
+            entry, body = cached
+            self.hits += 1
+            route.fulfill(
+                status=200,
+                body=body,
+                headers={"content-type": entry["content_type"]},
+            )
+            return
+        try:
+            response = route.fetch()
+        except Exception:
+            # Сеть или контекст закрыт — отдаём запрос браузеру как есть
+            route.fallback()
+            return
+        self.misses += 1
+        if response.status == 200:
+            content_type = response.headers.get("content-type", "application/octet-stream")
+            self._store(request.url, response.body(), content_type)
+        route.fulfill(response=response)
+
+    def attach(self, context):
+        """Перехват статики хоста в контексте браузера"""
+        context.route(self.is_cacheable, self._handle)
+
+    def summary(self):
+        return f"кеш статики {self.root.name}: из кеша {self.hits}, из сети {self.misses}, файлов {len(self.entries)}"
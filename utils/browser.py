@@ -0,0 +1,108 @@
+"""
+Запуск Chromium для UI-тестов и утилит: единые настройки и пул браузеров
+
+По умолчанию браузер запускается без окна (headless). Окно для отладки —
+флаг pytest --headed или переменная окружения HEADED=1; SLOW_MO=<мс>
+замедляет действия.
+
+BrowserPool держит несколько уже запущенных браузеров, тесты берут из них
+контексты (lease/release); упавший браузер перезапускается при следующей
+выдаче, так что запуск Chromium оплачивается несколько раз за сессию,
+а не на каждый тест. on_new_context вызывается для каждого выданного
+контекста (например, AssetCache.attach).
+"""
+import os
+import threading
+
+
+def env_headed():
+    return os.getenv("HEADED", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def launch_options(headed=None):
+    """Параметры chromium.launch: headless, если не запрошено окно"""
+    if headed is None:
+        headed = env_headed()
+    options = {"headless": not headed}
+    slow_mo = int(os.getenv("SLOW_MO", "0") or 0)
+    if slow_mo:
+        options["slow_mo"] = slow_mo
+    return options
+
+
+def launch_browser(playwright, headed=None):
+    return playwright.chromium.launch(**launch_options(headed))
+
+
+class BrowserPool:
+    """Пул запущенных браузеров, из которых выдаются контексты"""
+
+    def __init__(self, playwright, size=1, headed=None, on_new_context=None):
+        self.playwright = playwright
+        self.size = max(1, size)
+        self.headed = headed
+        self.on_new_context = on_new_context
+        self._browsers = []
+        self._leases = {}  # context -> browser
+        self._lock = threading.Lock()
+        self.launches = 0
+
+    def _launch(self):
+        self.launches += 1
+        return launch_browser(self.playwright, self.headed)
+
+    def _pick(self):
+        """Браузер с наименьшим числом выданных контекстов; упавшие заменяются"""
+        self._browsers = [b for b in self._browsers if b.is_connected()]
+        if len(self._browsers) < self.size:
+            browser = self._launch()
+            self._browsers.append(browser)
+            return browser
+        load = {id(b): 0 for b in self._browsers}
+        for browser in self._leases.values():
+            if id(browser) in load:
+                load[id(browser)] += 1
+        return min(self._browsers, key=lambda b: load[id(b)])
+
+    def warm(self):
+        """Сразу запустить все браузеры пула"""
+        with self._lock:
+            self._browsers = [b for b in self._browsers if b.is_connected()]
+            while len(self._browsers) < self.size:
+                self._browsers.append(self._launch())
+
+    @property
+    def browser(self):
+        """Любой живой браузер пула (для служебных контекстов, например логина)"""
+        with self._lock:
+            return self._pick()
+
+    def lease(self, **context_options):
+        """Новый контекст в наименее загруженном браузере"""
+        with self._lock:
+            browser = self._pick()
+        context = browser.new_context(**context_options)
+        if self.on_new_context:
+            self.on_new_context(context)
+        with self._lock:
+            self._leases[context] = browser
+        return context
+
+    def release(self, context):
+        with self._lock:
+            self._leases.pop(context, None)
+        try:
+            context.close()
+        except Exception:
+            # Браузер мог упасть вместе с контекстом — его заменит _pick
+            pass
+
+    def close(self):
+        with self._lock:
+            browsers, self._browsers = self._browsers, []
+            self._leases.clear()
+        for browser in browsers:
+            try:
+                browser.close()
+            except Exception:
+                pass
@@ -1,121 +1,152 @@
 import os
+import sys
 import time
 from pathlib import Path
 from dotenv import load_dotenv
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
-import urllib3
 
 # Загружаем переменные окружения из .env файла
+# (run_tests.py с несколькими хостами передаёт окружение процессу напрямую — тогда .env не читаем)
 env_path = Path(__file__).parent / ".env"
-load_dotenv(dotenv_path=env_path, override=True)
+if not os.getenv("TESTS_ENV_INJECTED"):
+    load_dotenv(dotenv_path=env_path, override=True)
 
-# Отключаем предупреждения о небезопасных запросах
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-API_BASE_URL = os.getenv("BASE_URL", "http://localhost:3333").rstrip("/")
-PROJECTS_API = f"{API_BASE_URL}/api/projects"
-
-def get_auth_cookies():
-    """
-    Получить куки авторизации через API логин
-    """
-    email = os.getenv("LOGIN")
-    password = os.getenv("PASSWORD")
-    resp = requests.post(f"{API_BASE_URL}/api/auth/sign_in", json={"email": email, "password": password}, verify=False)
-    resp.raise_for_status()
-    return resp.cookies
+# Корень репозитория — для utils.api_client и pages при запуске как скрипта
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.api_client import get_api_client  # noqa: E402
+from utils.browser import launch_browser  # noqa: E402
 
 def get_all_projects():
     """
     Получить все проекты через API
     """
-    cookies = get_auth_cookies()
-    resp = requests.get(PROJECTS_API, cookies=cookies, verify=False)
-    resp.raise_for_status()
-    return resp.json()
+    return get_api_client().list_projects()
 
 def delete_project_by_id(project_id):
     """
     Удалить проект по ID через API
     """
-    cookies = get_auth_cookies()
-    resp = requests.delete(f"{PROJECTS_API}/{project_id}", cookies=cookies, verify=False)
-    resp.raise_for_status()
-    return resp.status_code == 204
+    return get_api_client().delete_project(project_id)
 
-def clear_autotest_projects():
+def is_autotest_project(project):
+    """
+    Проект создан автотестами (по коду или заголовку)
     """
-    Удаляет все проекты, созданные автотестами
+    project_code = project.get("code", "")
+    project_title = project.get("title", "")
+    return (
+        project_code.startswith("autotest_flow_") or
+        project_code.startswith("autotest_seed_") or
+        project_code.startswith("test_flow_component_") or
+        project_title.startswith("Автотест Flow") or
+        project_title.startswith("Test Flow Project") or
+        "autotest" in project_code.lower() or
+        "test_flow" in project_code.lower()
+    )
+
+# Сетевые ошибки и 502/503/504 уже повторяет urllib3 Retry в ApiClient;
+# здесь повторяем только то, что он не трогает
+RETRY_STATUSES = (429, 500)
+
+
+def _is_transient(error):
+    """Ошибка, после которой удаление имеет смысл повторить (поверх повторов ApiClient)"""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRY_STATUSES
+    return False
+
+def delete_project_with_retry(project, retries=3, backoff=0.5):
     """
+    Удаляет проект, повторяя 429/500 с нарастающей паузой
+    (сеть и 502-504 повторяет сам ApiClient)
+
+    Returns:
+        tuple: (True, "") если проект удален (или его уже нет — 404), иначе (False, описание ошибки)
+    """
+    project_id = project.get("id")
+    if not project_id:
+        return False, "отсутствует ID"
+    attempt = 0
+    while True:
+        try:
+            if delete_project_by_id(project_id):
+                return True, ""
+            return False, "API вернул ошибку"
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return True, ""
+            error = e
+        except Exception as e:
+            error = e
+        if attempt >= retries or not _is_transient(error):
+            detail = ""
+            if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+                detail = f" (status {error.response.status_code}: {error.response.text[:200]})"
+            return False, f"{error}{detail}"
+        time.sleep(backoff * 2 ** attempt)
+        attempt += 1
+
+def clear_autotest_projects(workers=8, dry_run=False, retries=3):
+    """
+    Удаляет все проекты, созданные автотестами — включая проекты запусков, которые
+    идут на тот же стенд прямо сейчас (отличить их не по чему); запускать, когда их нет
+
+    Args:
+        workers (int): Сколько проектов удалять одновременно (1 — последовательно)
+        dry_run (bool): Только показать, что было бы удалено
+        retries (int): Повторы 429/500 на проект (сеть и 502-504 повторяет ApiClient)
+
+    Returns:
+        dict: {"found", "deleted", "failed"}
+    """
+    summary = {"found": 0, "deleted": 0, "failed": 0}
     try:
         print("[INFO] Получаем список всех проектов...")
         projects = get_all_projects()
         print(f"[INFO] Найдено {len(projects)} проектов")
-        
-        autotest_projects = []
-        
-        # Ищем проекты, созданные автотестами
-        for project in projects:
-            project_code = project.get("code", "")
-            project_title = project.get("title", "")
-            
-            # Проверяем паттерны автотестовых проектов
-            is_autotest = (
-                project_code.startswith("autotest_flow_") or
-                project_code.startswith("test_flow_component_") or
-                project_title.startswith("Автотест Flow") or
-                project_title.startswith("Test Flow Project") or
-                "autotest" in project_code.lower() or
-                "test_flow" in project_code.lower()
-            )
-            
-            if is_autotest:
-                autotest_projects.append(project)
-        
-        if not autotest_projects:
-            print("[INFO] Проекты автотестов не найдены")
-            return
-        
-        print(f"[INFO] Найдено {len(autotest_projects)} проектов автотестов:")
-        for project in autotest_projects:
-            print(f"  - {project.get('code')} ({project.get('title')})")
-        
-        # Удаляем проекты
-        deleted_count = 0
-        for project in autotest_projects:
-            try:
-                project_id = project.get("id")
-                project_code = project.get("code")
-                project_title = project.get("title")
-                
-                print(f"[INFO] Пытаемся удалить проект: {project_code} (ID: {project_id})")
-                
-                if project_id:
-                    try:
-                        success = delete_project_by_id(project_id)
-                        if success:
-                            print(f"[SUCCESS] Удален проект: {project_code}")
-                            deleted_count += 1
-                        else:
-                            print(f"[ERROR] API вернул ошибку при удалении проекта: {project_code}")
-                    except requests.exceptions.HTTPError as e:
-                        print(f"[ERROR] HTTP ошибка при удалении проекта {project_code}: {e}")
-                        print(f"[DEBUG] Status code: {e.response.status_code}")
-                        print(f"[DEBUG] Response text: {e.response.text}")
-                        if e.response.status_code == 404:
-                            print(f"[INFO] Проект {project_code} уже удален (404)")
-                            deleted_count += 1
-                    except Exception as e:
-                        print(f"[ERROR] Ошибка при удалении проекта {project_code}: {e}")
-                else:
-                    print(f"[ERROR] У проекта {project_code} отсутствует ID")
-            except Exception as e:
-                print(f"[ERROR] Общая ошибка при обработке проекта {project.get('code')}: {e}")
-        
-        print(f"[INFO] Успешно удалено {deleted_count} из {len(autotest_projects)} проектов автотестов")
-        
     except Exception as e:
         print(f"[ERROR] Ошибка при получении списка проектов: {e}")
+        return summary
+
+    # Ищем проекты, созданные автотестами
+    autotest_projects = [project for project in projects if is_autotest_project(project)]
+    summary["found"] = len(autotest_projects)
+    if not autotest_projects:
+        print("[INFO] Проекты автотестов не найдены")
+        return summary
+
+    print(f"[INFO] Найдено {len(autotest_projects)} проектов автотестов:")
+    for project in autotest_projects:
+        print(f"  - {project.get('code')} ({project.get('title')})")
+    if dry_run:
+        print("[INFO] Режим --dry-run: проекты не удаляются")
+        return summary
+
+    # Удаляем проекты пулом потоков через общий API-клиент
+    total = len(autotest_projects)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, total))) as pool:
+        futures = {pool.submit(delete_project_with_retry, project, retries): project for project in autotest_projects}
+        for done, future in enumerate(as_completed(futures), 1):
+            project_code = futures[future].get("code")
+            try:
+                ok, error = future.result()
+            except Exception as e:
+                ok, error = False, str(e)
+            rate = done / max(time.monotonic() - started, 1e-6)
+            if ok:
+                summary["deleted"] += 1
+                print(f"[SUCCESS] [{done}/{total}, {rate:.1f}/с] Удален проект: {project_code}")
+            else:
+                summary["failed"] += 1
+                print(f"[ERROR] [{done}/{total}, {rate:.1f}/с] Ошибка при удалении проекта {project_code}: {error}")
+
+    elapsed = time.monotonic() - started
+    print(f"[INFO] Успешно удалено {summary['deleted']} из {total} проектов автотестов "
+          f"за {elapsed:.1f}с ({total / max(elapsed, 1e-6):.1f} проектов/с, потоков: {workers})")
+    return summary
 
 def clear_shared_project_file():
     """
@@ -146,7 +177,7 @@ def create_test_project():
         password = os.getenv("PASSWORD")
         
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
+            browser = launch_browser(p)
             page = browser.new_page()
             login_page = LoginPage(page)
             login_page.goto()
@@ -171,18 +202,23 @@ def create_test_project():
         print(f"[ERROR] Ошибка при создании тестового проекта: {str(e)}")
 
 if __name__ == '__main__':
-    import sys
-    
+    parser = argparse.ArgumentParser(description="Очистка проектов автотестов")
+    parser.add_argument("--demo", action="store_true", help="Сначала создать тестовый проект")
+    parser.add_argument("--workers", "-w", type=int, default=8, help="Параллельных удалений (по умолчанию 8)")
+    parser.add_argument("--dry-run", action="store_true", help="Только показать найденные проекты")
+    parser.add_argument("--retries", type=int, default=3, help="Повторы 429/500 на проект (сеть и 502-504 повторяет API-клиент)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("ОЧИСТКА ПРОЕКТОВ АВТОТЕСТОВ")
     print("=" * 60)
     
     # Если передан аргумент --demo, создаем тестовый проект
-    if len(sys.argv) > 1 and sys.argv[1] == "--demo":
+    if args.demo:
         create_test_project()
         print()
     
-    clear_autotest_projects()
+    clear_autotest_projects(workers=args.workers, dry_run=args.dry_run, retries=args.retries)
     print()
     clear_shared_project_file()
     
@@ -0,0 +1,131 @@
+"""
+Сводная матрица результатов по хостам для run_tests.py st1,st2,...
+
+Каждый процесс pytest пишет JUnit XML (--junitxml) своего хоста; здесь они
+сводятся в таблицу "тест x хост": статус и длительность в каждой ячейке.
+Результат — matrix.csv и matrix.html в каталоге запуска плюс текст для консоли.
+"""
+import csv
+import html
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+STATUS_MARKS = {
+    "passed": "OK",
+    "failed": "FAIL",
+    "error": "ERROR",
+    "skipped": "SKIP",
+    None: "-",
+}
+STATUS_COLORS = {
+    "passed": "#d4edda",
+    "failed": "#f8d7da",
+    "error": "#f8d7da",
+    "skipped": "#fff3cd",
+    None: "#eeeeee",
+}
+
+
+def read_junit(path):
+    """
+    Результаты тестов из JUnit XML
+
+    Returns:
+        dict: {"модуль::тест": {"status", "seconds", "message"}}; пустой, если файла нет
+    """
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return {}
+    results = {}
+    for case in root.iter("testcase"):
+        test_id = f"{case.get('classname', '')}::{case.get('name', '')}"
+        status, message = "passed", ""
+        for tag in ("failure", "error", "skipped"):
+            node = case.find(tag)
+            if node is not None:
+                status = "failed" if tag == "failure" else tag
+                message = node.get("message", "")
+                break
+        results[test_id] = {"status": status, "seconds": float(case.get("time") or 0), "message": message}
+    return results
+
+
+def build_matrix(host_results):
+    """{хост: результаты read_junit} -> (отсортированные тесты, {тест: {хост: результат или None}})"""
+    tests = sorted({test_id for results in host_results.values() for test_id in results})
+    matrix = {
+        test_id: {host: results.get(test_id) for host, results in host_results.items()}
+        for test_id in tests
+    }
+    return tests, matrix
+
+
+def _cell(result):
+    if result is None:
+        return STATUS_MARKS[None]
+    return f"{STATUS_MARKS[result['status']]} {result['seconds']:.1f}s"
+
+
+def format_matrix(host_results, exit_codes):
+    """Текстовая таблица для консоли"""
+    hosts = list(host_results)
+    tests, matrix = build_matrix(host_results)
+    rows = [["test"] + hosts]
+    rows += [[test_id] + [_cell(matrix[test_id][host]) for host in hosts] for test_id in tests]
+    rows.append(["exit code"] + [str(exit_codes.get(host, "-")) for host in hosts])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = ["  ".join(value.ljust(width) for value, width in zip(row, widths)) for row in rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def write_matrix(run_dir, host_results, exit_codes, base_urls):
+    """Записать matrix.csv и matrix.html в run_dir; возвращает путь к HTML"""
+    run_dir = Path(run_dir)
+    hosts = list(host_results)
+    tests, matrix = build_matrix(host_results)
+
+    with open(run_dir / "matrix.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["test"] + [f"{host} status" for host in hosts] + [f"{host} seconds" for host in hosts])
+        for test_id in tests:
+            cells = [matrix[test_id][host] for host in hosts]
+            writer.writerow(
+                [test_id]
+                + [cell["status"] if cell else "" for cell in cells]
+                + [f"{cell['seconds']:.3f}" if cell else "" for cell in cells]
+            )
+
+    header = "".join(
+        f"<th>{html.escape(host)}<br><small>{html.escape(base_urls.get(host, ''))}</small></th>" for host in hosts
+    )
+    body = []
+    for test_id in tests:
+        cells = []
+        for host in hosts:
+            result = matrix[test_id][host]
+            status = result["status"] if result else None
+            title = html.escape(result["message"]) if result and result["message"] else ""
+            cells.append(
+                f'<td style="background:{STATUS_COLORS[status]}" title="{title}">{html.escape(_cell(result))}</td>'
+            )
+        body.append(f"<tr><td>{html.escape(test_id)}</td>{''.join(cells)}</tr>")
+    footer = "".join(
+        f'<td><a href="{html.escape(host)}.log">exit {exit_codes.get(host, "-")}</a></td>' for host in hosts
+    )
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Результаты по хостам</title>
+<style>body{{font-family:sans-serif}} table{{border-collapse:collapse}} td,th{{border:1px solid #ccc;padding:4px 8px;text-align:left}}</style>
+</head><body>
+<h2>Результаты по хостам</h2>
+<table>
+<tr><th>Тест</th>{header}</tr>
+{chr(10).join(body)}
+<tr><th>Лог</th>{footer}</tr>
+</table>
+</body></html>
+"""
+    html_path = run_dir / "matrix.html"
+    html_path.write_text(page, encoding="utf-8")
+    return html_path
@@ -0,0 +1,108 @@
+"""
+Наполнение проекта файлами одним коммитом в git-репозиторий проекта
+
+Проект создаётся из git-репозитория (REPO_URL_FLOW) и ветки по умолчанию,
+поэтому готовое дерево файлов проще положить в отдельную ветку и создать
+проект уже на ней, чем собирать его кликами в файловой панели:
+
+    tree = {
+        "scripts/": None,                                   # папка
+        "scripts/math_functions.py": SCRIPTS_DIR / "math_functions.py",
+        "shema/shema_for_split.ds.json": {...},             # dict/list -> JSON
+        "test_flow_component/test_split.df.json": "...",    # текст как есть
+    }
+    seed_branch(repo_url, "autotest/my_project", tree)
+
+Ветка создаётся от base_branch, так что файлы из неё (диаграммы
+test_flow_component и т.д.) сохраняются. В conftest.py это фикстура
+seed_project.
+"""
+import json
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path, PurePosixPath
+
+# Пустые папки в git не хранятся
+FOLDER_PLACEHOLDER = ".gitkeep"
+
+
+def _git(*args, cwd=None):
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)}: {result.stderr.strip() or result.stdout.strip()}")
+    return result.stdout
+
+
+def _target(root, rel_path):
+    rel = PurePosixPath(rel_path)
+    if rel.is_absolute() or ".." in rel.parts:
+        raise ValueError(f"Путь вне проекта: {rel_path}")
+    return root.joinpath(*rel.parts)
+
+
+def materialise_tree(root, tree):
+    """
+    Записывает дерево tree в каталог root
+
+    Args:
+        root (Path): Корень рабочей копии
+        tree (dict): путь -> содержимое. Путь с "/" на конце (или None) — папка;
+            str — текст, bytes — как есть, dict/list — JSON, Path — копия локального файла
+
+    Returns:
+        list: Записанные пути относительно root
+    """
+    root = Path(root)
+    written = []
+    for rel_path, content in tree.items():
+        target = _target(root, rel_path.rstrip("/"))
+        if rel_path.endswith("/") or content is None:
+            target.mkdir(parents=True, exist_ok=True)
+            if not any(target.iterdir()):
+                (target / FOLDER_PLACEHOLDER).touch()
+                written.append(f"{rel_path.rstrip('/')}/{FOLDER_PLACEHOLDER}")
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, Path):
+            shutil.copyfile(content, target)
+        elif isinstance(content, bytes):
+            target.write_bytes(content)
+        elif isinstance(content, (dict, list)):
+            target.write_text(json.dumps(content, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        else:
+            target.write_text(str(content), encoding="utf-8")
+        # В папке появился файл — заглушка больше не нужна
+        placeholder = target.parent / FOLDER_PLACEHOLDER
+        if placeholder.exists():
+            placeholder.unlink()
+        written.append(rel_path)
+    return written
+
+
+def seed_branch(repo_url, branch, tree, base_branch="main", message=None):
+    """
+    Создаёт (или перезаписывает) ветку branch = base_branch + дерево tree одним коммитом
+
+    Returns:
+        str: SHA коммита ветки
+    """
+    with tempfile.TemporaryDirectory(prefix="seed_") as tmp:
+        work = Path(tmp) / "repo"
+        _git("clone", "--quiet", "--depth", "1", "--branch", base_branch, repo_url, str(work))
+        _git("checkout", "--quiet", "-B", branch, cwd=work)
+        written = materialise_tree(work, tree)
+        _git("add", "--all", cwd=work)
+        if _git("status", "--porcelain", cwd=work).strip():
+            _git(
+                "-c", "user.name=autotest", "-c", "user.email=autotest@localhost",
+                "commit", "--quiet", "-m", message or f"autotest seed: {len(written)} files",
+                cwd=work,
+            )
+        _git("push", "--quiet", "--force", "origin", f"HEAD:refs/heads/{branch}", cwd=work)
+        return _git("rev-parse", "HEAD", cwd=work).strip()
+
+
+def delete_branch(repo_url, branch):
+    """Удаляет ветку branch в удалённом репозитории"""
+    _git("push", "--quiet", repo_url, "--delete", branch)
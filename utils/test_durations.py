@@ -0,0 +1,110 @@
+"""
+История длительности тестов: порядок "самые долгие первыми" и сбалансированные шарды
+
+После каждого прогона conftest.py добавляет длительность тестов (setup + call +
+teardown) в reports/test_durations.json (TEST_DURATIONS_FILE) — сглаженное
+среднее по запускам. При следующем запуске:
+
+- тесты идут от самых долгих к самым коротким, поэтому под xdist (--dist load
+  раздаёт тесты по одному) долгие test_flow_* стартуют сразу на всех воркерах,
+  а короткие добивают хвост;
+- --shard K/N оставляет K-й из N шардов с примерно равной суммарной
+  длительностью (жадно: очередной самый долгий тест — в наименее загруженный шард).
+
+Тесты без истории считаются длительностью медианы известных.
+"""
+import heapq
+import json
+import os
+import statistics
+from pathlib import Path
+
+HISTORY_FILE = Path(os.getenv(
+    "TEST_DURATIONS_FILE", Path(__file__).parent.parent / "reports" / "test_durations.json"
+))
+
+# Вес последнего запуска в сглаженной длительности
+SMOOTHING = 0.5
+# Длительность теста без истории, если истории нет совсем
+DEFAULT_DURATION = 1.0
+
+
+def load_history(path=HISTORY_FILE):
+    """{nodeid: {"seconds": сглаженная длительность, "runs": число запусков, "last": последний замер}}"""
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def update_history(durations, path=HISTORY_FILE, smoothing=SMOOTHING):
+    """Добавить длительности прогона {nodeid: секунды} в историю и сохранить её"""
+    path = Path(path)
+    history = load_history(path)
+    for nodeid, seconds in durations.items():
+        entry = history.get(nodeid)
+        if entry:
+            entry["seconds"] = round(smoothing * seconds + (1 - smoothing) * entry["seconds"], 3)
+            entry["runs"] = entry.get("runs", 1) + 1
+            entry["last"] = round(seconds, 3)
+        else:
+            history[nodeid] = {"seconds": round(seconds, 3), "runs": 1, "last": round(seconds, 3)}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(history, indent=1, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    return history
+
+
+def run_durations(path, base):
+    """
+    Длительности прогона, записанного в историю path поверх копии истории base
+    (run_tests.py st1,st2,...: у каждого хоста свой файл, затем они сливаются в общий)
+    """
+    durations = {}
+    for nodeid, entry in load_history(path).items():
+        if "last" in entry and entry.get("runs", 1) > base.get(nodeid, {}).get("runs", 0):
+            durations[nodeid] = entry["last"]
+    return durations
+
+
+def estimates(nodeids, history):
+    """Ожидаемая длительность каждого nodeid (без истории — медиана известных)"""
+    known = [history[n]["seconds"] for n in nodeids if n in history]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    return {n: history[n]["seconds"] if n in history else default for n in nodeids}
+
+
+def longest_first(nodeids, history):
+    """nodeids по убыванию ожидаемой длительности (при равенстве — исходный порядок)"""
+    expected = estimates(nodeids, history)
+    return sorted(nodeids, key=lambda n: -expected[n])
+
+
+def plan_shards(nodeids, history, count):
+    """
+    Разбить nodeids на count шардов с близкой суммарной длительностью
+
+    Returns:
+        list: [{"nodeids": [...] (самые долгие первыми), "seconds": сумма}] длины count
+    """
+    expected = estimates(nodeids, history)
+    shards = [{"nodeids": [], "seconds": 0.0} for _ in range(count)]
+    heap = [(0.0, i) for i in range(count)]
+    for nodeid in longest_first(nodeids, history):
+        load, i = heapq.heappop(heap)
+        shards[i]["nodeids"].append(nodeid)
+        shards[i]["seconds"] = load + expected[nodeid]
+        heapq.heappush(heap, (shards[i]["seconds"], i))
+    return shards
+
+
+def parse_shard(value):
+    """'2/4' -> (1, 4): номер шарда с нуля и число шардов"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Ожидается K/N, получено: {value}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Шард вне диапазона: {value}")
+    return index - 1, count